@@ -0,0 +1,717 @@
+"""Benchmarks for Tik Manager 4.
+
+Run with:
+    TIK_MANAGER4_RUN_BENCHMARKS=1 python -m pytest tests/benchmark_test.py -s
+
+The project benchmarks run on a generated project. They are configured with
+the environment variables below:
+    TIK_MANAGER4_BENCHMARK_SIZE: small, medium or large. Default is small.
+    TIK_MANAGER4_BENCHMARK_ROUNDS: Rounds of each benchmark. Default is 5.
+    TIK_MANAGER4_BENCHMARK_JSON: Path of the json results file.
+    TIK_MANAGER4_BENCHMARK_COMPARE: A previous results file to compare with.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from tik_manager4.core import settings
+
+if os.getenv("TIK_MANAGER4_RUN_BENCHMARKS") != "1":
+    pytest.skip("Benchmarks are opt-in only.", allow_module_level=True)
+
+SHOTS_PER_SEQUENCE = 100
+
+
+def _timed(function, *args, **kwargs):
+    """Call the function and return the result with the elapsed seconds."""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _build_structure_data(project_name, sub_count):
+    """Build project structure data with sequences of shots."""
+    subs = []
+    sequence_count = max(sub_count // SHOTS_PER_SEQUENCE, 1)
+    for seq_index in range(sequence_count):
+        seq_name = f"SEQ_{seq_index:04d}"
+        shots = [
+            {
+                "id": seq_index * SHOTS_PER_SEQUENCE + shot_index + 1000,
+                "name": f"SHOT_{shot_index:04d}",
+                "path": f"{seq_name}/SHOT_{shot_index:04d}",
+                "subs": [],
+            }
+            for shot_index in range(SHOTS_PER_SEQUENCE)
+        ]
+        subs.append({"id": seq_index + 1, "name": seq_name, "path": seq_name, "subs": shots})
+    return {"id": 0, "name": project_name, "path": "", "mode": "root", "subs": subs}
+
+
+class TestStructureBenchmark:
+    """Persistence of big project structures."""
+
+    @pytest.mark.parametrize("sub_count", [10000, 50000])
+    @pytest.mark.parametrize("use_journal", [False, True])
+    def test_add_sub_project(self, tik, tmp_path, sub_count, use_journal):
+        tik.user.set("Admin", "1234")
+        project_path = Path(tmp_path, "benchmark_project")
+        tik.create_project(str(project_path), structure_template="empty")
+        structure = settings.Settings(
+            str(project_path / "tikDatabase" / "project_structure.json")
+        )
+        structure.set_data(_build_structure_data(project_path.name, sub_count))
+        structure.apply_settings(force=True)
+        tik.project.settings.add_property("structure_journal", use_journal)
+        tik.project.settings.apply_settings(force=True)
+
+        _, load_time = _timed(tik.set_project, str(project_path))
+        _, tree_time = _timed(tik.project.get_sub_tree)
+        durations = []
+        for shot_index in range(10):
+            _, duration = _timed(
+                tik.project.create_sub_project,
+                f"NEW_SHOT_{shot_index:02d}",
+                parent_path="SEQ_0000",
+            )
+            durations.append(duration)
+        _, reload_time = _timed(tik.set_project, str(project_path))
+
+        assert tik.project.find_sub_by_path("SEQ_0000/NEW_SHOT_09") != -1
+        print(
+            f"\n{sub_count} subprojects, journal={use_journal}: "
+            f"load {load_time:.3f}s, tree {tree_time:.3f}s, "
+            f"add sub avg {sum(durations) / len(durations):.4f}s, "
+            f"reload {reload_time:.3f}s"
+        )
+
+
+class TestResolverBenchmark:
+    """Resolving the element paths like the dcc loaders do."""
+
+    RESOLVE_COUNT = 200
+
+    def test_resolve_element_path(self, tik, tmp_path):
+        from tik_manager4.objects.resolver import Resolver
+
+        tik.user.set("Admin", "1234")
+        project_path = str(Path(tmp_path, "resolver_project"))
+        tik.create_project(project_path, structure_template="asset_shot")
+        tik.set_project(project_path)
+        sub = tik.project.find_sub_by_path("Assets")
+        task = tik.project.create_task("hero", categories=["Model"], parent_path=sub.path)
+        work = task.categories["Model"].create_work("hero")
+        publisher = tik.project.snapshot_publisher
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.resolve()
+        publisher.reserve()
+        publisher.extract()
+        publisher.publish(notes="benchmark")
+        names = (project_path, sub.path, task.name, "Model", work.name, 1, "snapshot")
+
+        def _resolve_with_set_project():
+            tik.set_project(project_path)
+            return Resolver(tik).resolve(*names)
+
+        resolver = Resolver(tik)
+        _, reload_time = _timed(
+            lambda: [_resolve_with_set_project() for _ in range(self.RESOLVE_COUNT)]
+        )
+        _, cached_time = _timed(
+            lambda: [resolver.resolve(*names) for _ in range(self.RESOLVE_COUNT)]
+        )
+        assert resolver.resolve(*names)
+        print(
+            f"\n{self.RESOLVE_COUNT} resolves: with set_project {reload_time:.3f}s, "
+            f"cached {cached_time:.3f}s"
+        )
+
+
+class TestSerializerBenchmark:
+    """Loading and dumping the database files with the json backends."""
+
+    FILE_COUNT = 2000
+
+    def _generate_database(self, tik, tmp_path):
+        """Create a project and clone a real work file FILE_COUNT times."""
+        from tik_manager4.core import io
+
+        tik.user.set("Admin", "1234")
+        project_path = str(Path(tmp_path, "serializer_project"))
+        tik.create_project(project_path, structure_template="asset_shot")
+        tik.set_project(project_path)
+        task = tik.project.create_task("hero", categories=["Model"], parent_path="Assets")
+        work = task.categories["Model"].create_work("hero")
+        for _ in range(4):
+            work.new_version(notes="benchmark")
+        data = io.IO(work.settings_file).read()
+        database = Path(project_path, "tikDatabase", "benchmark")
+        database.mkdir(parents=True)
+        paths = [str(database / f"work_{index:05d}.twork") for index in range(self.FILE_COUNT)]
+        return data, paths
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_load_dump(self, tik, tmp_path, compact):
+        from tik_manager4.core import io
+
+        data, paths = self._generate_database(tik, tmp_path)
+        lines = []
+        for name in io.SERIALIZERS:
+            serializer = io.get_serializer(name)
+            if serializer.name != name:
+                lines.append(f"{name}: not installed")
+                continue
+
+            def _dump():
+                for path in paths:
+                    with open(path, "wb") as _file:
+                        _file.write(serializer.dumps(data, compact=compact))
+
+            def _load():
+                for path in paths:
+                    with open(path, "rb") as _file:
+                        serializer.loads(_file.read())
+
+            _, dump_time = _timed(_dump)
+            _, load_time = _timed(_load)
+            size = sum(os.path.getsize(path) for path in paths)
+            lines.append(
+                f"{name}: dump {self.FILE_COUNT / dump_time:.0f} files/s, "
+                f"load {self.FILE_COUNT / load_time:.0f} files/s, "
+                f"{size / 1024 / 1024:.1f} MB"
+            )
+        print(f"\n{self.FILE_COUNT} work files, compact={compact}\n" + "\n".join(lines))
+
+
+class TestVersionJournalBenchmark:
+    """Saving and loading works with long version histories."""
+
+    VERSION_COUNT = 900
+
+    @pytest.mark.parametrize("use_journal", [False, True])
+    def test_new_version(self, tik, tmp_path, use_journal):
+        from tik_manager4.core import io
+        from tik_manager4.objects.work import Work
+
+        tik.user.set("Admin", "1234")
+        project_path = str(Path(tmp_path, "journal_project"))
+        tik.create_project(project_path, structure_template="asset_shot")
+        tik.set_project(project_path)
+        task = tik.project.create_task("hero", categories=["Lighting"], parent_path="Assets")
+        work = task.categories["Lighting"].create_work("hero")
+        data = io.IO(work.settings_file).read()
+        template = data["versions"][0]
+        data["versions"] = [
+            dict(template, version_number=number, notes="x" * 200)
+            for number in range(1, self.VERSION_COUNT + 1)
+        ]
+        io.IO(work.settings_file).write(data)
+        tik.project.settings.add_property("version_journal", use_journal)
+        tik.project.settings.apply_settings(force=True)
+        tik.set_project(project_path)
+
+        work = Work(work.settings_file)
+        work.new_version()  # adds the journal marker
+        durations = []
+        for _ in range(20):
+            _, duration = _timed(work.new_version)
+            durations.append(duration)
+        _, load_time = _timed(Work, work.settings_file)
+        assert Work(work.settings_file).version_count == self.VERSION_COUNT + 21
+        print(
+            f"\n{self.VERSION_COUNT} versions, journal={use_journal}: "
+            f"new version avg {sum(durations) / len(durations):.4f}s, "
+            f"load {load_time:.4f}s"
+        )
+
+
+class TestBranchMaterializationBenchmark:
+    """Publishing big elements with the branch materialization modes."""
+
+    ELEMENT_MB = int(os.getenv("TIK_MANAGER4_BENCHMARK_ELEMENT_MB", "256"))
+    PUBLISH_COUNT = 3
+
+    @pytest.mark.parametrize("mode", ["Copy", "Hardlink", "Reflink", "Symlink", "Auto"])
+    def test_publish(self, tik, tmp_path, mode):
+        tik.user.set("Admin", "1234")
+        project_path = str(Path(tmp_path, "branch_project"))
+        tik.create_project(project_path, structure_template="asset_shot")
+        tik.project.settings.add_property("branch_materialization", mode)
+        tik.project.settings.apply_settings(force=True)
+        tik.set_project(project_path)
+        task = tik.project.create_task("hero", categories=["Model"], parent_path="Assets")
+        work = task.categories["Model"].create_work("hero")
+        block = os.urandom(1024 * 1024)
+        scene_path = work.get_version(work.get_last_version()).scene_path
+        with open(work.get_abs_project_path(scene_path), "wb") as _file:
+            for _ in range(self.ELEMENT_MB):
+                _file.write(block)
+
+        publisher = tik.project.snapshot_publisher
+        durations = []
+        for _ in range(self.PUBLISH_COUNT):
+            publisher.work_object = work
+            publisher.work_version = work.get_last_version()
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            _, duration = _timed(publisher.publish, notes="benchmark")
+            durations.append(duration)
+        latest = work.publish.get_version(work.publish.get_last_version())
+        assert any(latest._get_live_folder().glob("SNAPSHOT_*"))
+        print(
+            f"\n{self.ELEMENT_MB} MB element, {mode}: "
+            f"publish avg {sum(durations) / len(durations):.3f}s"
+        )
+
+
+class TestCopyEngineBenchmark:
+    """Copying bundles of many small files."""
+
+    FILE_COUNT = 2000
+    FILE_SIZE = 64 * 1024
+
+    def test_copy_tree(self, tmp_path):
+        from tik_manager4.core import copier
+
+        source = tmp_path / "udims"
+        block = os.urandom(self.FILE_SIZE)
+        for index in range(self.FILE_COUNT):
+            folder = source / f"set_{index % 20:02d}"
+            folder.mkdir(parents=True, exist_ok=True)
+            (folder / f"diffuse.{1001 + index}.exr").write_bytes(block)
+
+        _, shutil_time = _timed(shutil.copytree, source, tmp_path / "shutil_copy")
+        _, engine_time = _timed(copier.CopyEngine().copy, source, tmp_path / "engine_copy")
+        _, verify_time = _timed(
+            copier.CopyEngine(verify=True).copy, source, tmp_path / "verified_copy"
+        )
+        _, chmod_time = _timed(copier.chmod_tree, tmp_path / "engine_copy", 0o444)
+        assert len(list((tmp_path / "engine_copy").rglob("*.exr"))) == self.FILE_COUNT
+        print(
+            f"\n{self.FILE_COUNT} files: copytree {shutil_time:.3f}s, "
+            f"engine {engine_time:.3f}s, engine with verify {verify_time:.3f}s, "
+            f"protect {chmod_time:.3f}s"
+        )
+
+
+class TestChecksumBenchmark:
+    """Hashing the published elements."""
+
+    FILE_MB = 256
+    BUNDLE_FILES = 500
+
+    def test_element_checksum(self, tmp_path):
+        from tik_manager4.core import checksum
+
+        single = tmp_path / "cache.abc"
+        block = os.urandom(1024 * 1024)
+        with open(single, "wb") as _file:
+            for _ in range(self.FILE_MB):
+                _file.write(block)
+        bundle = tmp_path / "bundle"
+        bundle.mkdir()
+        for index in range(self.BUNDLE_FILES):
+            (bundle / f"diffuse.{1001 + index}.exr").write_bytes(block)
+
+        lines = []
+        for algorithm in checksum.HASHERS:
+            _, file_time = _timed(checksum.element_checksum, str(single), algorithm)
+            _, serial_time = _timed(
+                checksum.element_checksum, str(bundle), algorithm, workers=1
+            )
+            _, parallel_time = _timed(checksum.element_checksum, str(bundle), algorithm)
+            lines.append(
+                f"{algorithm}: file {self.FILE_MB / file_time:.0f} MB/s, "
+                f"bundle {self.BUNDLE_FILES / serial_time:.0f} MB/s with one thread, "
+                f"{self.BUNDLE_FILES / parallel_time:.0f} MB/s with "
+                f"{checksum.DEFAULT_WORKERS} threads"
+            )
+        print("\n" + "\n".join(lines))
+
+
+class TestBlobStoreBenchmark:
+    """Republishing an unchanged texture bundle with the content store."""
+
+    BUNDLE_FILES = 500
+    VERSIONS = 5
+
+    def test_republish(self, tmp_path):
+        from tik_manager4.core import blobstore
+        from tik_manager4.core import checksum
+
+        source = tmp_path / "source"
+        source.mkdir()
+        for index in range(self.BUNDLE_FILES):
+            (source / f"diffuse.{1001 + index}.exr").write_bytes(os.urandom(64 * 1024))
+        store = blobstore.BlobStore(tmp_path / ".tik_store")
+        add_times = []
+        for version in range(1, self.VERSIONS + 1):
+            bundle = tmp_path / f"v{version:03d}"
+            shutil.copytree(source, bundle)
+            record = checksum.element_checksum(str(bundle))
+            stats, add_time = _timed(store.add, str(bundle), record)
+            add_times.append(add_time)
+        inodes = {
+            (tmp_path / f"v{version:03d}" / "diffuse.1001.exr").stat().st_ino
+            for version in range(1, self.VERSIONS + 1)
+        }
+        assert len(inodes) == 1
+        assert stats.deduplicated == self.BUNDLE_FILES
+        published_mb = self.VERSIONS * self.BUNDLE_FILES * 64 / 1024
+        print(
+            f"\n{self.VERSIONS} publishes of {self.BUNDLE_FILES} files: "
+            f"{published_mb:.0f} MB published, {published_mb / self.VERSIONS:.0f} MB stored, "
+            f"first add {add_times[0]:.3f}s, deduplicating add {add_times[-1]:.3f}s"
+        )
+        _, gc_time = _timed(store.collect_garbage)
+        print(f"garbage collection of {self.BUNDLE_FILES} blobs in use: {gc_time:.3f}s")
+
+
+class TestSyncQueueBenchmark:
+    """Syncing a localized publish with many elements to another drive."""
+
+    ELEMENTS = 40
+    FILES = 25
+
+    @pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs a second drive")
+    def test_sync_elements(self, tmp_path):
+        from tik_manager4.core import sync_queue
+
+        timings = {}
+        for workers in (1, sync_queue.DEFAULT_WORKERS):
+            local = Path(tempfile.mkdtemp(dir="/dev/shm"))
+            try:
+                pairs = []
+                for index in range(self.ELEMENTS):
+                    element = local / f"element_{index}"
+                    element.mkdir()
+                    for file_index in range(self.FILES):
+                        (element / f"cache.{file_index}.abc").write_bytes(os.urandom(32 * 1024))
+                    pairs.append((element, tmp_path / f"origin_{workers}" / f"element_{index}"))
+                queue = sync_queue.SyncQueue(tmp_path / f"queue_{workers}", workers=workers)
+                queue.start()
+                try:
+                    start = time.perf_counter()
+                    job = queue.submit("publish", pairs)
+                    queue.wait("publish")
+                    timings[workers] = time.perf_counter() - start
+                finally:
+                    queue.stop()
+                assert job.status == sync_queue.DONE
+            finally:
+                shutil.rmtree(local, ignore_errors=True)
+        print(
+            f"\n{self.ELEMENTS} elements of {self.FILES} files: "
+            + ", ".join(f"{workers} workers {seconds:.3f}s" for workers, seconds in timings.items())
+        )
+
+
+_IMPORT_SCRIPT = (
+    "import sys, tik_manager4; "
+    "tik_manager4.initialize('Standalone', common_folder=sys.argv[1])"
+)
+
+
+def _parse_importtime(stderr):
+    """Return the cumulative microseconds of the modules from -X importtime."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        cumulative[module.strip()] = int(cumulative_us)
+    return cumulative
+
+
+class TestImportBenchmark:
+    """Importing the package and initializing it like a dcc does."""
+
+    RUNS = 5
+    TOP_MODULES = 10
+
+    def test_initialize_standalone(self, tmp_path):
+        home = tmp_path / "home"
+        commons = tmp_path / "commons"
+        (home / "TikManager4").mkdir(parents=True)
+        commons.mkdir()
+        env = dict(
+            os.environ, HOME=str(home), USERPROFILE=str(home), QT_QPA_PLATFORM="offscreen"
+        )
+        repo_root = str(Path(__file__).parent.parent)
+        durations = []
+        cumulative = {}
+        for _ in range(self.RUNS):
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", _IMPORT_SCRIPT, str(commons)],
+                cwd=repo_root, env=env, capture_output=True, text=True, check=True,
+            )
+            durations.append(time.perf_counter() - start)
+            cumulative = _parse_importtime(result.stderr)
+        durations.sort()
+        _RESULTS["import.initialize_standalone"] = {
+            "rounds": self.RUNS,
+            "min": durations[0],
+            "max": durations[-1],
+            "mean": sum(durations) / self.RUNS,
+            "median": durations[self.RUNS // 2],
+        }
+        # the management platforms import their sdks only when they are used.
+        assert "tank" not in cumulative
+        assert "gazu" not in cumulative
+        top = sorted(
+            (item for item in cumulative.items() if item[0].startswith("tik_manager4")),
+            key=lambda item: item[1],
+            reverse=True,
+        )[: self.TOP_MODULES]
+        print(
+            f"\nimport and initialize: median {durations[self.RUNS // 2]:.3f}s, "
+            f"import tik_manager4.objects.main "
+            f"{cumulative.get('tik_manager4.objects.main', 0) / 1000:.1f}ms"
+        )
+        for module, microseconds in top:
+            print(f"    {module:<48} {microseconds / 1000:>8.1f}ms")
+
+
+# Sizes of the generated project for the project benchmarks. Select with
+# TIK_MANAGER4_BENCHMARK_SIZE.
+PROJECT_SIZES = {
+    "small": {"subprojects": 4, "tasks": 2, "works": 2, "versions": 2, "publishes": 1},
+    "medium": {"subprojects": 20, "tasks": 3, "works": 3, "versions": 3, "publishes": 2},
+    "large": {"subprojects": 100, "tasks": 4, "works": 4, "versions": 5, "publishes": 2},
+}
+BENCHMARK_ROUNDS = int(os.getenv("TIK_MANAGER4_BENCHMARK_ROUNDS", "5"))
+_RESULTS = {}
+
+
+class _Timer:
+    """Minimal stand-in for the pytest-benchmark fixture."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def pedantic(self, target, setup=None, rounds=BENCHMARK_ROUNDS):
+        durations = []
+        result = None
+        for _ in range(rounds):
+            if setup:
+                setup()
+            result, duration = _timed(target)
+            durations.append(duration)
+        durations.sort()
+        _RESULTS[self.name] = {
+            "rounds": rounds,
+            "min": durations[0],
+            "max": durations[-1],
+            "mean": sum(durations) / rounds,
+            "median": durations[rounds // 2],
+        }
+        return result
+
+
+def _write_results(size_name, size):
+    """Write the results as json and compare them with the baseline."""
+    output = os.getenv("TIK_MANAGER4_BENCHMARK_JSON") or str(
+        Path(tempfile.gettempdir(), "tik_manager4_benchmarks", f"{int(time.time())}.json")
+    )
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "size": size_name,
+        "parameters": size,
+        "python": sys.version.split()[0],
+        "benchmarks": _RESULTS,
+    }
+    Path(output).write_text(json.dumps(report, indent=4), encoding="utf-8")
+    print(f"\nBenchmark results => {output}")
+    baseline_path = os.getenv("TIK_MANAGER4_BENCHMARK_COMPARE")
+    if not baseline_path:
+        return
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    for name, stats in sorted(_RESULTS.items()):
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous:
+            continue
+        change = (stats["median"] / previous["median"] - 1) * 100
+        print(f"{name}: {previous['median']:.4f}s -> {stats['median']:.4f}s ({change:+.1f}%)")
+
+
+@pytest.fixture(scope="module")
+def generated_project(tmp_path_factory):
+    """Generate a project once for all the project benchmarks."""
+    from tests.project_generator import ProjectGenerator
+
+    root = tmp_path_factory.mktemp("generated")
+    original_home = os.environ.get("HOME")
+    original_userprofile = os.environ.get("USERPROFILE")
+    os.environ["HOME"] = os.environ["USERPROFILE"] = str(root / "home")
+    Path(root, "home", "TikManager4").mkdir(parents=True)
+    Path(root, "common").mkdir()
+    import tik_manager4
+
+    try:
+        tik = tik_manager4.initialize("Standalone", common_folder=str(root / "common"))
+        tik.user.set("Admin", "1234")
+        size_name = os.getenv("TIK_MANAGER4_BENCHMARK_SIZE", "small")
+        size = PROJECT_SIZES[size_name]
+        project_path = str(root / "generated_project")
+        summary, duration = _timed(ProjectGenerator(tik, seed=0, **size).generate, project_path)
+        print(f"\nGenerated {size_name} project in {duration:.2f}s: " + ", ".join(
+            f"{summary[key]} {key}"
+            for key in ("subprojects", "tasks", "works", "versions", "publishes")
+        ))
+        yield tik, project_path, summary
+        _write_results(size_name, size)
+    finally:
+        for key, value in (("HOME", original_home), ("USERPROFILE", original_userprofile)):
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+@pytest.fixture
+def bench(request):
+    """The pytest-benchmark fixture if installed or the simple timer."""
+    if request.config.pluginmanager.hasplugin("benchmark"):
+        return request.getfixturevalue("benchmark")
+    return _Timer(request.node.name)
+
+
+def _reset_project(tik, project_path):
+    """Return a benchmark setup which loads the project from scratch."""
+
+    def _setup():
+        tik.set_project(project_path)
+
+    return _setup
+
+
+def _walk_subs(sub):
+    yield sub
+    for child in sub.subs.values():
+        yield from _walk_subs(child)
+
+
+def _all_tasks(project):
+    return [
+        task
+        for sub in _walk_subs(project)
+        for task in sub.scan_tasks().values()
+    ]
+
+
+class TestProjectBenchmark:
+    """Common browsing and publishing operations on a generated project.
+
+    Results are written to TIK_MANAGER4_BENCHMARK_JSON and compared with
+    TIK_MANAGER4_BENCHMARK_COMPARE if given. When pytest-benchmark is
+    installed, its own options (--benchmark-json, --benchmark-compare)
+    are used instead.
+    """
+
+    def test_structure_load(self, generated_project, bench):
+        tik, project_path, _summary = generated_project
+        bench.pedantic(lambda: tik.set_project(project_path), rounds=BENCHMARK_ROUNDS)
+        assert tik.project.absolute_path == project_path
+
+    def test_scan_tasks(self, generated_project, bench):
+        tik, project_path, summary = generated_project
+
+        def _scan():
+            return sum(len(sub.scan_tasks()) for sub in _walk_subs(tik.project))
+
+        count = bench.pedantic(
+            _scan, setup=_reset_project(tik, project_path), rounds=BENCHMARK_ROUNDS
+        )
+        # the empty template comes with a task at the root.
+        assert count >= summary["tasks"]
+
+    def test_scan_works(self, generated_project, bench):
+        tik, project_path, summary = generated_project
+        tasks = []
+
+        def _setup():
+            tik.set_project(project_path)
+            tasks[:] = _all_tasks(tik.project)
+
+        def _scan():
+            return sum(
+                len(category.scan_works())
+                for task in tasks
+                for category in task.categories.values()
+            )
+
+        count = bench.pedantic(_scan, setup=_setup, rounds=BENCHMARK_ROUNDS)
+        assert count == summary["works"]
+
+    def test_scan_publish_versions(self, generated_project, bench):
+        tik, project_path, summary = generated_project
+        works = []
+
+        def _setup():
+            tik.set_project(project_path)
+            works[:] = [
+                work
+                for task in _all_tasks(tik.project)
+                for category in task.categories.values()
+                for work in category.scan_works().values()
+            ]
+
+        def _scan():
+            return sum(
+                1
+                for work in works
+                for version in work.publish.scan_publish_versions().values()
+                if version.version > 0  # skip the live version
+            )
+
+        count = bench.pedantic(_scan, setup=_setup, rounds=BENCHMARK_ROUNDS)
+        assert count == summary["publishes"]
+
+    def test_find_task_by_id(self, generated_project, bench):
+        tik, project_path, summary = generated_project
+        tik.set_project(project_path)
+        task_ids = summary["task_ids"]
+        found = bench.pedantic(
+            lambda: [tik.project.find_task_by_id(uid) for uid in task_ids],
+            rounds=BENCHMARK_ROUNDS,
+        )
+        assert -1 not in found
+
+    def test_find_work_by_absolute_path(self, generated_project, bench):
+        tik, project_path, summary = generated_project
+        scene_paths = summary["scene_paths"][::max(len(summary["scene_paths"]) // 50, 1)]
+        found = bench.pedantic(
+            lambda: [tik.project.find_work_by_absolute_path(path) for path in scene_paths],
+            setup=_reset_project(tik, project_path),
+            rounds=BENCHMARK_ROUNDS,
+        )
+        assert all(work for work, _version in found)
+
+    def test_standalone_publish(self, generated_project, bench):
+        tik, project_path, _summary = generated_project
+        tik.set_project(project_path)
+        task = _all_tasks(tik.project)[0]
+        work = next(iter(task.categories.values())).create_work("benchmark_publish")
+        publisher = tik.project.snapshot_publisher
+
+        def _publish():
+            publisher.work_object = work
+            publisher.work_version = work.get_last_version()
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            return publisher.publish(notes="benchmark")
+
+        bench.pedantic(_publish, rounds=BENCHMARK_ROUNDS)
+        assert len(work.publish.scan_publish_versions()) == BENCHMARK_ROUNDS
@@ -0,0 +1,155 @@
+"""Offline synthetic project generator for the stress tests and benchmarks.
+
+Projects are built through the public Project, Category and
+SnapshotPublisher APIs, so the generated files are the same as the ones
+created by the users. The names come from a seeded random generator,
+so the same seed and size always give the same project.
+
+Example:
+    generator = ProjectGenerator(tik, seed=4, subprojects=20, works=3)
+    summary = generator.generate("/path/to/project")
+"""
+
+import random
+
+SYLLABLES = (
+    "ba", "ce", "di", "fo", "gu", "ha", "ke", "li", "mo", "nu",
+    "pa", "qe", "ri", "so", "tu", "va", "we", "xi", "yo", "zu",
+    "bra", "cle", "dro", "fli", "gra", "kro", "pla", "ste", "tri", "vor",
+)
+
+
+class NameGenerator:
+    """Seeded generator of unique pronounceable names."""
+
+    def __init__(self, seed=0):
+        """Initialize the NameGenerator.
+
+        Args:
+            seed (int): Seed of the random generator.
+        """
+        self._random = random.Random(seed)
+        self._used = set()
+
+    def __call__(self, min_syllables=2, max_syllables=4):
+        """Return a new unique name."""
+        while True:
+            count = self._random.randint(min_syllables, max_syllables)
+            name = "".join(self._random.choice(SYLLABLES) for _ in range(count))
+            name = name.capitalize()
+            if name not in self._used:
+                self._used.add(name)
+                return name
+
+
+class ProjectGenerator:
+    """Build synthetic projects of configurable size."""
+
+    def __init__(
+        self,
+        tik,
+        seed=0,
+        groups=("Assets", "Shots"),
+        subprojects=4,
+        tasks=2,
+        categories=("Model", "Rig"),
+        works=2,
+        versions=2,
+        publishes=1,
+    ):
+        """Initialize the ProjectGenerator.
+
+        Args:
+            tik (tik_manager4.objects.main.Main): The main object. An admin
+                user must be set.
+            seed (int): Seed of the names.
+            groups (tuple): Top level subprojects.
+            subprojects (int): Number of subprojects under each group.
+            tasks (int): Number of tasks under each subproject.
+            categories (tuple): Categories of each task.
+            works (int): Number of works under each category.
+            versions (int): Number of versions of each work.
+            publishes (int): Number of publishes of each work.
+        """
+        self.tik = tik
+        self.seed = seed
+        self.groups = groups
+        self.subprojects = subprojects
+        self.tasks = tasks
+        self.categories = list(categories)
+        self.works = works
+        self.versions = versions
+        self.publishes = publishes
+        self.name = NameGenerator(seed)
+
+    @property
+    def size(self):
+        """Dictionary of the size parameters."""
+        return {
+            "seed": self.seed,
+            "groups": len(self.groups),
+            "subprojects": self.subprojects,
+            "tasks": self.tasks,
+            "categories": len(self.categories),
+            "works": self.works,
+            "versions": self.versions,
+            "publishes": self.publishes,
+        }
+
+    def generate(self, project_path):
+        """Create the project and fill it.
+
+        Args:
+            project_path (str): Absolute path of the new project.
+
+        Returns:
+            dict: Counts of the created entities with the ids of the tasks
+                and the absolute paths of the work version scenes.
+        """
+        self.tik.create_project(project_path, structure_template="empty")
+        self.tik.set_project(project_path)
+        project = self.tik.project
+        summary = {
+            "subprojects": 0,
+            "tasks": 0,
+            "works": 0,
+            "versions": 0,
+            "publishes": 0,
+            "task_ids": [],
+            "scene_paths": [],
+        }
+        for group in self.groups:
+            project.create_sub_project(group, parent_path="")
+            for _ in range(self.subprojects):
+                sub = project.create_sub_project(self.name(), parent_path=group)
+                summary["subprojects"] += 1
+                for _ in range(self.tasks):
+                    task = project.create_task(
+                        self.name(), categories=self.categories, parent_path=sub.path
+                    )
+                    summary["tasks"] += 1
+                    summary["task_ids"].append(task.id)
+                    for category in task.categories.values():
+                        for _ in range(self.works):
+                            self._generate_work(category, summary)
+        return summary
+
+    def _generate_work(self, category, summary):
+        """Create a work with its versions and publishes."""
+        work = category.create_work(self.name(), notes="generated")
+        for _ in range(self.versions - 1):
+            work.new_version(notes="generated")
+        summary["works"] += 1
+        summary["versions"] += max(self.versions, 1)
+        summary["scene_paths"].extend(
+            work.get_abs_project_path(version.scene_path) for version in work.versions
+        )
+        publisher = self.tik.project.snapshot_publisher
+        for _ in range(self.publishes):
+            publisher.work_object = work
+            publisher.work_version = work.get_last_version()
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            publisher.publish(notes="generated")
+            summary["publishes"] += 1
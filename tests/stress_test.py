@@ -6,19 +6,16 @@ import shutil
 from pathlib import Path
 
 import pytest
-import requests
 
 from tik_manager4.core import filelog, utils
+from tests.project_generator import NameGenerator
 
 if os.getenv("TIK_MANAGER4_RUN_STRESS_TESTS") != "1":
     pytest.skip("Stress tests are opt-in only.", allow_module_level=True)
 
 log = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
-word_site = "https://www.mit.edu/~ecprice/wordlist.10000"
-
-response = requests.get(word_site, timeout=15)
-WORDS = response.content.splitlines()
+WORDS = NameGenerator(seed=int(os.getenv("TIK_MANAGER4_STRESS_SEED", "0")))
 
 # @pytest.mark.usefixtures("clean_user")
 # @pytest.mark.usefixtures("prepare")
@@ -54,9 +51,8 @@ class TestStress:
         publish_iteration = 4
         parent_paths = ["Assets/Characters", "Assets/Props", "Assets/Environment", "Assets/Vehicles"]
         for sub_asset in parent_paths:
-            random_int_list = [random.randint(0, 9999) for x in range(subproject_iteration)]
-            for x in random_int_list:
-                word = WORDS[x].decode("utf-8")
+            for _ in range(subproject_iteration):
+                word = WORDS()
                 sub = tik.project.create_sub_project(word, parent_path=sub_asset)
                 # create 5 task for each sub
                 if sub == -1:
@@ -1,7 +1,13 @@
 """Tests for core modules."""
+import errno
+import hashlib
+import math
 import sys
 import time
 import os
+import stat
+import subprocess
+import shutil
 import pytest
 from unittest.mock import patch, MagicMock
 import platform
@@ -9,11 +15,16 @@ import codecs
 from pathlib import Path
 from tik_manager4.core import filelog
 from tik_manager4.core import io
+from tik_manager4.core import index
+from tik_manager4.core import scanner
+from tik_manager4.core import watcher
 from tik_manager4.core import settings
+from tik_manager4.core import trace
 from tik_manager4.core import utils
 from tik_manager4.external import fileseq
 from tik_manager4.external.filelock import FileLock, Timeout
 from tik_manager4.core.cli import FeedbackCLI
+from tik_manager4.core.constants import BranchMaterialization
 from tik_manager4.core.settings import Settings
 from tik_manager4.core.cryptor import Cryptor, CryptorError
 import base64
@@ -66,6 +77,62 @@ def test_filelog(tmp_path: Path):
             }
     assert log.get_size() == nbytes_truth_per_system[platform.system()]
 
+def test_filelog_queue_rotation_and_level(tmp_path: Path):
+    """Test the queued writes, the rotation and the level of the log files."""
+    log = filelog.Filelog(logname="rotating", filename="rotating", filedir=str(tmp_path), size_cap=1000)
+    for number in range(100):
+        log.info(f"Message {number}")
+    log.error("Error without an exception")
+    assert log.get_last_message() == ("Error without an exception", "error")
+    filelog.flush()
+    assert (tmp_path / "rotating.log.1").is_file()
+    assert not (tmp_path / f"rotating.log.{filelog.LOG_BACKUP_COUNT + 1}").exists()
+    contents = (tmp_path / "rotating.log").read_text()
+    assert "Error without an exception" in contents
+    assert "NoneType" not in contents
+
+    log = filelog.Filelog(logname="warnings", filename="warnings", filedir=str(tmp_path), level="WARNING")
+    log.info("Info message")
+    log.warning("Warning message")
+    try:
+        raise ValueError("Test exception")
+    except ValueError:
+        log.error("Error while handling")
+    filelog.flush()
+    contents = (tmp_path / "warnings.log").read_text()
+    assert "Info message" not in contents
+    assert "Warning message" in contents
+    assert "ValueError: Test exception" in contents
+
+def test_filelog_resolves_the_directory_once(tmp_path: Path, monkeypatch):
+    """Test the log directory is probed once and the file opened once."""
+    probes = []
+    original_probe = filelog.Filelog._probe_log_dir
+
+    def _counting_probe(filedir, home_dir):
+        probes.append(filedir)
+        return original_probe(filedir, home_dir)
+
+    monkeypatch.setattr(filelog.Filelog, "_probe_log_dir", staticmethod(_counting_probe))
+    logs = [filelog.Filelog(logname=f"module_{number}", filename="cached", filedir=str(tmp_path)) for number in range(20)]
+    assert len(probes) == 1
+    assert all(log.file_dir == tmp_path for log in logs)
+    assert not list(tmp_path.glob(".tik_manager4_write_test"))
+
+    logs[-1].info("Shared file")
+    filelog.flush()
+    contents = (tmp_path / "cached.log").read_text()
+    # only the first object writes the welcome message.
+    assert "module_0" in contents
+    assert "module_19" not in contents
+    assert "Shared file" in contents
+
+    # a different home directory resolves the directory again.
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    filelog.Filelog(logname="other_home", filename="cached", filedir=str(tmp_path))
+    assert len(probes) == 2
+
 def test_creating_a_settings_object_with_and_without_arguments(tmp_path):
     """Test settings module"""
     # create a settings object without any arguments
@@ -271,6 +338,390 @@ def test_io(tmp_path):
     # test reading corrupted file
     pytest.raises(Exception, _io.read)
 
+def test_io_atomic_write_and_lock_release(tmp_path, monkeypatch):
+    """Test the writes release the lock and break the stale locks."""
+    file_path = tmp_path / "atomic.json"
+    _io = io.IO(file_path=str(file_path))
+    _io.write({"version": 1})
+    os.chmod(file_path, 0o640)
+    _io.write({"version": 2})
+    assert stat.S_IMODE(os.stat(file_path).st_mode) == 0o640
+    assert not list(tmp_path.glob("*.tmp"))
+
+    # the lock is released right after the write
+    _lock = FileLock(str(tmp_path / "atomic.json.lock"))
+    _lock.acquire(blocking=False)
+    _lock.release()
+
+    # a soft lock left over from a crashed writer is broken
+    io.LOCK_STATS.reset_stats()
+    monkeypatch.setattr(io, "LOCK_TIMEOUT", 0.2)
+    monkeypatch.setattr(io.fl, "FileLock", io.fl.SoftFileLock)
+    os.remove(tmp_path / "atomic.json.lock")
+    _lock = io.fl.SoftFileLock(str(tmp_path / "atomic.json.lock"))
+    _lock.acquire()
+    past = time.time() - io.STALE_LOCK_AGE - 10
+    os.utime(tmp_path / "atomic.json.lock", (past, past))
+    _io.write({"version": 3})
+    _lock.release()
+    assert _io.read() == {"version": 3}
+    stats = io.LOCK_STATS.stats()
+    assert stats["stale_breaks"] == 1
+    assert stats["contended"] == 1
+    assert stats["timeouts"] == 0
+
+    # only one of the waiters breaks the stale lock
+    lock_path = tmp_path / "atomic.json.lock"
+    lock_path.write_text("")
+    os.utime(lock_path, (past, past))
+    assert io._break_stale_lock(str(lock_path))
+    assert not io._break_stale_lock(str(lock_path))
+    # the new lock of the first waiter is kept
+    lock_path.write_text("")
+    assert not io._break_stale_lock(str(lock_path))
+    assert lock_path.exists()
+    assert not list(tmp_path.glob("*.stale"))
+
+
+_HAMMER_SCRIPT = """
+import json
+import sys
+from tik_manager4.core import io
+
+path, writer, count = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+handler = io.IO(path)
+for number in range(count):
+    handler.write({"writer": writer, "number": number, "payload": ["x" * 64] * 200})
+print(json.dumps(io.LOCK_STATS.stats()))
+"""
+
+
+def test_io_concurrent_writers(tmp_path):
+    """Hammer a single work file from many processes."""
+    file_path = tmp_path / "hammer.twork"
+    io.IO(str(file_path)).write({"writer": -1, "number": -1, "payload": ["x" * 64] * 200})
+    writers, count = 8, 25
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", _HAMMER_SCRIPT, str(file_path), str(writer), str(count)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=str(Path(__file__).parent.parent),
+        )
+        for writer in range(writers)
+    ]
+    reads = 0
+    while any(process.poll() is None for process in processes):
+        # readers never see a partially written file
+        with open(file_path, "r") as _file:
+            data = json.load(_file)
+        assert len(data["payload"]) == 200
+        reads += 1
+
+    acquired = 0
+    for process in processes:
+        stdout, stderr = process.communicate()
+        assert process.returncode == 0, stderr.decode()
+        stats = json.loads(stdout.decode().strip().splitlines()[-1])
+        assert stats["timeouts"] == 0
+        acquired += stats["acquired"]
+    assert acquired == writers * count
+    assert reads
+    assert json.loads(file_path.read_text())["number"] == count - 1
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.parametrize("backend", list(io.SERIALIZERS))
+def test_io_serializers(tmp_path, monkeypatch, backend):
+    """Test the json backends and the compact files."""
+    serializer = io.get_serializer(backend)
+    if serializer.name != backend:
+        pytest.skip(f"{backend} is not installed")
+    monkeypatch.setattr(io, "SERIALIZER", serializer)
+    monkeypatch.setattr(io, "COMPACT_SERIALIZER", serializer)
+    data = {"name": "çağ", "versions": [{"version_number": 1, "scale": 0.5}], "nested": {}}
+    pretty_path = tmp_path / "pretty" / "data.json"
+    compact_path = tmp_path / "compact" / "data.json"
+    io.set_compact(str(tmp_path / "compact"))
+    try:
+        io.IO(str(pretty_path)).write(data)
+        io.IO(str(compact_path)).write(data)
+    finally:
+        io.set_compact(str(tmp_path / "compact"), False)
+    assert "\n" in pretty_path.read_text(encoding="utf-8")
+    assert "\n" not in compact_path.read_text(encoding="utf-8")
+    io.READ_CACHE.invalidate()
+    assert io.IO(str(pretty_path)).read() == data
+    assert io.IO(str(compact_path)).read() == data
+    # files are interchangeable between the backends
+    assert json.loads(compact_path.read_text(encoding="utf-8")) == data
+
+    corrupted_path = tmp_path / "corrupted.json"
+    corrupted_path.write_text('{"name": ', encoding="utf-8")
+    with pytest.raises(Exception, match="Corrupted file"):
+        io.IO(str(corrupted_path)).read()
+
+
+def test_io_default_serializer(tmp_path, monkeypatch):
+    """Test the files are written like the standard library by default."""
+    serializer = io.get_serializer()
+    assert serializer.name == "json"
+    monkeypatch.setattr(io, "SERIALIZER", serializer)
+    data = {"name": "çağ", "scale": float("nan")}
+    file_path = tmp_path / "data.json"
+    io.IO(str(file_path)).write(data)
+    assert file_path.read_bytes() == json.dumps(data, indent=4).encode("utf-8")
+    io.READ_CACHE.invalidate()
+    assert math.isnan(io.IO(str(file_path)).read()["scale"])
+
+
+def test_io_read_cache(tmp_path):
+    """Test the mtime/size validated read cache of the io module."""
+    file_path = tmp_path / "cached.json"
+    _io = io.IO(file_path=str(file_path))
+    _io.write({"key": ["value"]})
+    io.READ_CACHE.reset_stats()
+
+    first = _io.read()
+    second = _io.read()
+    assert first == second == {"key": ["value"]}
+    assert io.READ_CACHE.stats()["hits"] == 2
+
+    # returned data must be a copy. Mutating it should not poison the cache.
+    first["key"].append("mutated")
+    assert _io.read() == {"key": ["value"]}
+
+    # changing the file from outside invalidates the entry
+    with open(file_path, "w") as f:
+        json.dump({"key": ["changed", "by", "someone", "else"]}, f)
+    assert _io.read() == {"key": ["changed", "by", "someone", "else"]}
+    assert io.READ_CACHE.stats()["misses"] == 1
+
+    # the cache is bounded
+    cache = io.ReadCache(max_size=2)
+    for nmb in range(3):
+        cache.put(str(nmb), (0, 0), {"nmb": nmb})
+    assert cache.stats()["size"] == 2
+    assert cache.get("0", (0, 0)) is None
+    assert cache.get("2", (0, 0)) == {"nmb": 2}
+    assert cache.get("2", (1, 0)) is None
+
+def test_metadata_index(tmp_path):
+    """Test the metadata index is updated by the io module and can be rebuilt."""
+    database_root = tmp_path / "tikDatabase"
+    task_path = database_root / "Assets" / "hero.ttask"
+    work_path = database_root / "Assets" / "hero" / "Model" / "maya" / "hero_Model.twork"
+    publish_path = database_root / "Assets" / "hero" / "Model" / "maya" / "publish" / "hero_Model" / "hero_Model_v001.tpub"
+    io.IO(file_path=str(task_path)).write({"task_id": 1, "subproject_id": 2, "name": "hero"})
+
+    # nothing is indexed while the index is not active
+    _index = index.activate(str(database_root))
+    try:
+        assert _index.exists
+        assert [p.name for p in _index.query_paths("task", folder="Assets")] == ["hero.ttask"]
+
+        io.IO(file_path=str(work_path)).write(
+            {"work_id": 3, "task_id": 1, "name": "hero_Model", "category": "Model",
+             "versions": [{"version_number": 1}, {"version_number": 2}]}
+        )
+        io.IO(file_path=str(publish_path)).write(
+            {"publish_id": 4, "task_id": 1, "name": "hero_Model", "version_number": 1}
+        )
+        # a non entity file is not indexed
+        io.IO(file_path=str(database_root / "Assets" / "settings.json")).write({"a": 1})
+
+        works = _index.query("work", folder="Assets/hero/Model", recursive=True)
+        assert len(works) == 1
+        assert works[0]["uid"] == 3
+        assert works[0]["version"] == 2
+        assert _index.query("work", folder="Assets/hero/Model") == []
+        # underscores and similar names must not leak into recursive queries
+        assert _index.query("work", folder="Assets/her", recursive=True) == []
+        assert len(_index.query("publish", parent_id=1)) == 1
+
+        _index.remove(str(publish_path))
+        assert _index.query("publish") == []
+
+        # rebuilding brings back everything from the files
+        assert index.rebuild_index(str(database_root)) == 3
+        assert _index.query("work")[0]["version"] == 2
+
+        # including the journaled versions of the works
+        io.IO(file_path=str(work_path)).write(
+            {"work_id": 3, "task_id": 1, "name": "hero_Model", "category": "Model",
+             "versions": [{"version_number": 1}], "version_journal": True}
+        )
+        Path(f"{work_path}.journal").write_text(
+            '{"version_number": 2}\n{"version_number": 3}\n'
+        )
+        assert index.rebuild_index(str(database_root)) == 3
+        assert _index.query("work")[0]["version"] == 3
+        assert len(_index.query("publish", folder="Assets/hero/Model/maya/publish/hero_Model")) == 1
+    finally:
+        index.deactivate(str(database_root))
+    assert index.get_index(str(database_root)) is None
+
+def test_scan_directory(tmp_path):
+    """Test the directory scanner collects the files with their modified times."""
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    top = tmp_path / "top.twork"
+    deep = tmp_path / "a" / "b" / "deep.twork"
+    for path in (top, deep, tmp_path / "a" / "other.ttask"):
+        path.write_text("{}")
+    (tmp_path / "a" / "folder.twork").mkdir()
+
+    entries = scanner.scan_directory(str(tmp_path), ".twork")
+    assert entries == [scanner.ScanEntry(top, top.stat().st_mtime)]
+
+    entries = scanner.scan_directory(str(tmp_path), ".twork", recursive=True)
+    assert sorted(entry.path for entry in entries) == sorted([top, deep])
+
+    assert scanner.scan_directory(str(tmp_path / "missing"), ".twork") == []
+
+    # the scanned modified time can be fed to settings objects
+    _settings = Settings(file_path=str(top))
+    assert not _settings.is_modified(top.stat().st_mtime)
+    assert _settings.is_modified(top.stat().st_mtime + 1)
+
+def test_scan_cache(tmp_path, monkeypatch):
+    """Test unchanged folders are not listed again."""
+    cache = scanner.ScanCache()
+    monkeypatch.setattr(scanner, "SCAN_CACHE", cache)
+    work = tmp_path / "hero.twork"
+    work.write_text("{}")
+    old = time.time() - 60
+    os.utime(tmp_path, (old, old))
+
+    assert len(scanner.scan_directory(str(tmp_path), ".twork")) == 1
+    assert len(scanner.scan_directory(str(tmp_path), ".twork")) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # adding a file changes the folder signature
+    (tmp_path / "villain.twork").write_text("{}")
+    assert len(scanner.scan_directory(str(tmp_path), ".twork")) == 2
+    assert cache.misses == 2
+    # recently modified folders are never trusted
+    assert len(scanner.scan_directory(str(tmp_path), ".twork")) == 2
+    assert cache.misses == 3
+
+    # rewriting a file through io bumps the folder
+    os.utime(tmp_path, (old, old))
+    scanner.scan_directory(str(tmp_path), ".twork")
+    io.IO(file_path=str(work)).write({"a": 1})
+    assert tmp_path.stat().st_mtime > old
+    assert scanner.scan_directory(str(tmp_path), ".twork")
+    assert cache.misses == 5
+
+    # an in-place rewrite keeps the folder signature but not the file mtime
+    os.utime(tmp_path, (old, old))
+    scanner.scan_directory(str(tmp_path), ".twork")
+    with open(work, "r+") as _file:
+        _file.write("{ }")
+    os.utime(work, (old + 30, old + 30))
+    os.utime(tmp_path, (old, old))
+    misses = cache.misses
+    # the unchanged signature is trusted without stat-ing the files
+    with patch.object(scanner.os, "stat", wraps=os.stat) as stat_mock:
+        scanner.scan_directory(str(tmp_path), ".twork")
+    assert stat_mock.call_count == 1
+    # the files are stat-ed again only if asked for
+    cache.restat = True
+    mtimes = {
+        entry.path: entry.mtime
+        for entry in scanner.scan_directory(str(tmp_path), ".twork")
+    }
+    assert mtimes[work] == old + 30
+    assert cache.misses == misses
+    cache.restat = False
+
+    # within the trust window the folder is not even checked
+    os.utime(tmp_path, (old, old))
+    cache.trust_window = 60
+    scanner.scan_directory(str(tmp_path), ".twork")
+    (tmp_path / "sidekick.twork").write_text("{}")
+    assert len(scanner.scan_directory(str(tmp_path), ".twork")) == 2
+    cache.trust_window = 0
+    assert len(scanner.scan_directory(str(tmp_path), ".twork")) == 3
+
+def test_database_watcher_poll(tmp_path):
+    """Test the watcher reports the changed entity files of the scanned folders."""
+    database_watcher = watcher.DatabaseWatcher(str(tmp_path), interval=60)
+    (tmp_path / "Assets").mkdir()
+    task = tmp_path / "Assets" / "hero.ttask"
+    task.write_text("{}")
+    (tmp_path / "Assets" / "notes.txt").write_text("")
+    work_folder = tmp_path / "Assets" / "hero" / "Model"
+    work_folder.mkdir(parents=True)
+    other_folder = tmp_path / "Shots"
+    other_folder.mkdir()
+    database_watcher.start()
+    try:
+        # only the folders listed by the scanner are polled
+        assert len(scanner.scan_directory(str(tmp_path / "Assets"), ".ttask")) == 1
+        assert scanner.scan_directory(str(work_folder), ".twork") == []
+        assert database_watcher.poll() == []
+
+        work = work_folder / "hero_Model.twork"
+        work.write_text("{}")
+        (tmp_path / "Assets" / "notes.txt").write_text("ignored")
+        (other_folder / "shot.ttask").write_text("{}")
+        assert database_watcher.poll() == [watcher.WatchEvent(str(work), "created")]
+
+        # versions journaled next to the work file
+        work_journal = work_folder / "hero_Model.twork.journal"
+        work_journal.write_text("{}\n")
+        assert database_watcher.poll() == [
+            watcher.WatchEvent(str(work_journal), "created")
+        ]
+
+        io.IO(file_path=str(task)).write({"a": 1})
+        assert database_watcher.poll() == [watcher.WatchEvent(str(task), "modified")]
+
+        # rewritten in place without changing the folder
+        folder_times = (task.parent.stat().st_atime_ns, task.parent.stat().st_mtime_ns)
+        with open(task, "r+") as _file:
+            _file.write("{ }")
+        os.utime(task, (time.time() + 5, time.time() + 5))
+        os.utime(task.parent, ns=folder_times)
+        assert database_watcher.poll() == [watcher.WatchEvent(str(task), "modified")]
+
+        shutil.rmtree(tmp_path / "Assets" / "hero")
+        assert sorted(database_watcher.poll()) == [
+            watcher.WatchEvent(str(work), "deleted"),
+            watcher.WatchEvent(str(work_journal), "deleted"),
+        ]
+        assert database_watcher.pop_dirty() == {str(work_folder), str(task.parent)}
+        assert database_watcher.pop_dirty() == set()
+    finally:
+        database_watcher.stop()
+
+def test_database_watcher_with_metadata_index(tmp_path):
+    """Test the watcher polls the folders queried from the metadata index."""
+    database_root = tmp_path / "tikDatabase"
+    work_folder = database_root / "Assets" / "hero" / "Model"
+    work = work_folder / "hero_Model.twork"
+    _index = index.activate(str(database_root))
+    database_watcher = watcher.DatabaseWatcher(str(database_root), interval=60)
+    database_watcher.start()
+    try:
+        io.IO(file_path=str(work)).write({"work_id": 1, "name": "hero_Model"})
+        entries = _index.query_entries("work", folder="Assets/hero/Model")
+        assert [entry.path for entry in entries] == [work]
+        assert _index.query_entries("task", folder="Assets") == []
+        assert database_watcher.poll() == []
+
+        other_work = work_folder / "other_Model.twork"
+        io.IO(file_path=str(other_work)).write({"work_id": 2, "name": "other_Model"})
+        task = database_root / "Assets" / "hero.ttask"
+        io.IO(file_path=str(task)).write({"task_id": 3, "name": "hero"})
+        assert sorted(database_watcher.poll()) == [
+            watcher.WatchEvent(str(task), "created"),
+            watcher.WatchEvent(str(other_work), "created"),
+        ]
+    finally:
+        database_watcher.stop()
+        index.deactivate(str(database_root))
+
 def test_getting_home_dir(monkeypatch):
     """Test the utils module."""
     # test get_home_dir
@@ -635,4 +1086,391 @@ def test_copy_data():
 
     # Ensure the copied data is a deep copy (modifying it should not affect the original)
     copied_data["key2"]["subkey"] = "new_subvalue"
-    assert settings.get_property("key2")["subkey"] == "subvalue"
\ No newline at end of file
+    assert settings.get_property("key2")["subkey"] == "subvalue"
+def test_trace(tmp_path, monkeypatch):
+    """Test the tracing spans and the exports."""
+    def _function(value):
+        return value * 2
+
+    # disabled tracing leaves the functions untouched
+    monkeypatch.setattr(trace, "ENABLED", False)
+    assert trace.traced()(_function) is _function
+    assert trace.span("disabled") is trace.span("disabled")
+
+    monkeypatch.setattr(trace, "ENABLED", True)
+    monkeypatch.setattr(trace, "TRACER", trace.Tracer())
+    traced_function = trace.traced("double", category="test")(_function)
+    assert traced_function(2) == 4
+    assert traced_function(3) == 6
+    with trace.span("block", category="test"):
+        time.sleep(0.01)
+
+    rows = {row["name"]: row for row in trace.TRACER.summary()}
+    assert rows["double"]["count"] == 2
+    assert rows["block"]["total"] >= 0.01
+    assert "double" in trace.TRACER.format_summary()
+
+    trace_file = tmp_path / "trace.json"
+    trace.TRACER.write_chrome_trace(str(trace_file))
+    events = json.loads(trace_file.read_text())["traceEvents"]
+    assert [event["name"] for event in events] == ["double", "double", "block"]
+    assert all(event["ph"] == "X" and event["cat"] == "test" for event in events)
+    assert events[2]["dur"] >= 10000
+
+@pytest.mark.parametrize("mode", [mode.value for mode in BranchMaterialization])
+def test_materialize(tmp_path, mode):
+    """Test materializing files and bundles with the branch modes."""
+    source = tmp_path / "publish" / "v001.abc"
+    source.parent.mkdir()
+    source.write_text("version 1")
+    bundle = tmp_path / "publish" / "bundle_v001"
+    (bundle / "textures").mkdir(parents=True)
+    (bundle / "textures" / "diffuse.exr").write_text("diffuse")
+    (bundle / "scene.ma").write_text("scene")
+
+    target = tmp_path / "LIVE" / "ELEMENT_live.abc"
+    state, msg = utils.materialize(str(source), str(target), mode=mode)
+    assert state, msg
+    assert target.read_text() == "version 1"
+    if mode == BranchMaterialization.HARDLINK.value:
+        assert os.path.samefile(source, target)
+    if mode == BranchMaterialization.SYMLINK.value:
+        assert target.is_symlink()
+        assert not os.path.isabs(os.readlink(target))
+
+    # replacing the branch must not change the previously published file
+    new_source = tmp_path / "publish" / "v002.abc"
+    new_source.write_text("version 2")
+    assert utils.materialize(str(new_source), str(target), mode=mode)[0]
+    assert target.read_text() == "version 2"
+    assert source.read_text() == "version 1"
+
+    bundle_target = tmp_path / "LIVE" / "BUNDLE_live"
+    (bundle_target / "stale").mkdir(parents=True)
+    assert utils.materialize(str(bundle), str(bundle_target), mode=mode)[0]
+    assert (bundle_target / "textures" / "diffuse.exr").read_text() == "diffuse"
+    assert (bundle_target / "scene.ma").read_text() == "scene"
+    assert not (bundle_target / "stale").exists()
+
+    assert utils.materialize(str(tmp_path / "missing"), str(target), mode=mode)[0] is False
+
+def test_materialize_falls_back_to_copy(tmp_path, monkeypatch):
+    """Test the unsupported modes fall back to copying."""
+    def _unsupported(*_args, **_kwargs):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", _unsupported)
+    source = tmp_path / "source.fbx"
+    source.write_text("data")
+    target = tmp_path / "LIVE" / "target.fbx"
+    state, msg = utils.materialize(str(source), str(target), mode=BranchMaterialization.HARDLINK.value)
+    assert state
+    assert "Copy" in msg
+    assert target.read_text() == "data"
+    assert not os.path.samefile(source, target)
+
+def test_materialize_keeps_protected_links(tmp_path, monkeypatch):
+    """Test replacing a hardlinked branch keeps the published file protected."""
+    real_remove = os.remove
+
+    def _remove(path, *args, **kwargs):
+        # read-only files cannot be removed on Windows.
+        if not os.lstat(path).st_mode & stat.S_IWUSR:
+            raise PermissionError(errno.EACCES, "Access is denied", str(path))
+        return real_remove(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "remove", _remove)
+    monkeypatch.setattr(os, "unlink", _remove)
+    source = tmp_path / "publish" / "v001.abc"
+    source.parent.mkdir()
+    source.write_text("version 1")
+    target = tmp_path / "LIVE" / "ELEMENT_live.abc"
+    hardlink = BranchMaterialization.HARDLINK.value
+    assert utils.materialize(str(source), str(target), mode=hardlink)[0]
+    utils.write_protect(source)
+    new_source = tmp_path / "publish" / "v002.abc"
+    new_source.write_text("version 2")
+    assert utils.materialize(str(new_source), str(target), mode=hardlink)[0]
+    assert target.read_text() == "version 2"
+    assert stat.S_IMODE(os.stat(source).st_mode) == 0o444
+    # the link which cannot be removed is left aside
+    assert len(list(target.parent.glob("*.tik_removed"))) == 1
+    # and removed by the next materialize once its other links are gone
+    assert utils.materialize(str(source), str(target), mode=hardlink)[0]
+    assert len(list(target.parent.glob("*.tik_removed"))) == 1
+    assert utils.materialize(str(new_source), str(target), mode=hardlink)[0]
+    assert len(list(target.parent.glob("*.tik_removed"))) == 2
+    os.chmod(source, 0o777)
+    real_remove(source)
+    assert utils.delete(target)[0]
+    assert list(target.parent.glob("*.tik_removed")) == []
+
+    # a file without other links is unprotected and removed
+    lone_file = tmp_path / "lone.abc"
+    lone_file.write_text("lone")
+    utils.write_protect(lone_file)
+    utils._remove_file(str(lone_file))
+    assert not lone_file.exists()
+
+def test_copy_engine(tmp_path, monkeypatch):
+    """Test copying trees and big files with the copy engine."""
+    from tik_manager4.core import copier
+
+    source = tmp_path / "udims"
+    for index in range(50):
+        udim = source / f"set_{index % 3}" / f"diffuse.{1001 + index}.exr"
+        udim.parent.mkdir(parents=True, exist_ok=True)
+        udim.write_bytes(os.urandom(1000 + index))
+    (source / "empty").mkdir()
+    big_file = source / "cache.abc"
+    big_file.write_bytes(os.urandom(300000))
+
+    calls = []
+    engine = copier.CopyEngine(workers=4, verify=True, big_file_size=100000, buffer_size=65536,
+                               progress=lambda done, total, path: calls.append((done, total)))
+    target = tmp_path / "copied"
+    stats = engine.copy(str(source), str(target))
+    assert stats.files == 51
+    assert stats.bytes == stats.total_bytes == sum(f.stat().st_size for f in source.rglob("*") if f.is_file())
+    assert calls[-1][0] == calls[-1][1] == stats.total_bytes
+    assert (target / "empty").is_dir()
+    for source_file in source.rglob("*.exr"):
+        assert (target / source_file.relative_to(source)).read_bytes() == source_file.read_bytes()
+    assert (target / "cache.abc").read_bytes() == big_file.read_bytes()
+    assert not list(target.rglob(f"*{copier.PART_SUFFIX}"))
+
+    # resuming skips the copied files and continues the partial big file
+    resumed_target = tmp_path / "resumed"
+    shutil.copytree(source / "set_0", resumed_target / "set_0", copy_function=shutil.copy2)
+    (resumed_target / f"cache.abc{copier.PART_SUFFIX}").write_bytes(big_file.read_bytes()[:150000])
+    stats = copier.CopyEngine(resume=True, big_file_size=100000).copy(str(source), str(resumed_target))
+    assert stats.skipped == len(list((source / "set_0").iterdir()))
+    assert (resumed_target / "cache.abc").read_bytes() == big_file.read_bytes()
+
+    # a source shrunk while it is copied does not leave a truncated file
+    shrunk_source = tmp_path / "shrunk_source.abc"
+    shrunk_source.write_bytes(big_file.read_bytes())
+    shrunk_target = tmp_path / "shrunk.abc"
+    engine = copier.CopyEngine(
+        big_file_size=100000, buffer_size=65536,
+        progress=lambda *_args: os.truncate(shrunk_source, 100000),
+    )
+    with pytest.raises(OSError):
+        engine.copy(str(shrunk_source), str(shrunk_target))
+    assert not shrunk_target.exists()
+    assert not Path(f"{shrunk_target}{copier.PART_SUFFIX}").exists()
+
+    # the moves across devices copy and remove the source
+    def _cross_device(*_args):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(copier.os, "rename", _cross_device)
+    moved = tmp_path / "moved"
+    assert utils.move(str(target), str(moved), verify=True)[0]
+    assert not target.exists()
+    assert (moved / "cache.abc").read_bytes() == big_file.read_bytes()
+
+    # a resumed move keeps what is already in the target
+    resumed_move = tmp_path / "resumed_move"
+    shutil.copytree(moved / "set_0", resumed_move / "set_0", copy_function=shutil.copy2)
+    (resumed_move / "kept.txt").write_text("kept")
+    assert utils.move(str(moved), str(resumed_move), resume=True)[0]
+    assert not moved.exists()
+    assert (resumed_move / "kept.txt").exists()
+    assert (resumed_move / "cache.abc").read_bytes() == big_file.read_bytes()
+
+def test_standalone_save_as(tmp_path, monkeypatch):
+    """Test the saved files do not keep the modified time of the source."""
+    monkeypatch.setenv("TIK_DCC", "standalone")
+    from tik_manager4.dcc.standalone.main import Dcc
+
+    source = tmp_path / "source.txt"
+    source.write_text("scene")
+    os.utime(source, (1000000000, 1000000000))
+    target = tmp_path / "saved.txt"
+    assert Dcc.save_as(str(target), source_path=str(source)) == str(target)
+    assert target.read_text() == "scene"
+    assert target.stat().st_mtime > source.stat().st_mtime
+
+def test_write_protect_folder(tmp_path):
+    """Test protecting and unprotecting all the files of a folder."""
+    bundle = tmp_path / "bundle"
+    for index in range(5):
+        (bundle / "sub").mkdir(parents=True, exist_ok=True)
+        (bundle / "sub" / f"file_{index}.txt").write_text("data")
+    assert utils.write_protect(bundle) == (True, "Write protection applied.")
+    modes = {stat.S_IMODE(path.stat().st_mode) for path in bundle.rglob("*.txt")}
+    assert modes == {0o444}
+    # the folders stay accessible
+    assert os.access(bundle / "sub", os.X_OK)
+    assert utils.write_unprotect(bundle) == (True, "Write protection removed.")
+    modes = {stat.S_IMODE(path.stat().st_mode) for path in bundle.rglob("*.txt")}
+    assert modes == {0o777}
+    assert utils.write_protect(tmp_path / "missing") is None
+
+def test_blob_store(tmp_path):
+    """Test storing the files by content and collecting the unused ones."""
+    from tik_manager4.core import blobstore
+    from tik_manager4.core import checksum
+
+    store = blobstore.BlobStore(tmp_path / ".tik_store")
+    content = os.urandom(5000)
+    bundles = []
+    for version in range(1, 4):
+        bundle = tmp_path / f"v{version:03d}" / "bundle"
+        (bundle / "textures").mkdir(parents=True)
+        (bundle / "textures" / "diffuse.1001.exr").write_bytes(content)
+        (bundle / "textures" / "diffuse.1002.exr").write_bytes(os.urandom(5000))
+        bundles.append(bundle)
+        stats = store.add(str(bundle), checksum.element_checksum(str(bundle)))
+        # the first texture is deduplicated after the first version
+        assert stats.stored == (2 if version == 1 else 1)
+        assert stats.deduplicated == (0 if version == 1 else 1)
+    assert len({(bundle / "textures" / "diffuse.1001.exr").stat().st_ino for bundle in bundles}) == 1
+    assert (bundles[0] / "textures" / "diffuse.1001.exr").stat().st_nlink == 4
+    assert all(checksum.verify(str(bundle), checksum.element_checksum(str(bundle))) for bundle in bundles)
+    assert not list(tmp_path.glob("**/*.tik_link"))
+
+    # adding again does not change anything
+    record = checksum.element_checksum(str(bundles[0]))
+    assert store.add(str(bundles[0]), record).skipped == 2
+    assert store.collect_garbage().removed == 0
+
+    shutil.rmtree(bundles[0].parent)
+    shutil.rmtree(bundles[1].parent)
+    stats = store.collect_garbage()
+    assert stats.removed == 2
+    assert stats.bytes == 10000
+    # the blobs of the last version are kept
+    assert len([path for path in Path(store.objects_folder).rglob("*") if path.is_file()]) == 2
+    shutil.rmtree(bundles[2].parent)
+    assert store.collect_garbage().removed == 2
+    assert not list(Path(store.objects_folder).iterdir())
+
+def test_sync_queue(tmp_path, monkeypatch):
+    """Test moving the items in the background and resuming the queue file."""
+    from tik_manager4.core import copier
+    from tik_manager4.core import sync_queue
+
+    local = tmp_path / "local"
+    origin = tmp_path / "origin"
+    for index in range(3):
+        element = local / f"element_{index}"
+        element.mkdir(parents=True)
+        (element / "cache.abc").write_bytes(os.urandom(1000))
+    finalized = []
+    queue = sync_queue.SyncQueue(
+        tmp_path / ".tik_sync", workers=2,
+        finalizer=lambda job: (finalized.append(job.job_id) or True, ""),
+    )
+    queue.start()
+    try:
+        events = []
+        pairs = [(local / f"element_{index}", origin / f"element_{index}") for index in range(3)]
+        job = queue.submit("publish", pairs, data={"version": 1}, callback=lambda _job, item: events.append(item))
+        assert queue.wait("publish", timeout=30)
+        assert job.status == sync_queue.DONE
+        assert job.count(sync_queue.DONE) == 3
+        assert finalized == ["publish"]
+        assert events[-1] is None
+        assert all((origin / f"element_{index}" / "cache.abc").is_file() for index in range(3))
+        assert not any(local.iterdir())
+        assert not Path(queue.queue_file).exists()
+
+        # the failed items are kept in the queue file and can be retried
+        missing = local / "missing.abc"
+        job = queue.submit("work", [(missing, origin / "missing.abc")])
+        assert queue.wait("work", timeout=30)
+        assert job.status == sync_queue.FAILED
+        assert len(job.errors) == 1
+        assert Path(queue.queue_file).exists()
+        missing.write_text("found")
+        queue.retry("work")
+        assert queue.wait("work", timeout=30)
+        assert job.status == sync_queue.DONE
+        assert finalized == ["publish", "work"]
+    finally:
+        queue.stop()
+
+    # a job interrupted by a crash is resumed by the next session
+    (local / "scene.ma").write_text("scene")
+    interrupted = sync_queue.SyncJob("crashed", [
+        sync_queue.SyncItem(local / "scene.ma", origin / "scene.ma", status=sync_queue.RUNNING,
+                            size=5000, transferred=5000),
+        sync_queue.SyncItem(local / "moved.ma", origin / "element_0" / "cache.abc", status=sync_queue.PENDING),
+    ])
+    io.IO(queue.queue_file).write({"jobs": [interrupted.to_dict()]})
+    resumed = sync_queue.SyncQueue(tmp_path / ".tik_sync", finalizer=queue.finalizer)
+    assert resumed.get_job("crashed").count(sync_queue.PENDING) == 2
+    # the resumed items are copied again, the throttle counts from zero
+    consumed = []
+    resumed.throttle.consume = consumed.append
+
+    def _cross_device(*_args):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(copier.os, "rename", _cross_device)
+    # the queue workers are the only threads moving the items
+    engine_workers = []
+    engine_init = copier.CopyEngine.__init__
+
+    def _engine_init(engine, *args, **kwargs):
+        engine_init(engine, *args, **kwargs)
+        engine_workers.append(engine.workers)
+
+    monkeypatch.setattr(copier.CopyEngine, "__init__", _engine_init)
+    resumed.start()
+    try:
+        assert resumed.wait(timeout=30)
+        assert consumed and min(consumed) >= 0
+        assert engine_workers and set(engine_workers) == {1}
+        assert resumed.get_job("crashed").status == sync_queue.DONE
+        assert (origin / "scene.ma").read_text() == "scene"
+        assert finalized[-1] == "crashed"
+    finally:
+        resumed.stop()
+
+    throttle = sync_queue.Throttle(bytes_per_second=1000000)
+    start = time.monotonic()
+    for _ in range(3):
+        throttle.consume(200000)
+    assert time.monotonic() - start >= 0.35
+
+def test_checksum(tmp_path, monkeypatch):
+    """Test the checksum records of files and bundles."""
+    from tik_manager4.core import checksum
+
+    single = tmp_path / "cache.abc"
+    single.write_bytes(os.urandom(100000))
+    bundle = tmp_path / "bundle"
+    for index in range(10):
+        udim = bundle / "textures" / f"diffuse.{1001 + index}.exr"
+        udim.parent.mkdir(parents=True, exist_ok=True)
+        udim.write_bytes(os.urandom(5000))
+    monkeypatch.setattr(checksum, "CHUNK_SIZE", 4096)
+
+    record = checksum.element_checksum(str(single))
+    assert record["algorithm"] == checksum.ALGORITHM
+    assert record["size"] == 100000
+    assert record["digest"] == checksum.file_digest(str(single))
+    assert checksum.verify(str(single), record)
+    # the streamed digest matches the digest of the whole file
+    blake = checksum.element_checksum(str(single), algorithm="blake2b")
+    assert blake["digest"] == hashlib.blake2b(single.read_bytes(), digest_size=16).hexdigest()
+
+    bundle_record = checksum.element_checksum(str(bundle), workers=4)
+    assert sorted(bundle_record["files"]) == [f"textures/diffuse.{1001 + index}.exr" for index in range(10)]
+    assert checksum.verify(str(bundle), bundle_record)
+    copied_bundle = tmp_path / "copied_bundle"
+    shutil.copytree(bundle, copied_bundle)
+    assert checksum.is_same(bundle_record, checksum.element_checksum(str(copied_bundle)))
+
+    # same sizes but different content
+    changed = copied_bundle / "textures" / "diffuse.1005.exr"
+    changed.write_bytes(os.urandom(5000))
+    assert not checksum.verify(str(copied_bundle), bundle_record)
+    changed.unlink()
+    assert not checksum.verify(str(copied_bundle), bundle_record)
+    assert not checksum.verify(str(tmp_path / "missing"), record)
+    assert not checksum.verify(str(single), dict(record, algorithm="unknown"))
+    assert not checksum.is_same(record, None)
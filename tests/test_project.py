@@ -1,5 +1,8 @@
 # pylint: skip-file
 """Tests for Project related functions"""
+import errno
+import os
+import stat
 import time
 from pathlib import Path
 import shutil
@@ -10,6 +13,9 @@ import pytest
 
 import tik_manager4
 from tik_manager4.core import settings
+from tik_manager4.core import blobstore
+from tik_manager4.core import checksum
+from tik_manager4.core import sync_queue
 from tik_manager4.core import utils
 
 
@@ -357,6 +363,36 @@ class TestProject:
         assert sub.find_sub_by_id(sub.id) == sub
         assert tik.project.find_sub_by_id(-999) == -1
 
+    def test_lookup_tables(self, project_manual_path, tik):
+        """Test the id and path lookup tables stay in sync with the tree."""
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        nested = tik.project.create_sub_project("nested", parent_uid=sub.id)
+        nested_task = tik.project.create_task(
+            "nested_task", categories=["Model"], parent_uid=nested.id
+        )
+        assert tik.project.find_sub_by_id(nested.id) == nested
+        assert tik.project.find_sub_by_path(nested.path) == nested
+        assert sub.find_sub_by_path(nested.path) == nested
+        assert nested.find_sub_by_id(sub.id) == -1
+        assert tik.project.find_task_by_id(nested_task.id) == nested_task
+        assert nested.find_task_by_id(task.id) == -1
+
+        # rebuilding a branch replaces the objects in the tables
+        tik.project.edit_sub_project(uid=sub.id, name="renamed_sub")
+        renamed = tik.project.find_sub_by_id(sub.id)
+        assert renamed.name == "renamed_sub"
+        rebuilt = tik.project.find_sub_by_id(nested.id)
+        assert rebuilt is not nested
+        assert rebuilt.parent_sub is renamed
+        assert tik.project.find_sub_by_path(nested.path) is rebuilt
+
+        # deleted tasks are only returned from their own subproject
+        assert renamed.delete_task(task.name)[0]
+        assert tik.project.find_task_by_id(task.id) == -1
+        assert renamed.find_task_by_id(task.id, query_all=True).deleted
+
     def test_find_subs_by_wildcard(self, project_manual_path, tik):
         test_project_path = self._create_a_shot_asset_project_structure(
             project_manual_path, tik, print_results=False
@@ -651,6 +687,461 @@ class TestProject:
         assert tik2.project.subs[sub.name].tasks != tik2.project.subs[sub.name].all_tasks
 
 
+    def test_scanning_with_metadata_index(self, project_manual_path, tik):
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        tik.project.settings.add_property("metadata_index", True)
+        tik.project.settings.apply_settings(force=True)
+        tik.set_project(project_manual_path)
+        try:
+            assert tik.project.metadata_index is not None
+            sub = tik.project.subs[sub.name]
+            assert list(sub.scan_tasks().keys()) == ["test_task"]
+            task = sub.tasks["test_task"]
+            works = task.categories["Model"].scan_works()
+            assert [w.name for w in works.values()] == [work.name]
+
+            # new entities are picked up through the index
+            sub.add_task("second_task", categories=["Model"])
+            assert sorted(sub.scan_tasks().keys()) == ["second_task", "test_task"]
+            task.categories["Model"].create_work("other")
+            assert len(task.categories["Model"].scan_works()) == 2
+
+            # main task, two tasks and two works
+            assert tik.project.rebuild_index() == 5
+        finally:
+            tik.project.settings.edit_property("metadata_index", False)
+            tik.project.settings.apply_settings(force=True)
+            tik.set_project(project_manual_path)
+        assert tik.project.metadata_index is None
+
+    def test_incremental_structure_save(self, project_manual_path, tik, monkeypatch):
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        # only the folders of the changed branch are created
+        sub_folder = Path(tik.project.absolute_path, sub.path)
+        shutil.rmtree(sub_folder)
+        new_sub = tik.project.create_sub_project("new_sub", parent_path="")
+        assert Path(tik.project.absolute_path, new_sub.path).is_dir()
+        assert Path(tik.project.database_path, new_sub.path).is_dir()
+        assert not sub_folder.exists()
+        tik.project.create_folders(tik.project.absolute_path)
+
+        tik.project.settings.add_property("structure_journal", True)
+        tik.project.settings.apply_settings(force=True)
+        tik.set_project(project_manual_path)
+        structure_file = Path(tik.project.structure.settings_file)
+        journal = tik.project.structure_journal
+        try:
+            saved_structure = structure_file.read_text()
+            child = tik.project.create_sub_project("child", parent_path=sub.path)
+            tik.project.edit_sub_project(path=sub.path, mode="shot")
+            tik.project.delete_sub_project(path="new_sub")
+            assert structure_file.read_text() == saved_structure
+            assert len(journal) == 3
+            assert tik.project.structure.properties == tik.project.get_sub_tree()
+
+            # the journal is replayed on load
+            tik.set_project(project_manual_path)
+            reloaded = tik.project.find_sub_by_id(child.id)
+            assert reloaded.path == child.path
+            assert reloaded.parent_sub.metadata.get_value("mode") == "shot"
+            assert tik.project.subs["new_sub"].deleted
+
+            # and merged into the structure file when it reaches the limit
+            monkeypatch.setattr(
+                "tik_manager4.objects.project.STRUCTURE_JOURNAL_LIMIT", 3
+            )
+            tik.project.create_sub_project("compact", parent_path="")
+            journal = tik.project.structure_journal
+            assert len(journal) == 0
+            assert not Path(journal.file_path).exists()
+            tik.set_project(project_manual_path)
+            assert tik.project.find_sub_by_path("compact") != -1
+            assert tik.project.find_sub_by_id(child.id) != -1
+        finally:
+            tik.project.settings.edit_property("structure_journal", False)
+            tik.project.settings.apply_settings(force=True)
+
+    def test_compact_files(self, project_manual_path, tik):
+        from tik_manager4.core import io
+
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        tik.project.settings.add_property("compact_files", True)
+        tik.project.settings.apply_settings(force=True)
+        tik.set_project(project_manual_path)
+        try:
+            assert io.is_compact(work.settings_file)
+            work.new_version()
+            assert "\n" not in Path(work.settings_file).read_text()
+            io.READ_CACHE.invalidate()
+            assert len(io.IO(work.settings_file).read()["versions"]) == 2
+        finally:
+            io.set_compact(tik.project.absolute_path, False)
+
+    def test_resolver(self, project_manual_path, tik, monkeypatch):
+        from tik_manager4.objects.resolver import Resolver
+
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        tik.project.snapshot_publisher.work_object = work
+        tik.project.snapshot_publisher.work_version = 1
+        tik.project.snapshot_publisher.resolve()
+        tik.project.snapshot_publisher.reserve()
+        tik.project.snapshot_publisher.extract()
+        tik.project.snapshot_publisher.publish(notes="test")
+
+        set_project_calls = []
+        original_set_project = tik.set_project
+
+        def _set_project(path):
+            set_project_calls.append(path)
+            return original_set_project(path)
+
+        monkeypatch.setattr(tik, "set_project", _set_project)
+        resolver = Resolver(tik)
+        names = (project_manual_path, sub.path, task.name, "Model", work.name)
+        expected = work.publish.get_version(1).get_element_path(
+            "snapshot", relative=False
+        )
+        assert resolver.resolve(*names, 1, "snapshot") == expected
+        assert resolver.resolve(*names, "1", "snapshot") == expected
+        assert set_project_calls == []
+
+        # missing entities are resolved to None
+        assert resolver.resolve(*names, 99, "snapshot") is None
+        assert resolver.get_task(project_manual_path, sub.path, "missing") is None
+        assert resolver.get_version(*names, "NOT_A_VERSION") is None
+
+        # the project is set again if its structure is modified
+        structure_file = tik.project.structure.settings_file
+        mtime = os.path.getmtime(structure_file) + 10
+        os.utime(structure_file, (mtime, mtime))
+        assert resolver.resolve(*names, 1, "snapshot") == expected
+        assert len(set_project_calls) == 1
+        assert resolver.resolve(*names, 1, "snapshot") == expected
+        assert len(set_project_calls) == 1
+
+        # deleted entities are resolved to None
+        assert work.destroy()[0] == 1
+        assert resolver.get_publish(*names) is None
+        assert resolver.get_task(project_manual_path, sub.path, task.name)
+        assert task.destroy() == 1
+        assert resolver.get_task(project_manual_path, sub.path, task.name) is None
+
+    def test_branch_materialization(self, project_manual_path, tik):
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        tik.project.settings.add_property("branch_materialization", "Hardlink")
+        tik.project.settings.apply_settings(force=True)
+        publisher = tik.project.snapshot_publisher
+        for _ in range(2):
+            publisher.work_object = work
+            publisher.work_version = work.get_last_version()
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            publisher.publish(notes="test")
+
+        work.publish.scan_publish_versions()
+        latest = work.publish.get_version(2)
+        published_element = Path(latest.get_element_path("snapshot", relative=False))
+        live_element = next(latest._get_live_folder().glob("SNAPSHOT_*"))
+        # both versions have the same content, the LIVE link is kept
+        first_element = work.publish.get_version(1).get_element_path("snapshot", relative=False)
+        assert os.path.samefile(first_element, live_element)
+
+        assert latest.promote().state == ValidationState.SUCCESS
+        promoted_element = next(latest._get_promoted_folder().glob("SNAPSHOT_*"))
+        assert os.path.samefile(published_element, promoted_element)
+
+    def test_element_checksums(self, project_manual_path, tik):
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        publisher = tik.project.snapshot_publisher
+        for _ in range(2):
+            publisher.work_object = work
+            publisher.work_version = 1
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            publisher.publish(notes="test")
+        work.publish.scan_publish_versions()
+        first, second = work.publish.get_version(1), work.publish.get_version(2)
+
+        element = first.get_element_by_type("snapshot")
+        assert element["checksum"]["size"] > 0
+        assert first.verify_elements() == {"snapshot": True}
+        # the same work version is published twice
+        assert checksum.is_same(element["checksum"], second.get_element_by_type("snapshot")["checksum"])
+
+        # the LIVE branch is not rewritten for the same content
+        live_element = next(second._get_live_folder().glob("SNAPSHOT_*"))
+        live_inode = live_element.stat().st_ino
+        second.make_live()
+        assert live_element.stat().st_ino == live_inode
+
+        published_file = Path(first.get_element_path("snapshot", relative=False))
+        utils.write_unprotect(published_file)
+        published_file.write_text("corrupted")
+        assert first.verify_elements() == {"snapshot": False}
+
+    def test_content_store(self, project_manual_path, tik, monkeypatch):
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        tik.project.settings.add_property("content_store", True)
+        tik.project.settings.apply_settings(force=True)
+        publisher = tik.project.snapshot_publisher
+        for _ in range(2):
+            publisher.work_object = work
+            publisher.work_version = 1
+            publisher.resolve()
+            publisher.reserve()
+            publisher.extract()
+            publisher.publish(notes="test")
+        work.publish.scan_publish_versions()
+        first, second = work.publish.get_version(1), work.publish.get_version(2)
+        first_file = Path(first.get_element_path("snapshot", relative=False))
+        second_file = Path(second.get_element_path("snapshot", relative=False))
+        record = first.get_element_by_type("snapshot")["checksum"]
+        blob = Path(blobstore.BlobStore.for_project(tik.project.absolute_path).blob_path(
+            record["algorithm"], record["digest"]))
+        # the republished file is linked to the stored file
+        assert first_file.samefile(blob) and second_file.samefile(blob)
+        assert first.verify_elements() == {"snapshot": True}
+
+        # the publishes in the purgatory still use the stored file
+        for version_number in (2, 1):
+            assert work.publish.delete_version(version_number) == (1, "success")
+
+        # deleting one of the deduplicated versions keeps the other protected
+        linked_files = [
+            path for path in Path(tik.project.absolute_path).rglob("*")
+            if path.is_file() and path != blob and path.samefile(blob)
+        ]
+        assert len(linked_files) == 2
+        real_remove = os.remove
+
+        def _remove(path, *args, **kwargs):
+            # read-only files cannot be removed on Windows.
+            if not os.lstat(path).st_mode & stat.S_IWUSR:
+                raise PermissionError(errno.EACCES, "Access is denied", str(path))
+            return real_remove(path, *args, **kwargs)
+
+        with monkeypatch.context() as context:
+            context.setattr(os, "remove", _remove)
+            context.setattr(os, "unlink", _remove)
+            assert utils.delete(linked_files[0])[0]
+        assert not linked_files[0].exists()
+        assert stat.S_IMODE(os.stat(linked_files[1]).st_mode) == 0o444
+        assert blobstore.BlobStore.for_project(tik.project.absolute_path).collect_garbage().removed == 0
+        assert blob.exists()
+        # the store is not collected while the content store is disabled
+        tik.project.settings.edit_property("content_store", False)
+        with patch.object(blobstore.BlobStore, "collect_garbage") as collect_mock:
+            assert tik.purgatory.purge_origin()[0]
+        collect_mock.assert_not_called()
+        assert blob.exists()
+        tik.project.settings.edit_property("content_store", True)
+        state, msg = tik.purgatory.purge_origin()
+        assert state
+        assert "1 unused stored files removed" in msg
+        assert not blob.exists()
+
+    def test_localized_sync(self, project_manual_path, tik, tmp_path):
+        from tik_manager4.mixins import localize
+        from tik_manager4.objects.version import PublishVersion
+        from tik_manager4.objects.work import Work
+
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        local_cache = tmp_path / "local_cache"
+        for key, value in {
+            "enabled": True,
+            "local_cache_folder": str(local_cache),
+            "cache_works": True,
+            "cache_publishes": True,
+        }.items():
+            tik.user.localization.add_property(key, value)
+        work_version = work.new_version()
+        assert work_version.localized
+        publisher = tik.project.snapshot_publisher
+        publisher.work_object = work
+        publisher.work_version = 1
+        publisher.resolve()
+        publisher.reserve()
+        publisher.extract()
+        publisher.publish(notes="test")
+        work.publish.scan_publish_versions()
+        publish_version = work.publish.get_version(1)
+        assert publish_version.localized
+
+        events = []
+        try:
+            state, msg = publish_version.sync(wait=False, callback=lambda job, item: events.append(item))
+            assert state and msg == "Sync queued."
+            queue = localize.get_sync_queue(create=False)
+            assert queue.wait(publish_version.sync_job_id, timeout=30)
+            job = publish_version.get_sync_job()
+            assert job.status == sync_queue.DONE
+            assert events[-1] is None
+            # the sync thread does not change the object of the caller
+            assert publish_version.localized
+            publish_version.mark_synced()
+            assert not publish_version.localized
+            assert Path(publish_version.get_element_path("snapshot", relative=False)).exists()
+            # the synced state is saved
+            assert not PublishVersion(publish_version.settings_file).localized
+
+            assert work_version.sync() == (True, "Sync successful.")
+            assert not work_version.localized
+            assert Path(work_version.get_abs_project_path()).exists()
+            assert not Path(work_version.localized_path or "missing").exists()
+            assert not Work(work.settings_file).get_version(work_version.version).localized
+            # nothing is left to resume
+            assert not Path(queue.queue_file).exists()
+            assert publish_version.sync() == (False, "Entity is not localized.")
+        finally:
+            sync_queue.stop_all()
+
+    def test_database_watcher(self, project_manual_path, tik):
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        category = task.categories["Model"]
+        received = []
+        watcher = tik.project.start_watcher(callback=received.extend, interval=60)
+        try:
+            assert watcher.is_running
+            assert len(category.scan_works()) == 1
+            # another user creates a work. Simulated by writing the file directly.
+            new_work_path = Path(work.settings_file).with_name("other_user.twork")
+            new_work_path.write_text(Path(work.settings_file).read_text())
+            events = watcher.poll()
+            assert [(Path(e.path), e.kind) for e in events] == [(new_work_path, "created")]
+            assert received == events
+            assert category.is_affected(events)
+            assert not task.categories["Rig"].is_affected(events)
+            # the task files are directly under the folder of their subproject
+            assert not sub.is_affected(events, recursive=False)
+            task_event = type(events[0])(str(task.settings_file), "modified")
+            assert sub.is_affected([task_event], recursive=False)
+            assert not tik.project.is_affected([task_event], recursive=False)
+            assert tik.project.is_affected([task_event])
+            assert watcher.pop_dirty() == {str(new_work_path.parent)}
+            assert len(category.scan_works()) == 2
+        finally:
+            tik.project.stop_watcher()
+        assert tik.project.watcher is None
+        assert not watcher.is_running
+
+    def test_publish_info_is_stored_in_work(self, project_manual_path, tik):
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        assert work.state == "active"
+        assert work.latest_publish_version == 0
+        # publish is not created until it is needed
+        assert work._publish is None
+
+        for _ in range(2):
+            tik.project.snapshot_publisher.work_object = work
+            tik.project.snapshot_publisher.work_version = 1
+            tik.project.snapshot_publisher.resolve()
+            tik.project.snapshot_publisher.reserve()
+            tik.project.snapshot_publisher.extract()
+            tik.project.snapshot_publisher.publish(notes="test")
+
+        # the state is resolved from the work file without the publish object
+        reloaded = type(work)(work.settings_file, parent_task=task)
+        assert reloaded._publish is None
+        assert reloaded.state == "published"
+        assert reloaded.latest_publish_version == 2
+        assert reloaded._publish is None
+        assert reloaded.publish.get_versions()
+        assert reloaded.publish.get_last_version() == 2
+
+    def test_publish_info_of_older_work_files(self, project_manual_path, tik):
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        tik.project.snapshot_publisher.work_object = work
+        tik.project.snapshot_publisher.work_version = 1
+        tik.project.snapshot_publisher.resolve()
+        tik.project.snapshot_publisher.reserve()
+        tik.project.snapshot_publisher.extract()
+        tik.project.snapshot_publisher.publish(notes="test")
+
+        # work files written by older versions do not store the publish info
+        work.reload()
+        work.edit_property("state", "working")
+        work.delete_property("published")
+        work.delete_property("latest_publish_version")
+        work.apply_settings(force=True)
+
+        reloaded = type(work)(work.settings_file, parent_task=task)
+        assert reloaded.get_property("published") is None
+        assert reloaded.state == "published"
+        assert reloaded.latest_publish_version == 1
+
+    def test_concurrent_loader(self, project_manual_path, tik, monkeypatch):
+        from tik_manager4.objects import loader
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        for category in task.categories.values():
+            for nmb in range(3):
+                category.create_work(f"{category.name}_work_{nmb}")
+        works = list(task.categories["Model"].scan_works().values())
+        assert len(works) == 4
+        publishes = loader.scan_publishes([w.publish for w in works], workers=4)
+        assert publishes == [w.publish.scan_publish_versions() for w in works]
+
+        class _Cancelled:
+            cancelled = True
+
+        assert loader.scan_publishes(
+            [w.publish for w in works], workers=4, token=_Cancelled()
+        ) == [{}] * 4
+
+        assert loader.get_worker_count() == loader.DEFAULT_WORKERS
+        monkeypatch.setattr(type(tik.dcc), "threading_enabled", False)
+        assert loader.get_worker_count() == 0
+
+    def test_collecting_without_changing_the_objects(self, project_manual_path, tik):
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        category = task.categories["Model"]
+        category.scan_works()
+        other_task = Path(task.settings_file).with_name("other_task.ttask")
+        other_task.write_text(Path(task.settings_file).read_text())
+        other_work = Path(work.settings_file).with_name("other_work.twork")
+        other_work.write_text(Path(work.settings_file).read_text())
+
+        tasks = sub.collect_tasks()
+        assert sorted(tasks) == sorted(["other_task", task.name])
+        assert tasks[task.name] is task
+        assert "other_task" not in sub.all_tasks
+        sub.set_tasks(tasks)
+        assert sub.all_tasks is tasks
+
+        work_path = Path(work.settings_file)
+        works = category.collect_works()
+        assert works[work_path] is category._works[work_path]
+        assert Path(other_work) not in category._works
+        category.set_works(works)
+        assert len(category.all_works) == 2
+
     def test_if_a_task_is_empty(self, project_manual_path, tik):
         sub, task, work = self._create_a_subproject_task_and_work(
             project_manual_path, tik
@@ -1032,6 +1523,107 @@ class TestProject:
         # test trying to find outside the project
         assert tik.project.find_work_by_absolute_path("/burhan") == (None, None)
 
+    def test_version_journal(self, project_manual_path, tik, monkeypatch):
+        from tik_manager4.core import io
+        from tik_manager4.objects import work as work_module
+
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        tik.project.settings.add_property("version_journal", True)
+        tik.project.settings.apply_settings(force=True)
+        tik.set_project(project_manual_path)
+        journal_file = Path(work.journal_file)
+        # the first save adds the journal marker to the work file
+        work.new_version()
+        assert io.IO(work.settings_file).read()["version_journal"]
+        observer = work_module.Work(work.settings_file)
+        assert not observer.is_modified()
+
+        # the new versions are journaled without touching the work file
+        work_file_data = Path(work.settings_file).read_bytes()
+        work.new_version()
+        work.new_version(notes="journaled")
+        assert Path(work.settings_file).read_bytes() == work_file_data
+        assert len(journal_file.read_text().splitlines()) == 2
+        assert work.version_count == 4
+
+        # other processes see the journaled versions
+        assert observer.is_modified()
+        observer.reload()
+        assert observer.version_count == 4
+        assert observer.get_version(4).notes == "journaled"
+        # versions are created on access
+        assert isinstance(observer._versions._items[0], dict)
+        assert observer.get_last_version() == 4
+
+        # a version saved again by a client which does not read the journal
+        # is not replaced by the journaled one
+        work_data = io.IO(work.settings_file).read()
+        older_version = dict(work_data["versions"][-1], version_number=3)
+        older_version["notes"] = "older client"
+        work_data["versions"].append(older_version)
+        io.IO(work.settings_file).write(work_data)
+        clashed = work_module.Work(work.settings_file)
+        assert clashed.version_count == 4
+        assert clashed.get_version(3).notes == "older client"
+        assert clashed.get_version(4).notes == "journaled"
+
+        # any other change merges the journal into the work file
+        work.omit()
+        assert not journal_file.exists()
+        assert len(io.IO(work.settings_file).read()["versions"]) == 4
+
+        # a full journal is merged as well
+        monkeypatch.setattr(work_module, "VERSION_JOURNAL_LIMIT", 1)
+        work.new_version()
+        assert journal_file.exists()
+        work.new_version()
+        assert not journal_file.exists()
+        assert len(io.IO(work.settings_file).read()["versions"]) == 6
+
+    def test_find_work_with_scene_index(self, project_manual_path, tik, monkeypatch):
+        from tik_manager4.objects import work as work_module
+
+        sub, task, work = self._create_a_subproject_task_and_work(
+            project_manual_path, tik
+        )
+        second_version = work.new_version()
+        scene_path = work.get_abs_project_path(second_version.scene_path)
+        entry = work_module.SCENE_INDEX.get(
+            tik.project.database_path,
+            Path(work.path, second_version.scene_path).as_posix(),
+        )
+        assert entry.version == 2
+        assert entry.task_id == task.id
+
+        # indexed scenes are found without scanning the folder
+        def _no_glob(*args, **kwargs):
+            raise AssertionError("The folder should not be scanned.")
+
+        monkeypatch.setattr(Path, "glob", _no_glob)
+        found_work, version_number = tik.project.find_work_by_absolute_path(scene_path)
+        assert found_work.id == work.id
+        assert version_number == 2
+        assert found_work.parent_task.id == task.id
+        monkeypatch.undo()
+
+        # loading a work does not fill the index
+        work_module.SCENE_INDEX.clear()
+        work_module.Work(work.settings_file)
+        assert work_module.SCENE_INDEX.get(
+            tik.project.database_path,
+            Path(work.path, second_version.scene_path).as_posix(),
+        ) is None
+
+        # missing scenes fall back to the scan, which fills the index
+        found_work, version_number = tik.project.find_work_by_absolute_path(scene_path)
+        assert (found_work.id, version_number) == (work.id, 2)
+        assert work_module.SCENE_INDEX.get(
+            tik.project.database_path,
+            Path(work.path, second_version.scene_path).as_posix(),
+        ) is not None
+
     def test_get_current_work(self, project_manual_path, tik, monkeypatch):
         sub, task, work = self._create_a_subproject_task_and_work(
             project_manual_path, tik
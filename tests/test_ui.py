@@ -278,6 +278,66 @@ class TestUI:
         assert utils.apply_stylesheet(str(_stylesheet), _widget) == True
         assert utils.apply_stylesheet(str(tmp_path / "test_stylesheet.NA"), _widget) == False
 
+    def test_chunked_loader(self, qtbot, main_object):
+        import threading
+        from tik_manager4.ui.mcv.async_loader import ChunkedLoader
+        chunk_loader = ChunkedLoader(chunk_size=50)
+        received = []
+        chunk_loader.chunk_loaded.connect(received.append)
+        with qtbot.waitSignal(chunk_loader.finished, timeout=5000):
+            chunk_loader.start(lambda token: iter(range(120)))
+        assert [len(chunk) for chunk in received] == [50, 50, 20]
+
+        # the result of the producer is handed over with the finished signal
+        def collecting_producer(token):
+            token.result = collected = []
+            for item in range(3):
+                collected.append(item)
+                yield item
+
+        with qtbot.waitSignal(chunk_loader.finished, timeout=5000) as blocker:
+            chunk_loader.start(collecting_producer)
+        assert blocker.args == [[0, 1, 2]]
+
+        # starting a new load cancels the previous one
+        release = threading.Event()
+        started = threading.Event()
+        checked = []
+
+        def slow_producer(token):
+            yield "stale"
+            started.set()
+            release.wait(5)
+            # the producer can stop early
+            checked.append(token.cancelled)
+            yield "stale"
+
+        received.clear()
+        chunk_loader.chunk_size = 1
+        chunk_loader.start(slow_producer)
+        assert started.wait(5)
+        chunk_loader.start(lambda token: ["fresh"])
+        release.set()
+        chunk_loader.wait()
+        assert received == [["fresh"]]
+        assert checked == [True]
+        assert not chunk_loader.is_loading
+
+        # callbacks run once the current load is finished
+        resumed = []
+        release.clear()
+        started.clear()
+        chunk_loader.start(slow_producer)
+        chunk_loader.call_when_loaded(lambda: resumed.append("cancelled"))
+        chunk_loader.start(lambda token: ["fresh"])
+        chunk_loader.call_when_loaded(lambda: resumed.append("loaded"))
+        release.set()
+        qtbot.waitUntil(lambda: bool(resumed), timeout=5000)
+        chunk_loader.wait()
+        assert resumed == ["loaded"]
+        chunk_loader.call_when_loaded(lambda: resumed.append("idle"))
+        assert resumed == ["loaded", "idle"]
+
 
 class TestPySide6Compatibility:
     """Tests for PySide6.8.3 compatibility improvements.
@@ -221,6 +221,38 @@ def test_getting_metadata(tik, monkeypatch):
     monkeypatch.undo()
 
 
+def test_chained_metadata():
+    """Test the metadata falls through to the parent metadata."""
+    from tik_manager4.objects.metadata import Metadata
+
+    parent = Metadata({"fps": 25, "mode": "asset"})
+    child = Metadata({}, parent=parent)
+    child.override({"mode": "shot"})
+
+    assert child.get_value("fps") == 25
+    assert child.get_value("mode") == "shot"
+    assert parent.get_value("mode") == "asset"
+    assert not child.is_overridden("fps")
+    assert child.is_overridden("mode")
+    assert list(child.keys()) == ["fps", "mode"]
+    assert "fps" in child and len(child) == 2
+    assert child == {"fps": parent["fps"], "mode": child["mode"]}
+
+    # writing to an inherited item does not change the parent
+    child["fps"].value = 30
+    assert parent.get_value("fps") == 25
+    child.add_item("fps", 30, overridden=True)
+    assert child.get_value("fps") == 30
+    assert parent.get_value("fps") == 25
+
+    # the changes in the parent are visible in the child
+    parent.add_item("resolution", [1920, 1080])
+    assert child.get_value("resolution") == [1920, 1080]
+    assert dict(child.copy().get_all_items()) == {
+        "fps": 30, "mode": "shot", "resolution": [1920, 1080]
+    }
+
+
 def test_resolving_dcc_names_from_extensions(tik):
     """Test resolving the DCC names from extensions."""
 
@@ -0,0 +1,177 @@
+"""Content-addressed store of the published files.
+
+Published files are stored once by their checksum and hardlinked into
+their versioned publish paths. Republishing unchanged content replaces the
+new file with a link to the stored blob, so the content takes the storage
+only once.
+
+The hardlink count of a blob is its reference count. A blob which is only
+linked from the store is not used by any publish, including the ones in
+the purgatory, and it is removed by the garbage collector.
+
+Blobs are stored as:
+    <root>/objects/<algorithm>/<first two digest characters>/<digest>
+
+Files on another device than the store, e.g. localized publishes, are not
+stored.
+"""
+
+import errno
+import os
+import uuid
+
+from tik_manager4.core import filelog
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+# Name of the store folder under the project root.
+STORE_FOLDER = ".tik_store"
+
+
+class StoreStats:
+    """Counters of the store operations."""
+
+    def __init__(self):
+        self.stored = 0
+        self.deduplicated = 0
+        self.skipped = 0
+        self.removed = 0
+        self.bytes = 0
+
+    def __repr__(self):
+        return (
+            f"StoreStats(stored={self.stored}, deduplicated={self.deduplicated}, "
+            f"skipped={self.skipped}, removed={self.removed}, bytes={self.bytes})"
+        )
+
+
+class BlobStore:
+    """Content-addressed store linking the blobs into the publish paths."""
+
+    def __init__(self, root):
+        """Initialize the BlobStore.
+
+        Args:
+            root (str): The store folder.
+        """
+        self.root = os.fspath(root)
+        self.objects_folder = os.path.join(self.root, "objects")
+
+    @classmethod
+    def for_project(cls, project_root):
+        """Return the store of the project."""
+        return cls(os.path.join(project_root, STORE_FOLDER))
+
+    def blob_path(self, algorithm, digest):
+        """Return the path of the blob with the given digest."""
+        return os.path.join(self.objects_folder, algorithm, digest[:2], digest)
+
+    def add(self, path, record):
+        """Store the published file or bundle and link it to the blobs.
+
+        Args:
+            path (str): The published file or bundle folder.
+            record (dict): The checksum record of the element.
+
+        Returns:
+            StoreStats: The counters of the stored and the deduplicated files.
+        """
+        stats = StoreStats()
+        algorithm = record["algorithm"]
+        if "files" in record:
+            for relative_path, digest in record["files"].items():
+                self._add_file(
+                    os.path.join(path, relative_path), algorithm, digest, stats
+                )
+        else:
+            self._add_file(path, algorithm, record["digest"], stats)
+        return stats
+
+    def _add_file(self, file_path, algorithm, digest, stats):
+        """Store the file or replace it with a link to the stored blob."""
+        blob = self.blob_path(algorithm, digest)
+        size = os.path.getsize(file_path)
+        # two attempts, in case the garbage collector removes the blob in between.
+        for _ in range(2):
+            try:
+                if os.path.samefile(blob, file_path):
+                    stats.skipped += 1
+                    return
+            except OSError:
+                pass
+            try:
+                self._link_blob(blob, file_path, size)
+                stats.deduplicated += 1
+                stats.bytes += size
+                return
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                self._skip(file_path, exc, stats)
+                return
+            try:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                os.link(file_path, blob)
+                stats.stored += 1
+                return
+            except FileExistsError:
+                continue
+            except OSError as exc:
+                self._skip(file_path, exc, stats)
+                return
+        stats.skipped += 1
+
+    @staticmethod
+    def _link_blob(blob, file_path, size):
+        """Replace the file with a link to the blob.
+
+        Raises:
+            FileNotFoundError: If the blob does not exist.
+            OSError: If the blob cannot be linked.
+        """
+        if os.path.getsize(blob) != size:
+            raise OSError(errno.EINVAL, f"Blob size does not match: {blob}")
+        temp_path = f"{file_path}.{uuid.uuid4().hex[:8]}.tik_link"
+        os.link(blob, temp_path)
+        try:
+            os.replace(temp_path, file_path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def _skip(file_path, exc, stats):
+        """Leave the file out of the store, e.g. it is on another device."""
+        LOG.warning(f"File cannot be stored => {file_path}: {exc}")
+        stats.skipped += 1
+
+    def collect_garbage(self):
+        """Remove the blobs which are not linked to any publish.
+
+        Returns:
+            StoreStats: The counters of the removed blobs.
+        """
+        stats = StoreStats()
+        if not os.path.isdir(self.objects_folder):
+            return stats
+        for root, _dirs, names in os.walk(self.objects_folder, topdown=False):
+            for name in names:
+                blob = os.path.join(root, name)
+                try:
+                    blob_stat = os.stat(blob)
+                    if blob_stat.st_nlink > 1:
+                        continue
+                    # the blobs are write protected like the published files.
+                    os.chmod(blob, 0o644)
+                    os.remove(blob)
+                except OSError as exc:
+                    LOG.warning(f"Blob cannot be removed => {blob}: {exc}")
+                    continue
+                stats.removed += 1
+                stats.bytes += blob_stat.st_size
+            if root != self.objects_folder:
+                try:
+                    os.rmdir(root)
+                except OSError:
+                    pass
+        return stats
@@ -0,0 +1,168 @@
+"""Streaming content checksums of the published elements.
+
+The files are hashed with xxh3_128 if the xxhash package is installed,
+otherwise with blake2b from the standard library. The files of a bundle
+are hashed by a thread pool. The hashers release the GIL while hashing
+the big chunks, so the threads hash the files in parallel.
+
+A checksum record looks like this:
+    {
+        "algorithm": "xxh3_128",
+        "digest": "5e1f...",
+        "size": 1048576,
+        "files": {"textures/diffuse.1001.exr": "a3c0...", ...},  # bundles only
+    }
+
+The digest of a bundle is the hash of the relative paths and the digests of
+its files, so two bundles with the same content have the same digest.
+"""
+
+import concurrent.futures
+import hashlib
+import logging
+import os
+
+# The copy engine uses this module, so it cannot use the filelog.
+LOG = logging.getLogger(__name__)
+
+# Size of the chunks read from the files.
+CHUNK_SIZE = 4 * 1024 * 1024
+# Number of threads hashing the files of a bundle.
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _blake2b():
+    return hashlib.blake2b(digest_size=16)
+
+
+def _get_hashers():
+    """Return the available hash constructors, fastest first."""
+    hashers = {}
+    try:
+        import xxhash  # pylint: disable=import-outside-toplevel
+
+        hashers["xxh3_128"] = xxhash.xxh3_128
+    except ImportError:
+        pass
+    hashers["blake2b"] = _blake2b
+    return hashers
+
+
+HASHERS = _get_hashers()
+# Algorithm of the new checksums. It can be set with TIK_CHECKSUM_ALGORITHM.
+ALGORITHM = os.getenv("TIK_CHECKSUM_ALGORITHM", next(iter(HASHERS)))
+if ALGORITHM not in HASHERS:
+    LOG.warning(f"Checksum algorithm '{ALGORITHM}' is not available. Using blake2b.")
+    ALGORITHM = "blake2b"
+
+
+def file_digest(file_path, algorithm=None):
+    """Return the hex digest of the file, reading it in chunks.
+
+    Args:
+        file_path (str): Path of the file.
+        algorithm (str, optional): One of the HASHERS keys. Defaults to
+            ALGORITHM.
+
+    Returns:
+        str: The hex digest.
+    """
+    hasher = HASHERS[algorithm or ALGORITHM]()
+    with open(file_path, "rb", buffering=0) as _file:
+        # small files do not need a full chunk.
+        buffer = bytearray(min(CHUNK_SIZE, os.fstat(_file.fileno()).st_size + 1))
+        view = memoryview(buffer)
+        while True:
+            size = _file.readinto(buffer)
+            if not size:
+                break
+            hasher.update(view[:size])
+    return hasher.hexdigest()
+
+
+def _bundle_digest(files, algorithm):
+    """Return the digest of the relative paths and the digests of the files."""
+    hasher = HASHERS[algorithm]()
+    for relative_path in sorted(files):
+        hasher.update(f"{relative_path}\0{files[relative_path]}\n".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def element_checksum(path, algorithm=None, workers=DEFAULT_WORKERS):
+    """Return the checksum record of a published file or bundle folder.
+
+    Args:
+        path (str): The file or the bundle folder.
+        algorithm (str, optional): One of the HASHERS keys. Defaults to
+            ALGORITHM.
+        workers (int): Maximum number of threads hashing the files of a
+            bundle.
+
+    Returns:
+        dict: The checksum record.
+    """
+    algorithm = algorithm or ALGORITHM
+    if not os.path.isdir(path):
+        return {
+            "algorithm": algorithm,
+            "digest": file_digest(path, algorithm),
+            "size": os.path.getsize(path),
+        }
+    file_paths = []
+    for root, _dirs, names in os.walk(path):
+        file_paths.extend(os.path.join(root, name) for name in names)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        digests = pool.map(
+            lambda file_path: file_digest(file_path, algorithm), file_paths
+        )
+        files = {
+            os.path.relpath(file_path, path).replace(os.sep, "/"): digest
+            for file_path, digest in zip(file_paths, digests)
+        }
+    return {
+        "algorithm": algorithm,
+        "digest": _bundle_digest(files, algorithm),
+        "size": sum(os.path.getsize(file_path) for file_path in file_paths),
+        "files": files,
+    }
+
+
+def verify(path, record):
+    """Check if the file or the bundle matches the checksum record.
+
+    The sizes are compared first, so changed files are usually found
+    without reading them.
+
+    Args:
+        path (str): The file or the bundle folder.
+        record (dict): The checksum record.
+
+    Returns:
+        bool: True if the content matches.
+    """
+    if not record or record.get("algorithm") not in HASHERS:
+        return False
+    try:
+        if os.path.isdir(path):
+            size = sum(
+                os.path.getsize(os.path.join(root, name))
+                for root, _dirs, names in os.walk(path)
+                for name in names
+            )
+        else:
+            size = os.path.getsize(path)
+        if size != record.get("size"):
+            return False
+        return element_checksum(path, record["algorithm"])["digest"] == record["digest"]
+    except OSError:
+        return False
+
+
+def is_same(record_a, record_b):
+    """Check if two checksum records are of the same content."""
+    return bool(
+        record_a
+        and record_b
+        and record_a.get("algorithm") == record_b.get("algorithm")
+        and record_a.get("digest") == record_b.get("digest")
+    )
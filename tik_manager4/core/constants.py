@@ -83,3 +83,12 @@ class BranchingModes(Enum):
     """Enumeration of branching modes."""
     ACTIVE = "Active Branches"
     PASSIVE = "Passive Branches"
+
+
+class BranchMaterialization(Enum):
+    """Enumeration of the ways to create the files of the active branches."""
+    COPY = "Copy"
+    HARDLINK = "Hardlink"
+    REFLINK = "Reflink"
+    SYMLINK = "Symlink"
+    AUTO = "Auto"
@@ -0,0 +1,303 @@
+"""Copy engine for big files and trees of many small files.
+
+Trees are copied by a bounded pool of threads, which hides the latency of
+network shares when there are thousands of small files like UDIM texture
+sets. Big files are copied in large chunks with sendfile where it is
+available, into a partial file which is resumed if the copy is interrupted.
+Files which are already copied with the same size and modification time
+are skipped, so a repeated copy resumes an interrupted tree copy.
+
+Example:
+    engine = CopyEngine(verify=True, progress=print)
+    stats = engine.copy("/local/cache/bundle", "/server/project/bundle")
+"""
+
+import concurrent.futures
+import errno
+import logging
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+from tik_manager4.core.checksum import file_digest
+
+LOG = logging.getLogger(__name__)
+
+# Files bigger than this are copied in chunks and can be resumed.
+BIG_FILE_SIZE = 64 * 1024 * 1024
+# Size of the chunks for the big files.
+BUFFER_SIZE = 8 * 1024 * 1024
+# Number of threads copying the files of a tree. The threads mostly wait for
+# the file system, more of them only help on high latency network shares.
+DEFAULT_WORKERS = 8
+# Suffix of the partially copied big files.
+PART_SUFFIX = ".tik_part"
+# Modification times closer than this are equal. Some network file systems
+# keep the times with a two seconds precision.
+MTIME_TOLERANCE = 2.0
+
+_HAS_SENDFILE = sys.platform.startswith("linux") and hasattr(os, "sendfile")
+
+
+class CopyStats:
+    """Counters of a copy operation."""
+
+    def __init__(self):
+        self.files = 0
+        self.skipped = 0
+        self.bytes = 0
+        self.total_bytes = 0
+
+    def __repr__(self):
+        return (
+            f"CopyStats(files={self.files}, skipped={self.skipped}, "
+            f"bytes={self.bytes}, total_bytes={self.total_bytes})"
+        )
+
+
+class CopyEngine:
+    """Copy files and trees with a thread pool, resuming and verifying them."""
+
+    def __init__(
+        self,
+        workers=DEFAULT_WORKERS,
+        verify=False,
+        progress=None,
+        resume=False,
+        big_file_size=BIG_FILE_SIZE,
+        buffer_size=BUFFER_SIZE,
+    ):
+        """Initialize the CopyEngine.
+
+        Args:
+            workers (int): Maximum number of threads copying the files.
+            verify (bool): Compare the checksums of the copied files with
+                the sources.
+            progress (callable, optional): Called with the copied bytes,
+                the total bytes and the path of the last copied file. It can
+                be called from the worker threads.
+            resume (bool): Skip the files already copied with the same size
+                and modification time and continue the partially copied big
+                files.
+            big_file_size (int): Files bigger than this are copied in
+                chunks.
+            buffer_size (int): Size of the chunks.
+        """
+        self.workers = max(1, workers)
+        self.verify = verify
+        self.progress = progress
+        self.resume = resume
+        self.big_file_size = big_file_size
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._stats = None
+
+    def copy(self, source, target):
+        """Copy the source file or folder to the target.
+
+        The files in an existing target folder are overwritten. Other files
+        in the target folder are kept.
+
+        Args:
+            source (str): The source file or folder.
+            target (str): The target file or folder.
+
+        Returns:
+            CopyStats: The counters of the copy.
+
+        Raises:
+            OSError: If a file cannot be copied or verified.
+        """
+        source = Path(source)
+        target = Path(target)
+        self._stats = CopyStats()
+        if source.is_dir():
+            self._copy_tree(source, target)
+        else:
+            size = source.stat().st_size
+            self._stats.total_bytes = size
+            target.parent.mkdir(parents=True, exist_ok=True)
+            self._copy_file(source, target, size)
+        return self._stats
+
+    def move(self, source, target):
+        """Move the source file or folder to the target.
+
+        Renames if possible, otherwise copies and removes the source.
+
+        Args:
+            source (str): The source file or folder.
+            target (str): The target file or folder. Must not exist.
+
+        Returns:
+            CopyStats: The counters of the copy. Empty if renamed.
+        """
+        source = Path(source)
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.rename(source, target)
+            return CopyStats()
+        except OSError:
+            pass
+        stats = self.copy(source, target)
+        if source.is_dir():
+            shutil.rmtree(source)
+        else:
+            source.unlink()
+        return stats
+
+    def _copy_tree(self, source, target):
+        """Copy the files of the source folder with the thread pool."""
+        jobs = []
+        folders = [(os.fspath(source), os.fspath(target))]
+        # plain strings and scandir keep the walk cheap for many small files.
+        while folders:
+            source_folder, target_folder = folders.pop()
+            os.makedirs(target_folder, exist_ok=True)
+            with os.scandir(source_folder) as entries:
+                for entry in entries:
+                    target_path = os.path.join(target_folder, entry.name)
+                    if entry.is_dir():
+                        folders.append((entry.path, target_path))
+                    else:
+                        size = entry.stat().st_size
+                        jobs.append((entry.path, target_path, size))
+                        self._stats.total_bytes += size
+        if not jobs:
+            return
+        if self.workers == 1 or len(jobs) == 1:
+            for job in jobs:
+                self._copy_file(*job)
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._copy_file, *job) for job in jobs]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    @staticmethod
+    def _is_copied(source, target, size):
+        """Check if the target is a complete copy of the source."""
+        try:
+            target_stat = os.stat(target)
+        except OSError:
+            return False
+        return (
+            target_stat.st_size == size
+            and abs(target_stat.st_mtime - os.stat(source).st_mtime) <= MTIME_TOLERANCE
+        )
+
+    def _copy_file(self, source, target, size):
+        """Copy a single file."""
+        if self.resume and self._is_copied(source, target, size):
+            self._add_progress(size, target, copied=False)
+            return
+        if size > self.big_file_size:
+            self._copy_big_file(source, target, size)
+        else:
+            shutil.copy2(source, target)
+            self._add_progress(size, target)
+        if self.verify and file_digest(source) != file_digest(target):
+            os.remove(target)
+            raise OSError(f"Checksum mismatch after copying {source} to {target}")
+
+    def _copy_big_file(self, source, target, size):
+        """Copy a big file in chunks into a partial file, then rename it."""
+        part = f"{target}{PART_SUFFIX}"
+        offset = 0
+        if self.resume and os.path.isfile(part):
+            part_stat = os.stat(part)
+            # only resume the partial files written after the source is changed.
+            if (
+                part_stat.st_size <= size
+                and part_stat.st_mtime >= os.stat(source).st_mtime
+            ):
+                offset = part_stat.st_size
+                self._add_progress(offset, target, copied=False, count=False)
+        # sendfile does not support the files opened for appending.
+        part_mode = "r+b" if offset else "wb"
+        with open(source, "rb") as source_file, open(part, part_mode) as part_file:
+            part_file.truncate(offset)
+            part_file.seek(offset)
+            if _HAS_SENDFILE:
+                while offset < size:
+                    sent = os.sendfile(
+                        part_file.fileno(), source_file.fileno(), offset,
+                        min(self.buffer_size, size - offset),
+                    )
+                    if sent == 0:
+                        break
+                    offset += sent
+                    self._add_progress(sent, target, count=False)
+            else:
+                source_file.seek(offset)
+                buffer = bytearray(self.buffer_size)
+                view = memoryview(buffer)
+                while True:
+                    read = source_file.readinto(buffer)
+                    if not read:
+                        break
+                    part_file.write(view[:read])
+                    offset += read
+                    self._add_progress(read, target, count=False)
+        if offset != size:
+            # the source is changed while it is copied.
+            os.remove(part)
+            raise OSError(
+                errno.EIO, f"Source file size changed while copying: {source}"
+            )
+        shutil.copystat(source, part)
+        os.replace(part, target)
+        with self._lock:
+            self._stats.files += 1
+
+    def _add_progress(self, size, target, copied=True, count=True):
+        """Update the counters and call the progress callback."""
+        with self._lock:
+            if count:
+                if copied:
+                    self._stats.files += 1
+                else:
+                    self._stats.skipped += 1
+            self._stats.bytes += size
+            done, total = self._stats.bytes, self._stats.total_bytes
+        if self.progress:
+            try:
+                self.progress(done, total, os.fspath(target))
+            except Exception as exc:  # pylint: disable=broad-except
+                LOG.warning(f"Progress callback failed: {exc}")
+
+
+def chmod_tree(path, mode, dir_mode=None, workers=DEFAULT_WORKERS):
+    """Change the mode of the file or all the files in the folder.
+
+    Args:
+        path (str): The file or the folder.
+        mode (int): The mode of the files.
+        dir_mode (int, optional): The mode of the folders. Folders are not
+            changed if not given.
+        workers (int): Maximum number of threads changing the modes.
+    """
+    path = Path(path)
+    if not path.is_dir():
+        os.chmod(path, mode)
+        return
+    jobs = []
+    for root, dirs, files in os.walk(path):
+        jobs.extend((os.path.join(root, name), mode) for name in files)
+        if dir_mode is not None:
+            jobs.extend((os.path.join(root, name), dir_mode) for name in dirs)
+    if len(jobs) < 2 or workers == 1:
+        for job in jobs:
+            os.chmod(*job)
+        return
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in pool.map(lambda job: os.chmod(*job), jobs):
+            pass
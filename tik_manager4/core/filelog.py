@@ -1,13 +1,144 @@
-"""Logging module for Tik Manager 4."""
+"""Logging module for Tik Manager 4.
 
+Messages are put into a queue and written to the log files by a single
+background thread. The log files stay open and rotate when they reach
+their size cap, so logging in tight loops does not open and close files.
+The queue is flushed at exit and before the log files are read or cleared.
+
+The level written to the log files can be set with the TIK_LOG_LEVEL
+environment variable. e.g. TIK_LOG_LEVEL=WARNING
+
+Every module creates its Filelog at import time. The writable log
+directory is resolved once per process and the log files are opened once,
+so the construction does not touch the disk after the first one.
+"""
+
+import atexit
 import datetime
 import logging
+import logging.handlers
 import os
+import queue
+import sys
 import tempfile
+import threading
 from pathlib import Path
 
 from tik_manager4.core import utils
 
+# Number of rotated log files to keep next to the log file.
+LOG_BACKUP_COUNT = 3
+
+
+class _FileDispatcher(logging.Handler):
+    """Route the queued records to the rotating log file handlers."""
+
+    def __init__(self):
+        super().__init__()
+        self._handlers = {}
+        self._handlers_lock = threading.Lock()
+
+    def register(self, file_path, size_cap, level):
+        """Open the log file if it is not open yet.
+
+        Args:
+            file_path (str): Path of the log file.
+            size_cap (int): Size in bytes to rotate the file at.
+            level (int): Minimum level of the written records.
+
+        Returns:
+            bool: True if the file is opened by this call.
+        """
+        with self._handlers_lock:
+            if file_path in self._handlers:
+                return False
+            handler = logging.handlers.RotatingFileHandler(
+                file_path,
+                maxBytes=size_cap,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding="utf-8",
+            )
+            handler.setLevel(level)
+            self._handlers[file_path] = handler
+            return True
+
+    def is_open(self, file_path):
+        """Check if the log file is open."""
+        return file_path in self._handlers
+
+    def close_file(self, file_path):
+        """Close the log file. It is opened again by the next register."""
+        with self._handlers_lock:
+            handler = self._handlers.pop(file_path, None)
+        if handler:
+            handler.close()
+
+    def emit(self, record):
+        handler = self._handlers.get(getattr(record, "tik_log_file", None))
+        if handler and record.levelno >= handler.level:
+            handler.handle(record)
+
+    def flush(self):
+        with self._handlers_lock:
+            handlers = list(self._handlers.values())
+        for handler in handlers:
+            handler.flush()
+
+    def close(self):
+        with self._handlers_lock:
+            handlers = list(self._handlers.values())
+            self._handlers.clear()
+        for handler in handlers:
+            handler.close()
+        super().close()
+
+
+_QUEUE = queue.Queue(-1)
+_DISPATCHER = _FileDispatcher()
+_QUEUE_HANDLER = logging.handlers.QueueHandler(_QUEUE)
+_LISTENER = None
+_LISTENER_LOCK = threading.Lock()
+
+# Resolved log directories keyed by the requested directory and the home.
+_LOG_DIRS = {}
+_LOG_DIRS_LOCK = threading.Lock()
+
+
+def _start_listener():
+    """Start the background writer thread if it is not running."""
+    global _LISTENER  # pylint: disable=global-statement
+    with _LISTENER_LOCK:
+        if _LISTENER is None:
+            _LISTENER = logging.handlers.QueueListener(_QUEUE, _DISPATCHER)
+            _LISTENER.start()
+
+
+def flush():
+    """Wait until the queued messages are written to the log files."""
+    if _LISTENER is not None:
+        _QUEUE.join()
+    _DISPATCHER.flush()
+
+
+@atexit.register
+def shutdown():
+    """Write the queued messages and close the log files."""
+    global _LISTENER  # pylint: disable=global-statement
+    with _LISTENER_LOCK:
+        if _LISTENER is not None:
+            _LISTENER.stop()
+            _LISTENER = None
+    _DISPATCHER.close()
+
+
+def _get_level(level):
+    """Return the numeric level from the argument or TIK_LOG_LEVEL."""
+    level = level or os.getenv("TIK_LOG_LEVEL") or logging.DEBUG
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    return level if isinstance(level, int) else logging.DEBUG
+
+
 class Filelog:
     """Logging class handling file logging."""
     # FIXME(ckutlu): We should definitely rethink the need for global state as
@@ -17,12 +148,27 @@ class Filelog:
 
     @staticmethod
     def _resolve_log_dir(filedir):
-        """Return a writable directory for log files."""
+        """Return a writable directory for log files.
+
+        The result is cached for the process. The home directory is part
+        of the key, so changing it resolves the directory again.
+        """
+        home_dir = utils.get_home_dir()
+        key = (os.fspath(filedir) if filedir else None, home_dir)
+        with _LOG_DIRS_LOCK:
+            log_dir = _LOG_DIRS.get(key)
+            if log_dir is None:
+                log_dir = Filelog._probe_log_dir(filedir, home_dir)
+                _LOG_DIRS[key] = log_dir
+        return log_dir
+
+    @staticmethod
+    def _probe_log_dir(filedir, home_dir):
+        """Return the first candidate directory which can be written."""
         candidates = []
         if filedir:
             candidates.append(Path(filedir))
 
-        home_dir = utils.get_home_dir()
         if home_dir:
             candidates.append(Path(home_dir))
 
@@ -51,7 +197,7 @@ class Filelog:
 
         return Path(tempfile.gettempdir())
 
-    def __init__(self, logname = None, filename="tik_manager4", filedir=None, date=True, time=True, size_cap=500000):
+    def __init__(self, logname = None, filename="tik_manager4", filedir=None, date=True, time=True, size_cap=500000, level=None):
         # FIXME(ckutlu): Perhaps we can live with only a path argument
         super(Filelog, self).__init__()
         self.file_name = filename if filename else "defaultLog"
@@ -59,13 +205,25 @@ class Filelog:
         self.file_path_obj = Path(self.file_dir, f"{self.file_name}.log")
         self.logger = logging.getLogger(self.file_name)
         self.logger.setLevel(logging.DEBUG)
+        if _QUEUE_HANDLER not in self.logger.handlers:
+            self.logger.addHandler(_QUEUE_HANDLER)
         self.log_name = logname if logname else self.file_name
         self.is_date = date
         self.is_time = time
-        if not self.file_path_obj.is_file():
-            self._welcome()
-        if self.get_size() > size_cap:
-            self.clear()
+        self.size_cap = size_cap
+        self.level = _get_level(level)
+        self._extra = {"tik_log_file": str(self.file_path_obj)}
+        _start_listener()
+        if not _DISPATCHER.is_open(self._extra["tik_log_file"]):
+            is_new = not self.file_path_obj.is_file()
+            if self._open() and is_new:
+                self._welcome()
+
+    def _open(self):
+        """Open the log file for the background writer."""
+        return _DISPATCHER.register(
+            str(self.file_path_obj), self.size_cap, self.level
+        )
 
     @classmethod
     def __set_last_message(cls, msg, message_type):
@@ -99,14 +257,16 @@ class Filelog:
 
     def _welcome(self):
         """Print welcome message to the log file."""
-        self._start_logging()
-        self.logger.debug("=" * len(self.log_name))
-        self.logger.debug(self.log_name)
-        self.logger.debug("=" * len(self.log_name))
-        self.logger.debug("")
-        self._end_logging()
+        self._log(logging.DEBUG, "=" * len(self.log_name))
+        self._log(logging.DEBUG, self.log_name)
+        self._log(logging.DEBUG, "=" * len(self.log_name))
+        self._log(logging.DEBUG, "")
         return self.log_name
 
+    def _log(self, level, msg, exc_info=False):
+        """Queue the message for the log file of this object."""
+        self.logger.log(level, msg, exc_info=exc_info, extra=self._extra)
+
     def info(self, msg, *args):
         """Log an info message.
 
@@ -116,10 +276,8 @@ class Filelog:
         # use args to format the message mimicking the lazy logging
         msg = msg % args if args else msg
         stamped_msg = "%sINFO     : %s" %(self._get_now(), msg)
-        self._start_logging()
-        self.logger.info(stamped_msg)
+        self._log(logging.INFO, stamped_msg)
         self.__set_last_message(msg, "info")
-        self._end_logging()
         return msg
 
     def warning(self, msg, *args):
@@ -130,10 +288,8 @@ class Filelog:
         """
         msg = msg % args if args else msg
         stamped_msg = "%sWARNING  : %s" % (self._get_now(), msg)
-        self._start_logging()
-        self.logger.warning(stamped_msg)
+        self._log(logging.WARNING, stamped_msg)
         self.__set_last_message(msg, "warning")
-        self._end_logging()
         return msg
 
     def error(self, msg, *args, proceed=True):
@@ -145,10 +301,9 @@ class Filelog:
         """
         msg = msg % args if args else msg
         stamped_msg = "%sERROR    : %s" % (self._get_now(), msg)
-        self._start_logging()
-        self.logger.error(stamped_msg, exc_info=True)
+        # the traceback is only meaningful while handling an exception.
+        self._log(logging.ERROR, stamped_msg, exc_info=sys.exc_info()[0] is not None)
         self.__set_last_message(msg, "error")
-        self._end_logging()
         if not proceed:
             raise msg
         return msg
@@ -161,10 +316,8 @@ class Filelog:
         """
         msg = msg % args if args else msg
         stamped_msg = "%sEXCEPTION: %s" % (self._get_now(), msg)
-        self._start_logging()
-        self.logger.exception(stamped_msg)
+        self._log(logging.ERROR, stamped_msg, exc_info=True)
         self.__set_last_message(msg, "error")
-        self._end_logging()
         return msg
 
     def title(self, msg):
@@ -173,13 +326,10 @@ class Filelog:
         Args:
             msg (str): The title to create.
         """
-        self._start_logging()
-        self.logger.debug("")
-        self.logger.debug("="*(len(msg)))
-        self.logger.debug(msg)
-        self.logger.debug("="*(len(msg)))
-        # self.logger.debug("\n")
-        self._end_logging()
+        self._log(logging.DEBUG, "")
+        self._log(logging.DEBUG, "="*(len(msg)))
+        self._log(logging.DEBUG, msg)
+        self._log(logging.DEBUG, "="*(len(msg)))
         return msg
 
     def header(self, msg):
@@ -188,41 +338,27 @@ class Filelog:
         Args:
             msg (str): The header to create.
         """
-        self._start_logging()
-        self.logger.debug("")
-        self.logger.debug(msg)
-        self.logger.debug("=" * (len(msg)))
-        # self.logger.debug("\n")
-        self._end_logging()
+        self._log(logging.DEBUG, "")
+        self._log(logging.DEBUG, msg)
+        self._log(logging.DEBUG, "=" * (len(msg)))
         return msg
 
     def seperator(self):
         """Create a seperator in the log file."""
-        self._start_logging()
-        self.logger.debug("")
-        self.logger.debug("-"*30)
-        # self.logger.debug("\n")
-        self._end_logging()
+        self._log(logging.DEBUG, "")
+        self._log(logging.DEBUG, "-"*30)
         return True
 
     def clear(self):
         """Clear the log file."""
+        flush()
+        _DISPATCHER.close_file(str(self.file_path_obj))
         if self.file_path_obj.is_file():
             self.file_path_obj.unlink()
+        self._open()
         self._welcome()
 
-    def _start_logging(self):
-        """Prepare logger to write into log file."""
-        file_logger = logging.FileHandler(str(self.file_path_obj))
-        self.logger.addHandler(file_logger)
-
-    def _end_logging(self):
-        """Delete handlers once the logging into file finishes."""
-        for handler in self.logger.handlers:
-            self.logger.removeHandler(handler)
-            handler.flush()
-            handler.close()
-
     def get_size(self):
         """Return the size of the log file."""
+        flush()
         return self.file_path_obj.stat().st_size
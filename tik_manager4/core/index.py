@@ -0,0 +1,449 @@
+"""Persistent metadata index for the project database.
+
+The index is an optional SQLite database living under the tikDatabase
+folder. It mirrors the key properties of the task, work and publish
+files so that the object layer can list the entities under a folder
+with a single query instead of walking the database folders.
+
+The index is kept up to date by the IO module on every write. It can be
+rebuilt from the database files at any time with rebuild_index.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from tik_manager4.core import filelog
+from tik_manager4.core import scanner
+from tik_manager4.core.scanner import ScanEntry
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+INDEX_FILE_NAME = "tik_index.db"
+
+ENTITY_TYPES = {
+    ".ttask": "task",
+    ".twork": "work",
+    ".tpub": "publish",
+}
+
+# Suffix of the version journals next to the work files. See objects.work.
+JOURNAL_SUFFIX = ".journal"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    path TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    entity_type TEXT NOT NULL,
+    mtime REAL,
+    uid,
+    parent_id,
+    name TEXT,
+    category TEXT,
+    state TEXT,
+    deleted INTEGER DEFAULT 0,
+    version INTEGER
+);
+CREATE INDEX IF NOT EXISTS entities_folder ON entities (entity_type, folder);
+CREATE INDEX IF NOT EXISTS entities_parent ON entities (entity_type, parent_id);
+"""
+
+_UPSERT = (
+    "INSERT OR REPLACE INTO entities "
+    "(path, folder, entity_type, mtime, uid, parent_id, name, "
+    "category, state, deleted, version) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _extract_record(entity_type, data):
+    """Extract the indexed fields from the entity data.
+
+    Args:
+        entity_type (str): The type of the entity. task, work or publish.
+        data (dict): The data of the entity file.
+
+    Returns:
+        dict: The indexed fields.
+    """
+    record = {
+        "name": data.get("name"),
+        "category": data.get("category"),
+        "state": data.get("state"),
+        "deleted": int(bool(data.get("deleted", False))),
+        "uid": None,
+        "parent_id": None,
+        "version": None,
+    }
+    if entity_type == "task":
+        record["uid"] = data.get("task_id")
+        record["parent_id"] = data.get("subproject_id")
+    elif entity_type == "work":
+        record["uid"] = data.get("work_id")
+        record["parent_id"] = data.get("task_id")
+        versions = data.get("versions") or []
+        if versions:
+            record["version"] = versions[-1].get("version_number")
+    elif entity_type == "publish":
+        record["uid"] = data.get("publish_id")
+        record["parent_id"] = data.get("task_id")
+        record["version"] = data.get("version_number")
+    return record
+
+
+def _merge_journal(file_path, data):
+    """Return the work data with the versions journaled next to the file.
+
+    Args:
+        file_path (str): Absolute path of the work file.
+        data (dict): The data of the work file.
+
+    Returns:
+        dict: The data with the journaled versions appended.
+    """
+    try:
+        with open(f"{file_path}{JOURNAL_SUFFIX}", "r") as _file:
+            lines = _file.readlines()
+    except OSError:
+        return data
+    versions = list(data.get("versions") or [])
+    numbers = {version.get("version_number") for version in versions}
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if entry.get("version_number") not in numbers:
+            numbers.add(entry.get("version_number"))
+            versions.append(entry)
+    return dict(data, versions=versions)
+
+
+class MetadataIndex:
+    """SQLite backed index of the entities under a database root."""
+
+    def __init__(self, database_root, timeout=10.0):
+        """Initialize the MetadataIndex.
+
+        Args:
+            database_root (str): The tikDatabase folder of the project.
+            timeout (float): Seconds to wait for a locked database.
+        """
+        self.database_root = Path(database_root).as_posix()
+        self.index_path = Path(database_root, INDEX_FILE_NAME)
+        self._timeout = timeout
+        self._connection = None
+        self._lock = threading.RLock()
+
+    @property
+    def exists(self):
+        """Return True if the index file exists on disk."""
+        return self.index_path.is_file()
+
+    def _connect(self):
+        """Return the open connection, creating the schema if necessary."""
+        if self._connection is None:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(
+                str(self.index_path),
+                timeout=self._timeout,
+                check_same_thread=False,
+            )
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def close(self):
+        """Close the connection to the index database."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def relative_path(self, file_path):
+        """Return the path relative to the database root.
+
+        Args:
+            file_path (str): Absolute path of a file under the database root.
+
+        Returns:
+            str: Posix style relative path or None if the file is not under
+                the database root.
+        """
+        path = Path(file_path).as_posix()
+        if not path.startswith(f"{self.database_root}/"):
+            return None
+        return path[len(self.database_root) + 1:]
+
+    def owns(self, file_path):
+        """Check if the given file path is under the database root."""
+        return self.relative_path(file_path) is not None
+
+    def _build_row(self, file_path, data, mtime=None):
+        """Build the database row of an entity file.
+
+        Returns:
+            tuple: The row values or None if the file is not indexable.
+        """
+        entity_type = ENTITY_TYPES.get(Path(file_path).suffix)
+        relative_path = self.relative_path(file_path)
+        if not entity_type or relative_path is None:
+            return None
+        if mtime is None:
+            try:
+                mtime = os.stat(file_path).st_mtime
+            except OSError:
+                mtime = None
+        record = _extract_record(entity_type, data or {})
+        return (
+            relative_path,
+            relative_path.rpartition("/")[0],
+            entity_type,
+            mtime,
+            record["uid"],
+            record["parent_id"],
+            record["name"],
+            record["category"],
+            record["state"],
+            record["deleted"],
+            record["version"],
+        )
+
+    def update(self, file_path, data, mtime=None):
+        """Add or update the record of an entity file.
+
+        Files which are not task, work or publish files are ignored.
+
+        Args:
+            file_path (str): Absolute path of the entity file.
+            data (dict): The data written to the entity file.
+            mtime (float, optional): Modified time of the file. If not given
+                the file is stat-ed.
+
+        Returns:
+            bool: True if the record is written, False otherwise.
+        """
+        row = self._build_row(file_path, data, mtime=mtime)
+        if row is None:
+            return False
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(_UPSERT, row)
+        return True
+
+    def remove(self, file_path):
+        """Remove the record of the given file.
+
+        Args:
+            file_path (str): Absolute path of the entity file.
+        """
+        relative_path = self.relative_path(file_path)
+        if relative_path is None:
+            return
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "DELETE FROM entities WHERE path = ?", (relative_path,)
+                )
+
+    def query(self, entity_type, folder=None, recursive=False, parent_id=None):
+        """Query the records of the given entity type.
+
+        Args:
+            entity_type (str): The type of the entity. task, work or publish.
+            folder (str, optional): Relative folder to the database root.
+                If given, only the entities in the folder are returned.
+            recursive (bool, optional): If True, the entities in the
+                sub-folders of the folder are returned as well.
+            parent_id (int, optional): If given, only the entities
+                with the matching parent id are returned.
+
+        Returns:
+            list: List of dictionaries holding the indexed fields.
+        """
+        clauses = ["entity_type = ?"]
+        arguments = [entity_type]
+        if folder is not None:
+            folder = Path(folder).as_posix().strip("/")
+            folder = "" if folder == "." else folder
+            if recursive and folder:
+                # '0' is the next character after '/' in ascii table.
+                clauses.append("(folder = ? OR (folder >= ? AND folder < ?))")
+                arguments.extend([folder, f"{folder}/", f"{folder}0"])
+            elif not recursive:
+                clauses.append("folder = ?")
+                arguments.append(folder)
+        if parent_id is not None:
+            clauses.append("parent_id = ?")
+            arguments.append(parent_id)
+        statement = (
+            "SELECT path, folder, entity_type, mtime, uid, parent_id, name, "
+            "category, state, deleted, version FROM entities WHERE "
+            f"{' AND '.join(clauses)} ORDER BY path"
+        )
+        with self._lock:
+            cursor = self._connect().execute(statement, arguments)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def query_paths(self, entity_type, folder=None, recursive=False, parent_id=None):
+        """Same as query but returns the absolute paths of the files.
+
+        Returns:
+            list: List of Path objects.
+        """
+        return [
+            Path(self.database_root, record["path"])
+            for record in self.query(
+                entity_type, folder=folder, recursive=recursive, parent_id=parent_id
+            )
+        ]
+
+    def query_entries(self, entity_type, folder=None, recursive=False, parent_id=None):
+        """Same as query but returns scan entries of the files.
+
+        The recorded modified times are used, no file is stat-ed. The
+        queried folders are handed to the scanner as listed, so that a
+        running database watcher polls them.
+
+        Returns:
+            list: List of ScanEntry objects.
+        """
+        entries = [
+            ScanEntry(Path(self.database_root, record["path"]), record["mtime"])
+            for record in self.query(
+                entity_type, folder=folder, recursive=recursive, parent_id=parent_id
+            )
+        ]
+        if folder is not None:
+            self._add_listed(entity_type, folder, entries)
+        return entries
+
+    def _add_listed(self, entity_type, folder, entries):
+        """Register the folders of the queried entries with the scanner."""
+        suffix = next(
+            suffix for suffix, name in ENTITY_TYPES.items() if name == entity_type
+        )
+        listings = {Path(self.database_root, folder): []}
+        for entry in entries:
+            listings.setdefault(entry.path.parent, []).append(entry)
+        for listed_folder, listed_entries in listings.items():
+            scanner.SCAN_CACHE.add_listed(listed_folder, suffix, listed_entries)
+
+    def rebuild(self):
+        """Rebuild the index from the files under the database root.
+
+        Returns:
+            int: Number of indexed files.
+        """
+        rows = []
+        for root, _dirs, files in os.walk(self.database_root):
+            for file_name in files:
+                if os.path.splitext(file_name)[1] not in ENTITY_TYPES:
+                    continue
+                file_path = os.path.join(root, file_name)
+                try:
+                    with open(file_path, "r") as _file:
+                        data = json.load(_file)
+                except (OSError, ValueError):
+                    LOG.warning(f"Skipping unreadable file => {file_path}")
+                    continue
+                if data.get("version_journal"):
+                    data = _merge_journal(file_path, data)
+                row = self._build_row(file_path, data)
+                if row is not None:
+                    rows.append(row)
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM entities")
+                connection.executemany(_UPSERT, rows)
+        return len(rows)
+
+
+_ACTIVE_INDEXES = {}
+
+
+def activate(database_root):
+    """Activate the index for the given database root.
+
+    If the index file does not exist yet, it is built from the existing
+    database files.
+
+    Args:
+        database_root (str): The tikDatabase folder of the project.
+
+    Returns:
+        MetadataIndex: The active index object.
+    """
+    key = Path(database_root).as_posix()
+    index = _ACTIVE_INDEXES.get(key)
+    if index is None:
+        index = MetadataIndex(database_root)
+        needs_build = not index.exists
+        _ACTIVE_INDEXES[key] = index
+        if needs_build:
+            LOG.info(f"Building the metadata index for {key}")
+            index.rebuild()
+    return index
+
+
+def deactivate(database_root):
+    """Deactivate the index for the given database root.
+
+    Args:
+        database_root (str): The tikDatabase folder of the project.
+    """
+    index = _ACTIVE_INDEXES.pop(Path(database_root).as_posix(), None)
+    if index is not None:
+        index.close()
+
+
+def get_index(database_root):
+    """Return the active index of the database root or None."""
+    if not _ACTIVE_INDEXES or not database_root:
+        return None
+    return _ACTIVE_INDEXES.get(Path(database_root).as_posix())
+
+
+def find_index(file_path):
+    """Return the active index which owns the given file or None."""
+    for index in _ACTIVE_INDEXES.values():
+        if index.owns(file_path):
+            return index
+    return None
+
+
+def rebuild_index(database_root):
+    """Rebuild the index of the given database root from the files.
+
+    Args:
+        database_root (str): The tikDatabase folder of the project.
+
+    Returns:
+        int: Number of indexed files.
+    """
+    index = get_index(database_root)
+    if index is not None:
+        return index.rebuild()
+    index = MetadataIndex(database_root)
+    try:
+        return index.rebuild()
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 2:
+        print("Usage: python -m tik_manager4.core.index <project_path>")
+        sys.exit(1)
+    _database_root = Path(sys.argv[1], "tikDatabase")
+    if not _database_root.is_dir():
+        print(f"Not a Tik Manager project => {sys.argv[1]}")
+        sys.exit(1)
+    print(f"{rebuild_index(str(_database_root))} files indexed.")
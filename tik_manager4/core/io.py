@@ -1,14 +1,430 @@
 """I/O Module to handle read/write operations."""
 
+from collections import OrderedDict
+from contextlib import contextmanager
+import os
 from pathlib import Path
 import json
 from json.decoder import JSONDecodeError
+import stat
+import threading
+import time
 from tik_manager4.core import filelog
+from tik_manager4.core import index
+from tik_manager4.core import scanner
+from tik_manager4.core import trace
 from tik_manager4.external import filelock as fl
 
 LOG = filelog.Filelog(logname=__name__)
 
 
+def _copy_json(data):
+    """Return a deep copy of the json compatible data.
+
+    Much faster than copy.deepcopy since only json types are expected.
+    """
+    if type(data) is dict:  # pylint: disable=unidiomatic-typecheck
+        return {key: _copy_json(value) for key, value in data.items()}
+    if type(data) is list:  # pylint: disable=unidiomatic-typecheck
+        return [_copy_json(value) for value in data]
+    return data
+
+
+class ReadCache:
+    """Process-wide LRU cache for the parsed json files.
+
+    Entries are keyed by the absolute file path and validated with the
+    (st_mtime_ns, st_size) signature of the file. A cached entry is only
+    returned if the signature of the file is unchanged since it is cached.
+    """
+
+    def __init__(self, max_size=4096):
+        """Initialize the ReadCache.
+
+        Args:
+            max_size (int): Maximum number of files to keep. 0 disables
+                the cache.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def signature(stat_result):
+        """Return the validation signature of the given stat result."""
+        return stat_result.st_mtime_ns, stat_result.st_size
+
+    def get(self, key, signature):
+        """Return a copy of the cached data or None.
+
+        Args:
+            key (str): Absolute path of the file.
+            signature (tuple): Current signature of the file.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            data = entry[1]
+        return _copy_json(data)
+
+    def put(self, key, signature, data):
+        """Store a copy of the data for the given key.
+
+        Args:
+            key (str): Absolute path of the file.
+            signature (tuple): Signature of the file the data belongs to.
+            data (dict): Parsed data of the file.
+        """
+        if not self.max_size:
+            return
+        data = _copy_json(data)
+        with self._lock:
+            self._entries[key] = (signature, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Drop the given key or all the entries if no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def reset_stats(self):
+        """Reset the hit and miss counters."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return the cache statistics for profiling.
+
+        Returns:
+            dict: hits, misses, size and max_size of the cache.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+READ_CACHE = ReadCache(max_size=int(os.getenv("TIK_IO_CACHE_SIZE", "4096")))
+
+# Seconds to wait for the lock of a file before giving up.
+LOCK_TIMEOUT = 3.0
+# A lock file not touched for this many seconds is considered left over
+# from a crashed process. Writes take milliseconds, so this is generous.
+STALE_LOCK_AGE = 30.0
+# Attempts to replace a file which is held open by a reader on Windows.
+REPLACE_ATTEMPTS = 5
+
+
+class LockStats:
+    """Process-wide contention counters of the file locks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the counters."""
+        with self._lock:
+            self.acquired = 0
+            self.contended = 0
+            self.wait_time = 0.0
+            self.max_wait_time = 0.0
+            self.timeouts = 0
+            self.stale_breaks = 0
+
+    def record(self, wait_time=0.0, contended=False, timeout=False, stale=False):
+        """Record the result of a lock acquisition."""
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.acquired += 1
+            if contended:
+                self.contended += 1
+                self.wait_time += wait_time
+                self.max_wait_time = max(self.max_wait_time, wait_time)
+            if stale:
+                self.stale_breaks += 1
+
+    def stats(self):
+        """Return the lock statistics for profiling.
+
+        Returns:
+            dict: acquired, contended, wait_time, max_wait_time, timeouts
+                and stale_breaks.
+        """
+        with self._lock:
+            return {
+                "acquired": self.acquired,
+                "contended": self.contended,
+                "wait_time": self.wait_time,
+                "max_wait_time": self.max_wait_time,
+                "timeouts": self.timeouts,
+                "stale_breaks": self.stale_breaks,
+            }
+
+
+LOCK_STATS = LockStats()
+
+
+def _is_stale(lock_path):
+    """Check if the lock file is not touched for STALE_LOCK_AGE seconds."""
+    try:
+        return time.time() - os.stat(lock_path).st_mtime > STALE_LOCK_AGE
+    except OSError:
+        return False
+
+
+def _break_stale_lock(lock_path):
+    """Remove the stale lock unless another waiter already broke it.
+
+    The lock is renamed to a unique name first, so only one of the waiters
+    can take it. If the renamed lock is not stale, it is the new lock of the
+    waiter which broke the stale one, and it is put back.
+
+    Returns:
+        bool: True if the stale lock is removed by this call.
+    """
+    broken_path = f"{lock_path}.{os.getpid()}.{threading.get_ident()}.stale"
+    try:
+        os.rename(lock_path, broken_path)
+    except OSError:
+        return False
+    if _is_stale(broken_path):
+        os.remove(broken_path)
+        return True
+    try:
+        # does not replace a lock acquired in the meantime.
+        os.link(broken_path, lock_path)
+    except OSError as exc:
+        LOG.warning(f"Lock cannot be restored => {lock_path}: {exc}")
+    os.remove(broken_path)
+    return False
+
+
+@contextmanager
+def file_lock(file_path, timeout=None):
+    """Hold the lock of the file for the duration of the context.
+
+    The lock is released as soon as the context exits. Where only the soft
+    file locks are available, a lock held longer than STALE_LOCK_AGE is
+    assumed to be left over from a crashed process and is broken once.
+
+    Args:
+        file_path (str): The file to lock. The lock file is created next
+            to it with the '.lock' suffix.
+        timeout (float, optional): Seconds to wait. Defaults to LOCK_TIMEOUT.
+
+    Raises:
+        fl.Timeout: If the lock cannot be acquired in time.
+    """
+    timeout = LOCK_TIMEOUT if timeout is None else timeout
+    lock_path = f"{file_path}.lock"
+    lock = fl.FileLock(lock_path, timeout=timeout)
+    contended = False
+    stale = False
+    start = time.perf_counter()
+    try:
+        lock.acquire(blocking=False)
+    except fl.Timeout:
+        contended = True
+        try:
+            lock.acquire(timeout=timeout, poll_interval=0.01)
+        except fl.Timeout as exc:
+            # hard locks die with their process, only the soft ones go stale.
+            if not isinstance(lock, fl.SoftFileLock) or not _is_stale(lock_path):
+                LOCK_STATS.record(time.perf_counter() - start, True, timeout=True)
+                raise fl.Timeout("File is locked by another process") from exc
+            LOG.warning(f"Breaking the stale lock => {lock_path}")
+            stale = True
+            _break_stale_lock(lock_path)
+            lock = fl.SoftFileLock(lock_path, timeout=timeout)
+            try:
+                lock.acquire(timeout=timeout, poll_interval=0.01)
+            except fl.Timeout as retry_exc:
+                LOCK_STATS.record(
+                    time.perf_counter() - start, True, timeout=True, stale=True
+                )
+                raise fl.Timeout("File is locked by another process") from retry_exc
+    LOCK_STATS.record(time.perf_counter() - start, contended, stale=stale)
+    try:
+        # mark the lock as alive for the stale lock detection.
+        os.utime(lock_path)
+    except OSError:
+        pass
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+class JsonSerializer:
+    """Standard library json backend. Always available."""
+
+    name = "json"
+
+    def loads(self, data):
+        """Parse the json bytes.
+
+        Args:
+            data (bytes): Json document.
+
+        Raises:
+            ValueError: If the document is not valid json.
+        """
+        return json.loads(data)
+
+    def dumps(self, data, compact=False):
+        """Serialize the data to json bytes.
+
+        Args:
+            data (dict): Json compatible data.
+            compact (bool): If True, no whitespace is written.
+        """
+        if compact:
+            return json.dumps(data, separators=(",", ":")).encode("utf-8")
+        return json.dumps(data, indent=4).encode("utf-8")
+
+
+class OrjsonSerializer(JsonSerializer):
+    """orjson backend.
+
+    The output is not the same as the standard library: indented files use
+    two spaces instead of four, non-ascii characters are not escaped and
+    NaN is written as null. Documents orjson rejects, e.g. with NaN written
+    by the standard library, are parsed with the standard library.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson  # pylint: disable=import-outside-toplevel
+
+        self._orjson = orjson
+
+    def loads(self, data):
+        try:
+            return self._orjson.loads(data)
+        except self._orjson.JSONDecodeError:
+            return super().loads(data)
+
+    def dumps(self, data, compact=False):
+        option = self._orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= self._orjson.OPT_INDENT_2
+        try:
+            return self._orjson.dumps(data, option=option)
+        except TypeError:
+            # e.g. integers bigger than 64 bits.
+            return super().dumps(data, compact=compact)
+
+
+class UjsonSerializer(JsonSerializer):
+    """ujson backend."""
+
+    name = "ujson"
+
+    def __init__(self):
+        import ujson  # pylint: disable=import-outside-toplevel
+
+        self._ujson = ujson
+
+    def loads(self, data):
+        # older ujson versions raise ValueError without JSONDecodeError.
+        try:
+            return self._ujson.loads(data)
+        except ValueError as exc:
+            raise ValueError(str(exc)) from exc
+
+    def dumps(self, data, compact=False):
+        indent = 0 if compact else 4
+        return self._ujson.dumps(data, indent=indent).encode("utf-8")
+
+
+# In the order of preference.
+SERIALIZERS = {
+    "orjson": OrjsonSerializer,
+    "ujson": UjsonSerializer,
+    "json": JsonSerializer,
+}
+
+
+def get_serializer(name=None, fastest=False):
+    """Return the requested serializer.
+
+    Args:
+        name (str, optional): One of the SERIALIZERS keys. Falls back to
+            the default if it cannot be imported.
+        fastest (bool, optional): If True, the default is the fastest
+            importable backend instead of the standard library.
+
+    Returns:
+        JsonSerializer: The serializer object.
+    """
+    names = list(SERIALIZERS) if fastest else []
+    if name in SERIALIZERS:
+        names.insert(0, name)
+    elif name:
+        LOG.warning(f"Unknown json backend '{name}'. Using the default.")
+    for backend in names:
+        try:
+            return SERIALIZERS[backend]()
+        except ImportError:
+            continue
+    return JsonSerializer()
+
+
+# The files are written like the standard library unless a backend is
+# requested. The compact files are not indented in any case and use the
+# fastest backend.
+SERIALIZER = get_serializer(os.getenv("TIK_JSON_BACKEND"))
+COMPACT_SERIALIZER = get_serializer(os.getenv("TIK_JSON_BACKEND"), fastest=True)
+
+# Root folders (e.g. the projects) whose files are written without indentation.
+_COMPACT_ROOTS = set()
+
+
+def _normalize_root(folder):
+    return os.path.join(os.path.normcase(os.path.abspath(folder)), "")
+
+
+def set_compact(root, state=True):
+    """Enable or disable the compact files under the root folder.
+
+    Args:
+        root (str): The folder. Usually the project root.
+        state (bool): If True, the files under the root are written
+            without indentation.
+    """
+    if state:
+        _COMPACT_ROOTS.add(_normalize_root(root))
+    else:
+        _COMPACT_ROOTS.discard(_normalize_root(root))
+
+
+def is_compact(file_path):
+    """Check if the file is under one of the compact roots."""
+    if not _COMPACT_ROOTS:
+        return False
+    file_path = os.path.normcase(os.path.abspath(file_path))
+    return any(file_path.startswith(root) for root in _COMPACT_ROOTS)
+
+
 class IO:
     """Handler class for read/write operations."""
 
@@ -48,14 +464,32 @@ class IO:
             msg = f"IO module does not support this extension ({ext})"
             LOG.error(msg)
             raise ValueError(msg)
-        self._path_obj.parent.mkdir(parents=True, exist_ok=True)
         self._string_path = str(self._path_obj)
 
-    def read(self, file_path=None):
+    def stat(self, file_path=None):
+        """Return the stat result of the file or None if it is not a file.
+
+        Args:
+            file_path (str): The file path to stat.
+        """
+        try:
+            stat_result = os.stat(file_path or self._string_path)
+        except (OSError, ValueError):
+            return None
+        if not stat.S_ISREG(stat_result.st_mode):
+            return None
+        return stat_result
+
+    @trace.traced("io.read", category="io")
+    def read(self, file_path=None, stat_result=None):
         """Read the given file and return the data.
 
+        Unchanged files are served from the process-wide read cache.
+
         Args:
             file_path (str): The file path to read from.
+            stat_result (os.stat_result, optional): Already collected stat
+                result of the file. Saves a stat call if provided.
 
         Raises:
             FileNotFoundError: If the file does not exist.
@@ -64,15 +498,26 @@ class IO:
             dict: The data read from the file.
         """
         _path_obj = Path(file_path) if file_path else self._path_obj
-        if _path_obj.is_file():
-            return self._load_json(str(_path_obj))
-        msg = f"File does not exist => {str(_path_obj)}"
-        LOG.error(msg)
-        raise FileNotFoundError(msg)
+        stat_result = stat_result or self.stat(str(_path_obj))
+        if stat_result is None:
+            msg = f"File does not exist => {str(_path_obj)}"
+            LOG.error(msg)
+            raise FileNotFoundError(msg)
+        key = os.path.abspath(str(_path_obj))
+        signature = READ_CACHE.signature(stat_result)
+        data = READ_CACHE.get(key, signature)
+        if data is None:
+            data = self._load_json(str(_path_obj))
+            READ_CACHE.put(key, signature, data)
+        return data
 
+    @trace.traced("io.write", category="io")
     def write(self, data, file_path=None):
         """Write the given data to the file.
 
+        The data is written to a temporary file which replaces the file
+        at once. Readers never see a partially written file.
+
         Args:
             data (dict): The data to write.
             file_path (str): The file path to write to.
@@ -81,13 +526,60 @@ class IO:
             fl.Timeout: If the file is locked by another process.
         """
         _path_obj = Path(file_path) if file_path else self._path_obj
-        _lock_path = f"{str(_path_obj)}.lock"
-        lock = fl.FileLock(_lock_path, timeout=3)
-        try:
-            lock.acquire()
+        _path_obj.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(str(_path_obj)):
             self._dump_json(data, str(_path_obj))
-        except fl.Timeout as exc:
-            raise fl.Timeout("File is locked by another process") from exc
+            # the signature must belong to this write, not to the next one.
+            self._update_cache(data, str(_path_obj))
+        self._update_index(data, str(_path_obj))
+        self._touch_folder(str(_path_obj.parent))
+
+    @staticmethod
+    def _touch_folder(folder):
+        """Mark the folder as changed for the directory scanners.
+
+        Rewriting a file in place does not change the modified time of its
+        folder. Bump it so that the other processes re-list the folder.
+
+        Args:
+            folder (str): The folder of the written file.
+        """
+        scanner.invalidate(folder)
+        try:
+            os.utime(folder)
+        except OSError:
+            pass
+
+    def _update_cache(self, data, file_path):
+        """Store the written data in the read cache.
+
+        Args:
+            data (dict): The data written to the file.
+            file_path (str): The file path written.
+        """
+        key = os.path.abspath(file_path)
+        stat_result = self.stat(file_path)
+        if stat_result is None:
+            READ_CACHE.invalidate(key)
+            return
+        READ_CACHE.put(key, READ_CACHE.signature(stat_result), data)
+
+    @staticmethod
+    def _update_index(data, file_path):
+        """Update the metadata index if the file lives under an active one.
+
+        Args:
+            data (dict): The data written to the file.
+            file_path (str): The file path written.
+        """
+        _index = index.find_index(file_path)
+        if _index is None:
+            return
+        try:
+            _index.update(file_path, data)
+        except Exception as exc:  # pylint: disable=broad-except
+            # the index is a cache. Never fail a write because of it.
+            LOG.warning(f"Metadata index could not be updated for {file_path}: {exc}")
 
     @staticmethod
     def _load_json(file_path):
@@ -97,9 +589,8 @@ class IO:
             file_path (str): The file path to load.
         """
         try:
-            with open(file_path, "r") as f:
-                data = json.load(f)
-                return data
+            with open(file_path, "rb") as f:
+                return COMPACT_SERIALIZER.loads(f.read())
         except (ValueError, JSONDecodeError) as exc:
             msg = f"Corrupted file => {file_path}"
             LOG.error(msg)
@@ -116,14 +607,57 @@ class IO:
 
     @staticmethod
     def _dump_json(data, file_path):
-        """Save the data to the json file.
+        """Save the data to the json file atomically.
 
         Args:
             data (dict): The data to save.
             file_path (str): The file path to save.
+
+        Raises:
+            PermissionError: If the existing file is write protected.
+        """
+        try:
+            existing_mode = stat.S_IMODE(os.stat(file_path).st_mode)
+        except OSError:
+            existing_mode = None
+        if existing_mode is not None and not os.access(file_path, os.W_OK):
+            raise PermissionError(f"File is write protected => {file_path}")
+
+        if is_compact(file_path):
+            content = COMPACT_SERIALIZER.dumps(data, compact=True)
+        else:
+            content = SERIALIZER.dumps(data)
+        temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            if existing_mode is not None:
+                os.chmod(temp_path, existing_mode)
+            IO._replace(temp_path, file_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _replace(source, destination):
+        """Replace the destination with the source file.
+
+        On Windows replacing fails while another process has the file open.
+        Those readers are short-lived, so the replace is retried.
         """
-        with open(file_path, "w") as f:
-            json.dump(data, f, indent=4)
+        for attempt in range(REPLACE_ATTEMPTS):
+            try:
+                os.replace(source, destination)
+                return
+            except PermissionError:
+                if attempt == REPLACE_ATTEMPTS - 1:
+                    raise
+                time.sleep(0.05 * (attempt + 1))
 
     def get_modified_time(self):
         """Get the modified time of the file"""
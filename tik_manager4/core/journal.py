@@ -0,0 +1,113 @@
+"""Append-only json journals.
+
+A journal is a text file holding one json entry per line. Appending an
+entry costs a single small write no matter how big the journaled data is.
+The owner of the journal replays the entries on top of its base file and
+compacts them into the base file from time to time.
+
+A line which cannot be parsed, e.g. a partially written last line after
+a crash, is skipped with a warning.
+"""
+
+import os
+from pathlib import Path
+
+from tik_manager4.core import filelog
+from tik_manager4.core import io
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+
+class Journal:
+    """Append-only json lines file."""
+
+    def __init__(self, file_path=None):
+        """Initialize the Journal.
+
+        Args:
+            file_path (str, optional): Path of the journal file.
+        """
+        self._file_path = None
+        self._count = 0
+        self._signature = None
+        self.file_path = file_path
+
+    @property
+    def file_path(self):
+        """Path of the journal file."""
+        return self._file_path
+
+    @file_path.setter
+    def file_path(self, new_path):
+        self._file_path = new_path
+        self._signature = self._stat()
+        self._count = len(self.read()) if new_path else 0
+
+    def __len__(self):
+        """Number of entries known to this journal object."""
+        return self._count
+
+    def _stat(self):
+        """Return the (st_mtime_ns, st_size) signature of the file or None."""
+        try:
+            stat_result = os.stat(self._file_path)
+        except (OSError, TypeError):
+            return None
+        return stat_result.st_mtime_ns, stat_result.st_size
+
+    def is_modified(self):
+        """Check if the journal is changed by someone else since it is read."""
+        return self._stat() != self._signature
+
+    def read(self):
+        """Return all the entries in the journal.
+
+        Returns:
+            list: The entries in the order they are appended.
+        """
+        if not self._file_path or not os.path.isfile(self._file_path):
+            return []
+        entries = []
+        with open(self._file_path, "rb") as _file:
+            for line_number, line in enumerate(_file, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(io.COMPACT_SERIALIZER.loads(line))
+                except ValueError:
+                    LOG.warning(
+                        f"Skipping corrupted journal entry => "
+                        f"{self._file_path}:{line_number}"
+                    )
+        return entries
+
+    def append(self, *entries):
+        """Append the entries to the journal.
+
+        Args:
+            *entries (dict): Json serializable entries.
+        """
+        if not entries:
+            return
+        serializer = io.COMPACT_SERIALIZER
+        lines = b"".join(
+            serializer.dumps(entry, compact=True) + b"\n" for entry in entries
+        )
+        Path(self._file_path).parent.mkdir(parents=True, exist_ok=True)
+        with io.file_lock(self._file_path):
+            with open(self._file_path, "ab") as _file:
+                _file.write(lines)
+                _file.flush()
+                os.fsync(_file.fileno())
+        self._count += len(entries)
+        self._signature = self._stat()
+
+    def clear(self):
+        """Remove all the entries."""
+        self._count = 0
+        self._signature = None
+        if not self._file_path or not os.path.isfile(self._file_path):
+            return
+        with io.file_lock(self._file_path):
+            os.remove(self._file_path)
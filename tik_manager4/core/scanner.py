@@ -0,0 +1,283 @@
+"""Directory scanning for database entity discovery.
+
+Entities (tasks, works and publishes) are discovered by listing the
+database folders. The scanner uses os.scandir to collect the names and
+the stat results in a single pass, so callers can decide whether an
+already loaded object needs a reload without stat-ing it again.
+
+Listings are remembered per folder together with the signature of the
+folder (modified time and link count). A folder is listed again only if
+its signature changes. Since a folder modified within the timestamp
+resolution of the file system can change again without changing its
+signature, listings of recently modified folders are not remembered.
+
+The files written through the io module bump the modified time of their
+folder, so an unchanged signature is trusted. Rewriting a file in place,
+like the older clients do, does not change the signature of its folder.
+Enable the re-stat option to stat the files of a remembered listing again
+when the signature is checked, so their modified times are current.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from tik_manager4.core import trace
+
+# Folders modified more recently than this (in seconds) are not trusted.
+# Covers the coarse timestamp resolution of FAT and some network shares.
+RACY_WINDOW = 2.0
+
+
+class ScanEntry(NamedTuple):
+    """A discovered file and its modified time."""
+    path: Path
+    mtime: float
+
+
+class _FolderRecord:
+    """Remembered listing of a folder."""
+
+    __slots__ = ("signature", "entries", "folders", "checked_at")
+
+    def __init__(self, signature, entries, folders, checked_at):
+        self.signature = signature
+        self.entries = entries
+        self.folders = folders
+        self.checked_at = checked_at
+
+
+def _list_folder(folder, suffix):
+    """List the files with the suffix and the sub-folders of the folder.
+
+    Returns:
+        tuple: (list of ScanEntry, list of sub-folder paths)
+    """
+    entries = []
+    folders = []
+    with os.scandir(folder) as iterator:
+        for entry in iterator:
+            try:
+                if entry.name.endswith(suffix) and entry.is_file():
+                    entries.append(ScanEntry(Path(entry.path), entry.stat().st_mtime))
+                elif entry.is_dir():
+                    folders.append(entry.path)
+            except OSError:
+                # the entry is removed during the scan.
+                continue
+    return entries, folders
+
+
+class ScanCache:
+    """Process-wide memory of the folder listings.
+
+    The trust window is the number of seconds a remembered listing is
+    used without even checking the folder signature. Zero means the
+    signature is checked on every scan. If restat is enabled, the files
+    of a listing with an unchanged signature are stat-ed again.
+
+    Listings of the folders under a watched root are trusted until they
+    are invalidated. The folders listed under a watched root are collected
+    for the watcher, which only polls the folders loaded by the scans. See
+    the watcher module.
+    """
+
+    def __init__(self, trust_window=0.0, restat=False):
+        """Initialize the ScanCache.
+
+        Args:
+            trust_window (float, optional): Seconds to trust a listing
+                without checking the folder.
+            restat (bool, optional): Stat the files of the unchanged
+                folders again. Needed when the older clients share the
+                database.
+        """
+        self.trust_window = trust_window
+        self.restat = restat
+        self._records = {}
+        self._lock = threading.Lock()
+        self._watched_roots = set()
+        # folders listed under the watched roots since the watcher collected them.
+        self._listed = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(folder):
+        return os.path.normcase(os.path.abspath(folder))
+
+    def watch(self, root):
+        """Trust the listings under the root until they are invalidated.
+
+        Args:
+            root (str): The watched folder.
+        """
+        with self._lock:
+            self._watched_roots.add(self._key(root))
+
+    def unwatch(self, root):
+        """Stop trusting the listings under the root."""
+        with self._lock:
+            self._watched_roots.discard(self._key(root))
+        self.pop_listed(root)
+
+    def pop_listed(self, root):
+        """Return and forget the folders listed under the root.
+
+        Args:
+            root (str): The watched folder.
+
+        Returns:
+            list: (folder, suffix, list of ScanEntry) tuples of the listings.
+        """
+        root_key = self._key(root)
+        with self._lock:
+            keys = [
+                key for key in self._listed
+                if key[0] == root_key or key[0].startswith(root_key + os.sep)
+            ]
+            return [self._listed.pop(key) for key in keys]
+
+    def add_listed(self, folder, suffix, entries):
+        """Collect a listing served from elsewhere for the watcher.
+
+        Listings read from the metadata index do not go through
+        list_folder. Adding them lets the watcher poll their folders too.
+
+        Args:
+            folder (str): The listed folder.
+            suffix (str): The file suffix of the entries.
+            entries (list): List of ScanEntry objects in the folder.
+        """
+        key = (self._key(folder), suffix)
+        with self._lock:
+            if self._watched_roots and self._is_watched(key[0]):
+                self._listed[key] = (os.fspath(folder), suffix, entries)
+
+    def _is_watched(self, folder_key):
+        return any(
+            folder_key == root or folder_key.startswith(root + os.sep)
+            for root in self._watched_roots
+        )
+
+    def _is_trusted(self, record, folder_key, now):
+        if self.trust_window and now - record.checked_at < self.trust_window:
+            return True
+        return bool(self._watched_roots) and self._is_watched(folder_key)
+
+    @staticmethod
+    def _restat(entries):
+        """Return the entries with their current modified times.
+
+        Returns:
+            list: The ScanEntry objects or None if a file is removed.
+        """
+        fresh = []
+        for entry in entries:
+            try:
+                mtime = os.stat(entry.path).st_mtime
+            except OSError:
+                return None
+            if mtime != entry.mtime:
+                entry = ScanEntry(entry.path, mtime)
+            fresh.append(entry)
+        return fresh
+
+    def list_folder(self, folder, suffix):
+        """Return the listing of the folder, re-using it if unchanged.
+
+        Args:
+            folder (str): The folder to list.
+            suffix (str): The file suffix to collect.
+
+        Returns:
+            tuple: (list of ScanEntry, list of sub-folder paths). Both are
+                empty if the folder does not exist.
+        """
+        key = (self._key(folder), suffix)
+        now = time.time()
+        with self._lock:
+            record = self._records.get(key)
+        if record and self._is_trusted(record, key[0], now):
+            self.hits += 1
+            return record.entries, record.folders
+        try:
+            stat_result = os.stat(folder)
+        except OSError:
+            self.invalidate(folder)
+            return [], []
+        signature = (stat_result.st_mtime_ns, stat_result.st_nlink)
+        if record and record.signature == signature:
+            entries = self._restat(record.entries) if self.restat else record.entries
+            if entries is not None:
+                with self._lock:
+                    record.entries = entries
+                    record.checked_at = now
+                self.hits += 1
+                return entries, record.folders
+
+        self.misses += 1
+        try:
+            entries, folders = _list_folder(folder, suffix)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            self.invalidate(folder)
+            return [], []
+        self.add_listed(folder, suffix, entries)
+        with self._lock:
+            if now - stat_result.st_mtime > RACY_WINDOW:
+                self._records[key] = _FolderRecord(signature, entries, folders, now)
+            else:
+                self._records.pop(key, None)
+        return entries, folders
+
+    def invalidate(self, folder):
+        """Forget the listings of the given folder.
+
+        Args:
+            folder (str): The folder path.
+        """
+        folder_key = self._key(folder)
+        with self._lock:
+            for key in [key for key in self._records if key[0] == folder_key]:
+                del self._records[key]
+
+    def clear(self):
+        """Forget all the listings."""
+        with self._lock:
+            self._records.clear()
+            self._listed.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+SCAN_CACHE = ScanCache()
+
+
+@trace.traced("scanner.scan_directory", category="scan")
+def scan_directory(folder, suffix, recursive=False):
+    """Collect the files with the given suffix under the folder.
+
+    Args:
+        folder (str): The folder to scan.
+        suffix (str): The file suffix to collect. e.g. ".twork"
+        recursive (bool, optional): If True, the sub-folders are scanned
+            as well.
+
+    Returns:
+        list: List of ScanEntry objects. Empty if the folder does not exist.
+    """
+    collected = []
+    pending = [os.fspath(folder)]
+    while pending:
+        entries, folders = SCAN_CACHE.list_folder(pending.pop(), suffix)
+        collected.extend(entries)
+        if recursive:
+            pending.extend(folders)
+    return collected
+
+
+def invalidate(folder):
+    """Forget the remembered listings of the folder."""
+    SCAN_CACHE.invalidate(folder)
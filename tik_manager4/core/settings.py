@@ -34,9 +34,10 @@ class Settings:
         """Set the settings file path."""
         self._filepath = file_path
         self._io.file_path = file_path
-        if self._io.file_exists(file_path):
-            self._time_stamp = self._io.get_modified_time()
-            self.initialize(self._io.read())
+        stat_result = self._io.stat()
+        if stat_result:
+            self._time_stamp = stat_result.st_mtime
+            self.initialize(self._io.read(stat_result=stat_result))
 
     def reload(self):
         """Reload the settings from file."""
@@ -58,9 +59,17 @@ class Settings:
         """Return the current dictionary data."""
         return self._current_value
 
-    def is_modified(self):
-        """Check if the file has been modified since initialization."""
-        return not bool(self._io.get_modified_time() == self._time_stamp)
+    def is_modified(self, modified_time=None):
+        """Check if the file has been modified since initialization.
+
+        Args:
+            modified_time (float, optional): The modified time of the file
+                if it is already known e.g. from a directory scan. If not
+                given, the file is stat-ed.
+        """
+        if modified_time is None:
+            modified_time = self._io.get_modified_time()
+        return not bool(modified_time == self._time_stamp)
 
     def initialize(self, data):
         """Initialize the settings data.
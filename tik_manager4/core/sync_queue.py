@@ -0,0 +1,543 @@
+"""Persistent background queue moving the localized files to the origin.
+
+A job is a group of items, each item moving a file or a folder from the
+local cache to the project. The items are moved concurrently by a bounded
+thread pool and the transfers share an optional bandwidth limit.
+
+The jobs are written to a json file in the local cache folder whenever an
+item is finished. Jobs interrupted by a crash or a closed session are
+picked up again the next time the queue is started, and the copy engine
+continues the partially copied files.
+
+Example:
+    queue = get_queue("/local/cache/project/.tik_sync", workers=4)
+    queue.submit("publish_v003", [(local_path, origin_path)])
+    queue.wait("publish_v003")
+"""
+
+import concurrent.futures
+import os
+import threading
+import time
+from pathlib import Path
+
+from tik_manager4.core import copier
+from tik_manager4.core import filelog
+from tik_manager4.core import io
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+QUEUE_FILE = "sync_queue.json"
+DEFAULT_WORKERS = 4
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_QUEUES = {}
+_QUEUES_LOCK = threading.Lock()
+
+
+class SyncItem:
+    """A file or a folder to move to the origin."""
+
+    def __init__(self, source, target, status=PENDING, error="", size=0, transferred=0):
+        """Initialize the SyncItem.
+
+        Args:
+            source (str): The localized file or folder.
+            target (str): The origin path.
+            status (str): One of pending, running, done or failed.
+            error (str): The error message of the failed item.
+            size (int): Total bytes of the item. Known after it is started.
+            transferred (int): Transferred bytes of the item.
+        """
+        self.source = str(source)
+        self.target = str(target)
+        self.status = status
+        self.error = error
+        self.size = size
+        self.transferred = transferred
+
+    @classmethod
+    def from_dict(cls, dictionary):
+        """Create the item from its dictionary."""
+        return cls(**dictionary)
+
+    def to_dict(self):
+        """Convert the item to a dictionary."""
+        return {
+            "source": self.source,
+            "target": self.target,
+            "status": self.status,
+            "error": self.error,
+            "size": self.size,
+            "transferred": self.transferred,
+        }
+
+
+class SyncJob:
+    """Items synced together. The job is done when all of its items are."""
+
+    def __init__(self, job_id, items, data=None, status=PENDING, error=""):
+        """Initialize the SyncJob.
+
+        Args:
+            job_id (str): Unique id of the job.
+            items (list): SyncItem objects.
+            data (dict, optional): Json compatible data for the finalizer.
+            status (str): One of pending, running, done or failed.
+            error (str): The error message of the finalizer.
+        """
+        self.job_id = job_id
+        self.items = items
+        self.data = data or {}
+        self.status = status
+        self.error = error
+        # not persistent.
+        self.callbacks = []
+
+    @classmethod
+    def from_dict(cls, dictionary):
+        """Create the job from its dictionary."""
+        items = [SyncItem.from_dict(item) for item in dictionary.get("items", [])]
+        return cls(
+            dictionary["job_id"],
+            items,
+            data=dictionary.get("data"),
+            status=dictionary.get("status", PENDING),
+            error=dictionary.get("error", ""),
+        )
+
+    def to_dict(self):
+        """Convert the job to a dictionary."""
+        return {
+            "job_id": self.job_id,
+            "items": [item.to_dict() for item in self.items],
+            "data": self.data,
+            "status": self.status,
+            "error": self.error,
+        }
+
+    @property
+    def is_finished(self):
+        """True if the job is done or failed."""
+        return self.status in (DONE, FAILED)
+
+    @property
+    def errors(self):
+        """Error messages of the job and its failed items."""
+        errors = [item.error for item in self.items if item.status == FAILED]
+        if self.error:
+            errors.append(self.error)
+        return errors
+
+    def count(self, status):
+        """Return the number of items with the given status."""
+        return sum(1 for item in self.items if item.status == status)
+
+    def progress(self):
+        """Return the transferred and the total bytes of the started items."""
+        return (
+            sum(item.transferred for item in self.items),
+            sum(item.size for item in self.items),
+        )
+
+
+class Throttle:
+    """Bandwidth limit shared by the transfer threads."""
+
+    def __init__(self, bytes_per_second=0):
+        """Initialize the Throttle.
+
+        Args:
+            bytes_per_second (int): The limit. 0 disables it.
+        """
+        self.bytes_per_second = bytes_per_second
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def consume(self, size):
+        """Wait until the given bytes fit into the limit."""
+        if not self.bytes_per_second or size <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + size / self.bytes_per_second
+            delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class SyncQueue:
+    """Persistent queue moving the items of the jobs in background threads."""
+
+    def __init__(
+        self, folder, workers=DEFAULT_WORKERS, bandwidth=0, verify=False, finalizer=None
+    ):
+        """Initialize the SyncQueue.
+
+        Args:
+            folder (str): The folder of the queue file.
+            workers (int): Maximum number of items moved at the same time.
+                The files of a folder item are copied one at a time.
+            bandwidth (int): Bandwidth limit in bytes per second. 0 is
+                unlimited.
+            verify (bool): Compare the checksums of the copied files with
+                the localized files before removing them.
+            finalizer (callable, optional): Called with the job from a
+                worker thread when all of its items are done. Returns a
+                (bool, msg) tuple. The job fails if it returns False.
+        """
+        self.folder = str(folder)
+        self.workers = max(1, workers)
+        self.throttle = Throttle(bandwidth)
+        self.verify = verify
+        self.finalizer = finalizer
+        self._io = io.IO(str(Path(self.folder, QUEUE_FILE)))
+        self._jobs = {}
+        self._callbacks = []
+        self._lock = threading.RLock()
+        self._finished = threading.Condition(self._lock)
+        self._pool = None
+        # ids of the items submitted to the pool.
+        self._active = set()
+        # ids of the finished jobs whose callbacks are not called yet.
+        self._finishing = set()
+        self.load()
+
+    @property
+    def queue_file(self):
+        """Path of the queue file."""
+        return self._io.file_path
+
+    @property
+    def jobs(self):
+        """All the jobs of this session and the unfinished ones of earlier sessions."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    @property
+    def is_running(self):
+        """True if the queue is started."""
+        return self._pool is not None
+
+    def get_job(self, job_id):
+        """Return the job with the given id or None."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def add_callback(self, callback):
+        """Add a function called with the job and the item on every change.
+
+        Callbacks are called from the worker threads.
+        """
+        with self._lock:
+            if callback not in self._callbacks:
+                self._callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        """Remove a callback added with add_callback."""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def load(self):
+        """Load the unfinished jobs from the queue file.
+
+        Items which were running when the queue is stopped are pending again.
+        """
+        if not self._io.file_exists(self.queue_file):
+            return
+        try:
+            data = self._io.read()
+        except Exception as exc:  # pylint: disable=broad-except
+            LOG.error(f"Sync queue cannot be read => {self.queue_file}: {exc}")
+            return
+        with self._lock:
+            for job_data in data.get("jobs", []):
+                job = SyncJob.from_dict(job_data)
+                if job.job_id in self._jobs:
+                    continue
+                for item in job.items:
+                    if item.status == RUNNING:
+                        item.status = PENDING
+                if job.status == RUNNING:
+                    job.status = PENDING
+                self._jobs[job.job_id] = job
+
+    def save(self):
+        """Write the unfinished and the failed jobs to the queue file.
+
+        The file is removed when all the jobs are done.
+        """
+        with self._lock:
+            jobs = [job.to_dict() for job in self._jobs.values() if job.status != DONE]
+            try:
+                if jobs:
+                    self._io.write({"jobs": jobs})
+                elif self._io.file_exists(self.queue_file):
+                    # nothing to resume.
+                    os.remove(self.queue_file)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOG.error(f"Sync queue cannot be saved => {self.queue_file}: {exc}")
+
+    def start(self):
+        """Start the worker threads and resume the unfinished jobs."""
+        with self._lock:
+            if self._pool:
+                return
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="tik_sync"
+            )
+            for job in self._jobs.values():
+                if job.status in (PENDING, RUNNING):
+                    self._schedule(job)
+
+    def stop(self, wait=True):
+        """Stop the worker threads.
+
+        The running items are finished. The pending items stay in the queue
+        file and are resumed with the next start.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if not pool:
+            return
+        pool.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            # the cancelled items are never started.
+            for job in self._jobs.values():
+                for item in job.items:
+                    if item.status == PENDING:
+                        self._active.discard(id(item))
+
+    def submit(self, job_id, pairs, data=None, callback=None):
+        """Add a job to the queue.
+
+        If an unfinished job with the same id exists, it is returned instead.
+        Failed items of an existing job are retried.
+
+        Args:
+            job_id (str): Unique id of the job.
+            pairs (list): (source, target) path tuples.
+            data (dict, optional): Json compatible data for the finalizer.
+            callback (callable, optional): Called with the job and the item
+                on every change of this job. Called from the worker threads.
+
+        Returns:
+            SyncJob: The job.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job.status != DONE:
+                if job.status == FAILED:
+                    self._reset_failed(job)
+            else:
+                items = [SyncItem(source, target) for source, target in pairs]
+                job = SyncJob(job_id, items, data=data)
+                self._jobs[job_id] = job
+            if callback and callback not in job.callbacks:
+                job.callbacks.append(callback)
+            self.save()
+            if self._pool:
+                self._schedule(job)
+        return job
+
+    def retry(self, job_id):
+        """Retry the failed items of the job.
+
+        Returns:
+            SyncJob: The job or None if it does not exist.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job.status != FAILED:
+                return job
+            self._reset_failed(job)
+            self.save()
+            if self._pool:
+                self._schedule(job)
+        return job
+
+    def wait(self, job_id=None, timeout=None):
+        """Wait until the job or all the jobs are finished.
+
+        Args:
+            job_id (str, optional): The job to wait. Waits for all the jobs
+                if not given.
+            timeout (float, optional): Seconds to wait.
+
+        Returns:
+            bool: True if finished, False if timed out.
+        """
+        def _finished():
+            if job_id is None:
+                jobs = self._jobs.values()
+            else:
+                jobs = [self._jobs.get(job_id)]
+            return all(
+                job is None or (job.is_finished and job.job_id not in self._finishing)
+                for job in jobs
+            )
+
+        with self._finished:
+            return self._finished.wait_for(_finished, timeout=timeout)
+
+    @staticmethod
+    def _reset_failed(job):
+        """Set the failed items of the job pending again."""
+        for item in job.items:
+            if item.status == FAILED:
+                item.status = PENDING
+                item.error = ""
+        job.status = PENDING
+        job.error = ""
+
+    def _schedule(self, job):
+        """Submit the pending items of the job to the pool."""
+        if job.is_finished:
+            return
+        pending = [
+            item for item in job.items
+            if item.status == PENDING and id(item) not in self._active
+        ]
+        for item in pending:
+            self._active.add(id(item))
+            self._pool.submit(self._transfer, job, item)
+        if not any(item.status in (PENDING, RUNNING) for item in job.items):
+            # e.g. all the items are moved but the finalizer is interrupted.
+            self._pool.submit(self._finish, job)
+        elif pending:
+            job.status = RUNNING
+
+    def _transfer(self, job, item):
+        """Move a single item. Runs in a worker thread."""
+        with self._lock:
+            item.status = RUNNING
+            # the progress of the engine starts from zero, also when resumed.
+            item.transferred = 0
+        self._notify(job, item)
+        try:
+            if not os.path.exists(item.source) and os.path.exists(item.target):
+                # moved before the queue is interrupted.
+                LOG.info(f"Already synced => {item.target}")
+            else:
+                # the pool of the queue is the only limit of the transfers.
+                engine = copier.CopyEngine(
+                    workers=1,
+                    verify=self.verify,
+                    resume=True,
+                    progress=lambda done, total, _path: self._progress(
+                        job, item, done, total
+                    ),
+                )
+                engine.move(item.source, item.target)
+            status, error = DONE, ""
+        except Exception as exc:  # pylint: disable=broad-except
+            LOG.error(f"Sync failed => {item.source}: {exc}")
+            status, error = FAILED, f"{item.source}: {exc}"
+        with self._lock:
+            item.status, item.error = status, error
+            if status == DONE:
+                item.transferred = item.size = max(item.size, item.transferred)
+        self._notify(job, item)
+        with self._lock:
+            # the item is active until its callbacks are called, so the job
+            # is finished after the callbacks of all of its items.
+            self._active.discard(id(item))
+            unfinished = any(
+                _item.status in (PENDING, RUNNING) or id(_item) in self._active
+                for _item in job.items
+            )
+            if unfinished:
+                self.save()
+        if not unfinished:
+            self._finish(job)
+
+    def _progress(self, job, item, done, total):
+        """Update the transferred bytes of the item and apply the bandwidth limit."""
+        with self._lock:
+            transferred = max(done - item.transferred, 0)
+            item.transferred += transferred
+            item.size = total
+        # wait outside of the lock, the other transfers keep reporting.
+        self.throttle.consume(transferred)
+        self._notify(job, item)
+
+    def _finish(self, job):
+        """Finalize the job after all of its items are finished."""
+        state, msg = True, ""
+        if any(item.status == FAILED for item in job.items):
+            state = False
+        elif self.finalizer:
+            try:
+                state, msg = self.finalizer(job)
+            except Exception as exc:  # pylint: disable=broad-except
+                state, msg = False, f"Sync cannot be finalized: {exc}"
+        with self._lock:
+            job.status = DONE if state else FAILED
+            job.error = msg if not state else ""
+            self._finishing.add(job.job_id)
+            self.save()
+        self._notify(job, None)
+        with self._finished:
+            self._finishing.discard(job.job_id)
+            self._finished.notify_all()
+
+    def _notify(self, job, item):
+        """Call the callbacks of the queue and the job."""
+        with self._lock:
+            callbacks = self._callbacks + job.callbacks
+        for callback in callbacks:
+            try:
+                callback(job, item)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOG.warning(f"Sync callback failed: {exc}")
+
+
+def get_queue(
+    folder, workers=DEFAULT_WORKERS, bandwidth=0, verify=False, finalizer=None
+):
+    """Return the started queue of the folder, creating it if necessary.
+
+    The bandwidth and verify options of an existing queue are updated. The
+    number of workers is only applied when the queue is created.
+
+    Args:
+        folder (str): The folder of the queue file.
+        workers (int): Maximum number of items moved at the same time.
+        bandwidth (int): Bandwidth limit in bytes per second.
+        verify (bool): Verify the copied files.
+        finalizer (callable, optional): Called with the finished jobs.
+
+    Returns:
+        SyncQueue: The started queue.
+    """
+    key = os.path.abspath(str(folder))
+    with _QUEUES_LOCK:
+        queue = _QUEUES.get(key)
+        if queue is None:
+            queue = SyncQueue(key, workers=workers, finalizer=finalizer)
+            _QUEUES[key] = queue
+        queue.throttle.bytes_per_second = bandwidth
+        queue.verify = verify
+        queue.start()
+    return queue
+
+
+def find_queue(folder):
+    """Return the queue of the folder if it is created in this session."""
+    with _QUEUES_LOCK:
+        return _QUEUES.get(os.path.abspath(str(folder)))
+
+
+def stop_all(wait=True):
+    """Stop all the queues. The pending items are resumed by the next session."""
+    with _QUEUES_LOCK:
+        queues = list(_QUEUES.values())
+        _QUEUES.clear()
+    for queue in queues:
+        queue.stop(wait=wait)
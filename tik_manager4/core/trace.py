@@ -0,0 +1,234 @@
+"""Lightweight tracing of the hot paths.
+
+Set the TIK_TRACE environment variable to 1 to record a span for every
+call of the traced functions. At exit the spans are written as a Chrome
+trace file (open it in chrome://tracing or https://ui.perfetto.dev) and
+an aggregated table is logged. The trace file is written to TIK_TRACE_FILE
+if given, otherwise to the temp folder.
+
+When tracing is disabled, the traced decorator returns the functions
+untouched and span returns a shared no-op context manager, so the
+instrumentation costs nothing.
+
+Example:
+    @trace.traced("io.read", category="io")
+    def read(...):
+        ...
+
+    with trace.span("scan.folder", category="scan"):
+        ...
+"""
+
+import atexit
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+from tik_manager4.core import filelog
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+# Oldest spans are dropped after this many to keep the memory bounded.
+# The aggregated counters include all the spans.
+MAX_EVENTS = 500000
+
+ENABLED = os.getenv("TIK_TRACE", "0").lower() in ("1", "true", "yes")
+
+_NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    """Collect the spans and the counters."""
+
+    def __init__(self, max_events=MAX_EVENTS):
+        """Initialize the Tracer.
+
+        Args:
+            max_events (int): Maximum number of spans to keep for the
+                Chrome trace.
+        """
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._events = deque(maxlen=max_events)
+        self._counters = {}
+
+    def clear(self):
+        """Remove all the spans and the counters."""
+        with self._lock:
+            self._events.clear()
+            self._counters.clear()
+
+    def record(self, name, category, start, duration):
+        """Record a finished span.
+
+        Args:
+            name (str): Name of the span.
+            category (str): Category of the span.
+            start (float): perf_counter value at the start of the span.
+            duration (float): Duration in seconds.
+        """
+        with self._lock:
+            self._events.append(
+                (name, category, start, duration, threading.get_ident())
+            )
+            counter = self._counters.get(name)
+            if counter is None:
+                self._counters[name] = [1, duration, duration]
+            else:
+                counter[0] += 1
+                counter[1] += duration
+                counter[2] = max(counter[2], duration)
+
+    def summary(self):
+        """Return the aggregated spans, slowest total first.
+
+        Returns:
+            list: Dictionaries with name, count, total, mean and max in
+                seconds.
+        """
+        with self._lock:
+            rows = [
+                {
+                    "name": name,
+                    "count": count,
+                    "total": total,
+                    "mean": total / count,
+                    "max": maximum,
+                }
+                for name, (count, total, maximum) in self._counters.items()
+            ]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def format_summary(self):
+        """Return the aggregated spans as a text table."""
+        lines = [
+            f"{'name':<48} {'count':>8} {'total ms':>11} {'mean ms':>10} {'max ms':>10}"
+        ]
+        for row in self.summary():
+            lines.append(
+                f"{row['name']:<48} {row['count']:>8} {row['total'] * 1000:>11.2f} "
+                f"{row['mean'] * 1000:>10.3f} {row['max'] * 1000:>10.3f}"
+            )
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Return the spans in the Chrome trace event format."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": pid,
+                    "tid": thread_id,
+                }
+                for name, category, start, duration, thread_id in events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(self, file_path):
+        """Write the spans as a Chrome trace file.
+
+        Args:
+            file_path (str): Path of the json file.
+        """
+        with open(file_path, "w", encoding="utf-8") as _file:
+            json.dump(self.chrome_trace(), _file)
+
+
+TRACER = Tracer()
+
+
+class _Span:
+    """Context manager recording a span to the tracer."""
+
+    __slots__ = ("name", "category", "_start")
+
+    def __init__(self, name, category):
+        self.name = name
+        self.category = category
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        TRACER.record(
+            self.name, self.category, self._start, time.perf_counter() - self._start
+        )
+        return False
+
+
+def span(name, category="tik"):
+    """Return a context manager recording a span if tracing is enabled.
+
+    Args:
+        name (str): Name of the span.
+        category (str): Category of the span. e.g. 'io', 'scan', 'ui'.
+    """
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name, category)
+
+
+def traced(name=None, category="tik"):
+    """Decorate a function to record a span for each call.
+
+    The function is returned as it is if tracing is disabled when the
+    module of the function is imported.
+
+    Args:
+        name (str, optional): Name of the span. Defaults to the qualified
+            name of the function.
+        category (str): Category of the span.
+    """
+
+    def _decorator(function):
+        if not ENABLED:
+            return function
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def _wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                TRACER.record(
+                    span_name, category, start, time.perf_counter() - start
+                )
+
+        return _wrapper
+
+    return _decorator
+
+
+def _dump_at_exit():
+    """Write the trace file and log the aggregated spans."""
+    if not TRACER.summary():
+        return
+    file_path = os.getenv("TIK_TRACE_FILE") or os.path.join(
+        tempfile.gettempdir(), f"tik_manager4_trace_{os.getpid()}.json"
+    )
+    try:
+        TRACER.write_chrome_trace(file_path)
+    except OSError as exc:
+        LOG.warning(f"Trace file could not be written => {file_path}: {exc}")
+        return
+    LOG.info(f"Trace file written => {file_path}\n{TRACER.format_summary()}")
+
+
+if ENABLED:
+    atexit.register(_dump_at_exit)
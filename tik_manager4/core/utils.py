@@ -1,4 +1,5 @@
 """Cross-platform utility functions."""
+import errno
 import os
 import sys
 import importlib.util
@@ -8,8 +9,16 @@ import shutil
 import platform
 import subprocess
 import re
+import time
 import unicodedata
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from tik_manager4.core import copier
+from tik_manager4.core.constants import BranchMaterialization
 from tik_manager4.external import fileseq
 
 CURRENT_PLATFORM = platform.system()
@@ -103,8 +112,18 @@ def sanitize_text(text, allow_spaces=False):
 
     return sanitized_text
 
-def copy(source, target, force=True, raise_error=False):
-    """"Copy the source file or folder to the target location."""
+def copy(source, target, force=True, raise_error=False, progress=None, verify=False):
+    """"Copy the source file or folder to the target location.
+
+    Args:
+        source (str): The source file or folder.
+        target (str): The target file or folder.
+        force (bool): Overwrite the target if it exists.
+        raise_error (bool): Raise the errors instead of returning them.
+        progress (callable, optional): Called with the copied bytes, the
+            total bytes and the path of the last copied file.
+        verify (bool): Compare the checksums of the copied files.
+    """
     source = Path(source)
     if not source.exists():
         if raise_error:
@@ -141,7 +160,7 @@ def copy(source, target, force=True, raise_error=False):
             # rename the target to a temporary file to avoid overwriting issues
             os.rename(str(target), temp_lock_file)
         try:
-            shutil.copy2(str(source), str(target))
+            copier.CopyEngine(progress=progress, verify=verify).copy(source, target)
         except OSError as exc:
             if raise_error:
                 raise OSError(f"Error copying file: {exc}")
@@ -153,21 +172,292 @@ def copy(source, target, force=True, raise_error=False):
             except OSError as exc:
                 LOG.warning(f"Error removing temporary lock file: {exc}", exc_info=True)
     elif source.is_dir():
-        # Use copytree with dirs_exist_ok=True for Python 3.8+
-        # For older versions, use shutil.copytree and handle existing directories
-        if hasattr(shutil, "copytree") and hasattr(shutil.copytree, "dirs_exist_ok"):
-            shutil.copytree(str(source), str(target), dirs_exist_ok=True)
-        else:
-            if target.exists():
-                shutil.rmtree(target)
-            shutil.copytree(str(source), str(target))
+        if target.exists():
+            shutil.rmtree(target)
+        try:
+            copier.CopyEngine(progress=progress, verify=verify).copy(source, target)
+        except OSError as exc:
+            if raise_error:
+                raise
+            return False, f"Error copying folder: {exc}"
     return True, f"{source} copied to {target}."
 
-def move(source, target, force=True, raise_error=False):
+
+# ioctl request to clone a file on Linux. Same as cp --reflink.
+_FICLONE = 0x40049409
+# Chunk size for the copy_file_range calls.
+_RANGE_CHUNK = 1 << 30
+# Clone without the copy_file_range fallback. Used by the Auto mode.
+_CLONE_ONLY = "clone"
+# Suffix of the hardlinked files renamed aside by _remove_file.
+_REMOVED_SUFFIX = ".tik_removed"
+# The mode which worked in the Auto mode for the (source device, target
+# device) pairs.
+_AUTO_MODES = {}
+
+
+def _clone(source, target, allow_range_copy=True):
+    """Clone the source file without passing the data through the process.
+
+    FICLONE creates a copy-on-write clone sharing the data blocks on btrfs,
+    xfs and similar file systems. Otherwise copy_file_range lets the kernel
+    or the NFS server copy the data.
+
+    Raises:
+        OSError: If the file cannot be cloned.
+    """
+    with open(source, "rb") as source_file, open(target, "wb") as target_file:
+        try:
+            if fcntl is None:
+                raise OSError(errno.EOPNOTSUPP, "FICLONE is not available")
+            fcntl.ioctl(target_file.fileno(), _FICLONE, source_file.fileno())
+        except OSError:
+            if not allow_range_copy or not hasattr(os, "copy_file_range"):
+                raise
+            remaining = os.fstat(source_file.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(
+                    source_file.fileno(),
+                    target_file.fileno(),
+                    min(remaining, _RANGE_CHUNK),
+                )
+                if copied == 0:
+                    raise OSError(errno.EIO, f"copy_file_range stopped early: {source}")
+                remaining -= copied
+    shutil.copystat(source, target)
+
+
+def _materialize_file(source, target, mode):
+    """Create the target file with the given mode.
+
+    Raises:
+        OSError: If the mode is not supported for the file.
+    """
+    if mode == BranchMaterialization.HARDLINK.value:
+        os.link(source, target)
+    elif mode == BranchMaterialization.SYMLINK.value:
+        # relative links keep working when the project is moved.
+        os.symlink(os.path.relpath(source, target.parent), target)
+    elif mode == BranchMaterialization.REFLINK.value:
+        _clone(source, target)
+    else:
+        shutil.copy2(str(source), str(target))
+
+
+def _auto_modes(source, target):
+    """Return the modes to try in the Auto mode, best first."""
+    try:
+        key = (os.stat(source).st_dev, os.stat(target.parent).st_dev)
+    except OSError:
+        return [BranchMaterialization.COPY.value]
+    if key in _AUTO_MODES:
+        return [_AUTO_MODES[key]]
+    modes = [_CLONE_ONLY]
+    if key[0] == key[1]:
+        modes.append(BranchMaterialization.HARDLINK.value)
+    modes.append(BranchMaterialization.COPY.value)
+    return modes
+
+
+def _remove_file(file_path):
+    """Remove the file, clearing its read-only bit if necessary.
+
+    The read-only bit is shared by all the hardlinks of a file, so it is only
+    cleared if the file has no other links. A hardlinked file is renamed
+    aside and removed. If the renamed file cannot be removed either, it is
+    left aside and only its path is freed.
+    """
+    try:
+        os.remove(file_path)
+        return
+    except PermissionError:
+        if os.lstat(file_path).st_nlink == 1:
+            write_unprotect(file_path)
+            os.remove(file_path)
+            return
+    aside_path = f"{file_path}.{os.getpid()}.{time.time_ns()}{_REMOVED_SUFFIX}"
+    os.rename(file_path, aside_path)
+    try:
+        os.remove(aside_path)
+    except PermissionError as exc:
+        LOG.warning(f"Hardlinked file is left aside => {aside_path}: {exc}")
+
+
+def _remove_leftovers(folder):
+    """Remove the files left aside by _remove_file in the folder.
+
+    A left aside file can be unprotected and removed once its other
+    hardlinks are gone. The others are kept for the next try.
+    """
+    try:
+        with os.scandir(folder) as entries:
+            leftovers = [
+                entry.path for entry in entries
+                if entry.name.endswith(_REMOVED_SUFFIX)
+            ]
+    except OSError:
+        return
+    for leftover in leftovers:
+        try:
+            os.remove(leftover)
+        except PermissionError:
+            try:
+                if os.lstat(leftover).st_nlink == 1:
+                    write_unprotect(leftover)
+                    os.remove(leftover)
+            except OSError:
+                continue
+        except OSError:
+            continue
+
+
+def _remove_tree(folder):
+    """Remove the folder and everything in it.
+
+    The files are removed with _remove_file, so the hardlinked files stay
+    write protected.
+    """
+    for root, dirs, files in os.walk(folder, topdown=False):
+        for file_name in files:
+            _remove_file(os.path.join(root, file_name))
+        for dir_name in dirs:
+            dir_path = os.path.join(root, dir_name)
+            if os.path.islink(dir_path):
+                os.remove(dir_path)
+            else:
+                os.rmdir(dir_path)
+    os.rmdir(folder)
+
+
+def _unprotect_folders(folder):
+    """Make the folders writable. The older versions protected them as well."""
+    os.chmod(folder, 0o777)
+    for root, dirs, _files in os.walk(folder):
+        for dir_name in dirs:
+            os.chmod(os.path.join(root, dir_name), 0o777)
+
+
+def _remove_target(target):
+    """Remove the file or the link at the target.
+
+    The target is never opened for writing. It can be a hardlink of a
+    published file which must not change.
+    """
+    if target.is_dir() and not target.is_symlink():
+        _remove_tree(target)
+        return
+    if not (target.exists() or target.is_symlink()):
+        return
+    _remove_file(target)
+
+
+def _materialize_one(source, target, mode):
+    """Materialize a single file, falling back to copy. Return the used mode."""
+    linked_modes = (
+        BranchMaterialization.HARDLINK.value,
+        BranchMaterialization.SYMLINK.value,
+    )
+    if (
+        mode in linked_modes
+        and target.exists()
+        and os.path.samefile(source, target)
+    ):
+        return mode
+    _remove_target(target)
+    if mode == BranchMaterialization.AUTO.value:
+        modes = _auto_modes(source, target)
+    else:
+        modes = [mode]
+    if modes[-1] != BranchMaterialization.COPY.value:
+        modes.append(BranchMaterialization.COPY.value)
+    for candidate in modes:
+        try:
+            if candidate == _CLONE_ONLY:
+                _clone(source, target, allow_range_copy=False)
+            else:
+                _materialize_file(source, target, candidate)
+        except OSError as exc:
+            if candidate == BranchMaterialization.COPY.value:
+                raise
+            LOG.debug(f"{candidate} is not supported for {target}: {exc}")
+            _remove_target(target)
+            continue
+        if mode == BranchMaterialization.AUTO.value:
+            key = (os.stat(source).st_dev, os.stat(target.parent).st_dev)
+            _AUTO_MODES[key] = candidate
+        if candidate == _CLONE_ONLY:
+            return BranchMaterialization.REFLINK.value
+        return candidate
+    return None
+
+
+def materialize(source, target, mode=BranchMaterialization.COPY.value):
+    """Create the target as a copy, clone or link of the source.
+
+    Folders, e.g. bundles, are materialized file by file. Files which
+    cannot use the mode, e.g. hardlinks across devices or symlinks without
+    the privilege on Windows, are copied. The Auto mode uses a clone if the
+    file system supports it, otherwise a hardlink on the same device,
+    otherwise a copy.
+
+    Args:
+        source (str): The source file or folder.
+        target (str): The target file or folder. Replaced if it exists.
+        mode (str): One of the BranchMaterialization values.
+
+    Returns:
+        tuple: (bool, str) The state and the message.
+    """
+    source = Path(source)
+    target = Path(target)
+    if not source.exists():
+        return False, f"Source file or folder does not exist: {source}"
+    used_modes = set()
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if source.is_dir():
+            _remove_target(target)
+            for root, _dirs, files in os.walk(source):
+                target_root = target / Path(root).relative_to(source)
+                target_root.mkdir(parents=True, exist_ok=True)
+                _remove_leftovers(target_root)
+                for file_name in files:
+                    used_modes.add(
+                        _materialize_one(
+                            Path(root, file_name), target_root / file_name, mode
+                        )
+                    )
+        else:
+            used_modes.add(_materialize_one(source, target, mode))
+        _remove_leftovers(target.parent)
+    except OSError as exc:
+        return False, f"Error materializing {source} to {target}: {exc}"
+    return True, f"{source} materialized to {target} ({', '.join(sorted(used_modes))})."
+
+
+def move(
+    source,
+    target,
+    force=True,
+    raise_error=False,
+    progress=None,
+    verify=False,
+    resume=False,
+):
     """Move the source file or folder to the target location.
 
     If force is True, any existing file or folder at the target location
-    will be removed before the move operation.
+    will be removed before the move operation, unless the move is resumed.
+    Moves across devices are copied with the copy engine and the source is
+    removed afterwards.
+
+    Args:
+        progress (callable, optional): Called with the copied bytes, the
+            total bytes and the path of the last copied file.
+        verify (bool): Compare the checksums of the copied files before
+            removing the source.
+        resume (bool): Continue an interrupted move to the same target.
+            The files already copied to the target are kept.
     """
     source = Path(source)
     if not source.exists():
@@ -177,7 +467,7 @@ def move(source, target, force=True, raise_error=False):
     target = Path(target)
 
     # If force is True and the target exists, remove it
-    if force and target.exists():
+    if force and not resume and target.exists():
         ret, msg = delete(target)
         if not ret:
             return False, f"Error deleting target: {msg}"
@@ -186,62 +476,60 @@ def move(source, target, force=True, raise_error=False):
     target.parent.mkdir(parents=True, exist_ok=True)
 
     # Perform the move operation
-    shutil.move(str(source), str(target))
+    engine = copier.CopyEngine(progress=progress, verify=verify, resume=resume)
+    try:
+        engine.move(source, target)
+    except OSError as exc:
+        if raise_error:
+            raise
+        return False, f"Error moving {source} to {target}: {exc}"
     return True, f"{source} moved to {target}."
 
 def delete(file_or_folder):
-    """Delete the file or folder."""
+    """Delete the file or folder.
+
+    Write protected files are removed without unprotecting their other
+    hardlinks, e.g. the deduplicated publishes.
+    """
+    path = Path(file_or_folder)
     try:
-        if Path(file_or_folder).is_file() or Path(file_or_folder).is_symlink():
-            Path(file_or_folder).unlink()
-        elif Path(file_or_folder).is_dir():
-            shutil.rmtree(file_or_folder)
+        if path.is_file() or path.is_symlink():
+            _remove_file(path)
+        elif path.is_dir():
+            try:
+                _remove_tree(path)
+            except PermissionError:
+                _unprotect_folders(path)
+                _remove_tree(path)
     except PermissionError as e:
-        ret, msg = write_unprotect(file_or_folder)
-        if not ret:
-            return False, f"Error removing write protection: {file_or_folder}"
-        try:
-            if Path(file_or_folder).is_file() or Path(file_or_folder).is_symlink():
-                Path(file_or_folder).unlink()
-            elif Path(file_or_folder).is_dir():
-                shutil.rmtree(file_or_folder)
-        except PermissionError as e:
-            return False, f"Permission denied: {e}"
+        return False, f"Permission denied: {e}"
+    _remove_leftovers(path.parent)
     return True, f"{file_or_folder} deleted."
 
 def write_protect(file_or_folder):
-    """Write protect the file or folder."""
+    """Write protect the file or all the files in the folder."""
     path = Path(file_or_folder)
-    file_list = []
-    if path.is_file():
-        file_list.append(path)
-    elif path.is_dir():
-        for _file in path.rglob("*"):
-            file_list.append(_file)
-    for _file in file_list:
-        try:
-            _file.chmod(0o444)
-            return True, "Write protection applied."
-        except Exception as e:  # pylint: disable=broad-except
-            LOG.error(f"Error applying write protection: {e}")
-            return False, f"Error applying write protection: {e}"
+    if not path.exists():
+        return None
+    try:
+        # folders stay accessible, only the files are protected.
+        copier.chmod_tree(path, 0o444)
+        return True, "Write protection applied."
+    except Exception as e:  # pylint: disable=broad-except
+        LOG.error(f"Error applying write protection: {e}")
+        return False, f"Error applying write protection: {e}"
 
 def write_unprotect(file_or_folder):
-    """Write unprotect the file or folder."""
+    """Write unprotect the file or the folder and everything in it."""
     path = Path(file_or_folder)
-    file_list = []
-    if path.is_file():
-        file_list.append(path)
-    elif path.is_dir():
-        for _file in path.rglob("*"):
-            file_list.append(_file)
-    for _file in file_list:
-        try:
-            _file.chmod(0o777)
-            return True, "Write protection removed."
-        except Exception as e:  # pylint: disable=broad-except
-            LOG.error(f"Error removing write protection: {e}")
-            return False, f"Error removing write protection: {e}"
+    if not path.exists():
+        return None
+    try:
+        copier.chmod_tree(path, 0o777, dir_mode=0o777)
+        return True, "Write protection removed."
+    except Exception as e:  # pylint: disable=broad-except
+        LOG.error(f"Error removing write protection: {e}")
+        return False, f"Error removing write protection: {e}"
 
 def get_nice_name(input_str):
     """Convert camel case or snake case to nice name."""
@@ -0,0 +1,236 @@
+"""Background watcher for the database folders.
+
+The watcher polls the database folders in a background thread and reports
+the created, modified and deleted task, work and publish files and the
+version journals of the works. Polling
+is used instead of the native file system notifications, since the
+notifications are not delivered for the changes made by the other
+machines on network shares.
+
+Only the folders listed by the scanner since the watcher is started are
+polled, which are the folders of the loaded views. The rest of the database
+is never walked. A poll costs a stat per polled folder and a stat per file
+in those folders, so the files rewritten in place by the older clients are
+found as well. Only the folders with a changed signature are listed again.
+
+While a watcher is running, the scanner trusts the remembered listings of
+the watched folders and only lists again the folders reported by the
+watcher.
+"""
+
+import os
+import threading
+from typing import NamedTuple
+
+from tik_manager4.core import filelog
+from tik_manager4.core import scanner
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+WATCHED_SUFFIXES = (".ttask", ".twork", ".tpub", ".twork.journal")
+WATCHED_NAMES = ("live.json", "promoted.json")
+
+
+class WatchEvent(NamedTuple):
+    """A change in the database."""
+    path: str
+    kind: str  # created, modified or deleted
+
+    @property
+    def folder(self):
+        """Folder of the changed file."""
+        return os.path.dirname(self.path)
+
+
+def _is_watched(name):
+    return name.endswith(WATCHED_SUFFIXES) or name in WATCHED_NAMES
+
+
+class DatabaseWatcher:
+    """Poll the database folders and report the changed files."""
+
+    def __init__(self, root, interval=2.0):
+        """Initialize the DatabaseWatcher.
+
+        Args:
+            root (str): The database folder to watch.
+            interval (float, optional): Seconds between the polls.
+        """
+        self.root = os.path.abspath(root)
+        self.interval = interval
+        self._folders = {}  # folder: (signature, {name: mtime})
+        self._callbacks = []
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self):
+        """Return True if the watcher thread is alive."""
+        return bool(self._thread and self._thread.is_alive())
+
+    def add_callback(self, callback):
+        """Add a callback to call with the list of events after each poll.
+
+        Callbacks are called from the watcher thread.
+        """
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        """Remove a previously added callback."""
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def is_dirty(self, folder):
+        """Check if the folder has changes not yet collected with pop_dirty."""
+        with self._lock:
+            return os.path.abspath(folder) in self._dirty
+
+    def pop_dirty(self):
+        """Return and clear the changed folders since the last call."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    @staticmethod
+    def _signature(folder):
+        stat_result = os.stat(folder)
+        return stat_result.st_mtime_ns, stat_result.st_nlink
+
+    @staticmethod
+    def _list(folder):
+        files = {}
+        with os.scandir(folder) as iterator:
+            for entry in iterator:
+                try:
+                    if _is_watched(entry.name) and entry.is_file():
+                        files[entry.name] = entry.stat().st_mtime
+                except OSError:
+                    continue
+        return files
+
+    @staticmethod
+    def _restat(folder, files):
+        """Return the modified times of the files or None if one is removed."""
+        current = {}
+        for name in files:
+            try:
+                current[name] = os.stat(os.path.join(folder, name)).st_mtime
+            except OSError:
+                return None
+        return current
+
+    @staticmethod
+    def _diff(folder, old_files, files, events, suffix=None):
+        """Add the events of the changed files to the events list.
+
+        Args:
+            suffix (str, optional): Only compare the files with the suffix.
+        """
+        for name, mtime in files.items():
+            if suffix and not name.endswith(suffix):
+                continue
+            old_mtime = old_files.get(name)
+            if old_mtime is None:
+                events.append(WatchEvent(os.path.join(folder, name), "created"))
+            elif old_mtime != mtime:
+                events.append(WatchEvent(os.path.join(folder, name), "modified"))
+        for name in old_files.keys() - files.keys():
+            events.append(WatchEvent(os.path.join(folder, name), "deleted"))
+
+    def _track(self, folder, suffix, entries, events):
+        """Start polling a folder listed by the scanner.
+
+        The changes since the scanner listed the folder are reported.
+        """
+        try:
+            signature = self._signature(folder)
+            files = self._list(folder)
+        except OSError:
+            return False
+        known = {entry.path.name: entry.mtime for entry in entries}
+        count = len(events)
+        self._diff(folder, known, files, events, suffix=suffix)
+        self._folders[folder] = (signature, files)
+        return len(events) > count
+
+    def poll(self):
+        """Check the folders loaded by the scanner once.
+
+        Returns:
+            list: List of WatchEvent objects.
+        """
+        events = []
+        relisted = set()
+        for folder, suffix, entries in scanner.SCAN_CACHE.pop_listed(self.root):
+            folder = os.path.abspath(folder)
+            if folder not in self._folders and self._track(
+                folder, suffix, entries, events
+            ):
+                relisted.add(folder)
+
+        for folder, (signature, files) in list(self._folders.items()):
+            try:
+                new_signature = self._signature(folder)
+            except OSError:
+                relisted.add(folder)
+                self._diff(folder, self._folders.pop(folder)[1], {}, events)
+                continue
+            if new_signature == signature:
+                current = self._restat(folder, files)
+                if current is not None:
+                    if current != files:
+                        self._diff(folder, files, current, events)
+                        self._folders[folder] = (signature, current)
+                        relisted.add(folder)
+                    continue
+            try:
+                new_files = self._list(folder)
+            except OSError:
+                continue
+            self._diff(folder, files, new_files, events)
+            self._folders[folder] = (new_signature, new_files)
+            relisted.add(folder)
+
+        for folder in relisted:
+            scanner.invalidate(folder)
+        if events:
+            with self._lock:
+                self._dirty.update(event.folder for event in events)
+            for callback in list(self._callbacks):
+                try:
+                    callback(events)
+                except Exception as exc:  # pylint: disable=broad-except
+                    LOG.error(f"Watcher callback failed: {exc}")
+        return events
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as exc:  # pylint: disable=broad-except
+                LOG.error(f"Watcher poll failed: {exc}")
+
+    def start(self):
+        """Start watching in a background thread."""
+        if self.is_running:
+            return
+        # listings remembered before the watcher cannot be trusted.
+        scanner.SCAN_CACHE.clear()
+        scanner.SCAN_CACHE.watch(self.root)
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="tik_database_watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread."""
+        scanner.SCAN_CACHE.unwatch(self.root)
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        self._folders = {}
@@ -1,19 +1,18 @@
 import hou
 
 import tik_manager4
+from tik_manager4.objects.resolver import Resolver
 from tik_manager4.ui.dialog.project_dialog import SetProjectDialog
 from tik_manager4.ui.dialog.subproject_dialog import SelectSubprojectDialog
 
 
 class Callbacks:
-    version_exceptions = {
-        "LIVE": -1,
-        "PRO": 0
-    }
+    version_exceptions = Resolver.version_exceptions
 
     def __init__(self):
         self.valid_elements = ["alembic", "usd", "usd_lop"]
         self.tik_m = tik_manager4.initialize("houdini")
+        self.resolver = Resolver(self.tik_m)
 
     def _collect_parameter_values(self, node):
         """Collect the field valuels into a dictionary.
@@ -108,9 +107,7 @@ class Callbacks:
         parameters = self._collect_parameter_values(node)
         # override the category with new value
         parameters["task"] = kwargs["script_value"]
-        subproject_obj = self.get_subproject(parameters)
-        subproject_obj.scan_tasks()
-        self.populate_categories(node, subproject_obj.tasks[parameters["task"]])
+        self.populate_categories(node, self.get_task(parameters))
         return
 
     def set_category(self, kwargs):
@@ -123,8 +120,7 @@ class Callbacks:
         parameters = self._collect_parameter_values(node)
         # override the category with new value
         parameters["category"] = kwargs["script_value"]
-        task_obj = self.get_task(parameters)
-        self.populate_publishes(node, task_obj.categories[parameters["category"]])
+        self.populate_publishes(node, self.get_category(parameters))
         return
 
     def set_published_work(self, kwargs):
@@ -137,12 +133,9 @@ class Callbacks:
         parameters = self._collect_parameter_values(node)
         # override the published work with new value
         parameters["published_work"] = kwargs["script_value"]
-        category_obj = self.get_category(parameters)
-        # find the work
-        for work in category_obj.works.values():
-            if work.name == parameters["published_work"]:
-                self.populate_versions(node, work.publish)
-                return
+        published_work = self.get_published_work(parameters)
+        if published_work:
+            self.populate_versions(node, published_work)
 
     def set_version(self, kwargs):
         """Set the version.
@@ -154,17 +147,7 @@ class Callbacks:
         parameters = self._collect_parameter_values(node)
         # override the published work with new value
         parameters["version"] = kwargs["script_value"]
-        published_work = self.get_published_work(parameters)
-        if parameters["version"] in self.version_exceptions.keys():
-            # set the version to the exception value
-            version_number = self.version_exceptions[parameters["version"]]
-        else:
-            version_number = int(parameters["version"])
-        # we need to explicitly scan the versions.
-        published_work.scan_publish_versions()
-        self.populate_elements(
-            node, published_work.get_version(version_number)
-        )
+        self.populate_elements(node, self.get_version(parameters))
         return
 
     def set_element(self, kwargs):
@@ -181,13 +164,14 @@ class Callbacks:
         self.update_path(version, parameters["element"])
 
     def get_project(self, parameters):
-        """Resolve the task object.
+        """Resolve the project object.
+
+        The project is set only if it is different or modified.
 
         Args:
             parameters (dict): The parameters dictionary.
         """
-        self.tik_m.set_project(parameters["project"])
-        return self.tik_m.project
+        return self.resolver.get_project(parameters["project"])
 
     def get_subproject(self, parameters):
         """Get the subproject object.
@@ -195,8 +179,9 @@ class Callbacks:
         Args:
             parameters (dict): The parameters dictionary.
         """
-        project = self.get_project(parameters)
-        return project.find_sub_by_path(parameters["subproject"])
+        return self.resolver.get_subproject(
+            parameters["project"], parameters["subproject"]
+        )
 
     def get_task(self, parameters):
         """Get the task object.
@@ -204,9 +189,9 @@ class Callbacks:
         Args:
             parameters (dict): The parameters dictionary.
         """
-        subproject = self.get_subproject(parameters)
-        subproject.scan_tasks()
-        return subproject.tasks[parameters["task"]]
+        return self.resolver.get_task(
+            parameters["project"], parameters["subproject"], parameters["task"]
+        )
 
     def get_category(self, parameters):
         """Get the category object.
@@ -214,8 +199,12 @@ class Callbacks:
         Args:
             parameters (dict): The parameters dictionary.
         """
-        task = self.get_task(parameters)
-        return task.categories[parameters["category"]]
+        return self.resolver.get_category(
+            parameters["project"],
+            parameters["subproject"],
+            parameters["task"],
+            parameters["category"],
+        )
 
     def get_published_work(self, parameters):
         """Get the published work object.
@@ -223,10 +212,13 @@ class Callbacks:
         Args:
             parameters (dict): The parameters dictionary.
         """
-        category = self.get_category(parameters)
-        for work in category.works.values():
-            if work.name == parameters["published_work"]:
-                return work.publish
+        return self.resolver.get_publish(
+            parameters["project"],
+            parameters["subproject"],
+            parameters["task"],
+            parameters["category"],
+            parameters["published_work"],
+        )
 
     def get_version(self, parameters):
         """Get the version object.
@@ -234,15 +226,14 @@ class Callbacks:
         Args:
             parameters (dict): The parameters dictionary.
         """
-        published_work = self.get_published_work(parameters)
-        # we need to explicitly scan the versions.
-        published_work.scan_publish_versions()
-        if parameters["version"] in self.version_exceptions.keys():
-            # set the version to the exception value
-            version_number = self.version_exceptions[parameters["version"]]
-        else:
-            version_number = int(parameters["version"])
-        return published_work.get_version(version_number)
+        return self.resolver.get_version(
+            parameters["project"],
+            parameters["subproject"],
+            parameters["task"],
+            parameters["category"],
+            parameters["published_work"],
+            parameters["version"],
+        )
 
     def populate_project(self, node, active_project):
         """ Populate the project.
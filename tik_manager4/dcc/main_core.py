@@ -20,6 +20,8 @@ class MainCore():
     ingests = {}
     extensions = {}
     custom_launcher = False
+    # set False for the dccs whose embedded python does not play well with threads.
+    threading_enabled = True
     guard = guard.Guard()
 
     @classmethod
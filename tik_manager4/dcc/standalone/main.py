@@ -4,6 +4,7 @@ import subprocess
 import shutil
 
 import logging
+from tik_manager4.core import copier
 from tik_manager4.dcc.main_core import MainCore
 from tik_manager4.ui.Qt import QtWidgets, QtGui, QtCore
 from tik_manager4.dcc.standalone import extract
@@ -42,11 +43,11 @@ class Dcc(MainCore):
             return None
 
         if Path(source_path).is_file():
-            # if it is a file, copy it to the destination
+            # the saved file is a new file, the modified time is not copied.
             shutil.copyfile(source_path, file_path)
         else:
-            # if it is a folder, copy it to the destination
-            shutil.copytree(source_path, file_path)
+            # folders with many files are copied in parallel.
+            copier.CopyEngine().copy(source_path, file_path)
 
         return file_path
 
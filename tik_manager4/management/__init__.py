@@ -1,17 +1,42 @@
+import importlib
+
 from .management_core import ManagementCore
 
+
+class _LazyRegistry(dict):
+    """Dictionary importing the registered classes on the first access.
+
+    The platform modules import their SDKs, which is slow. The values are
+    registered as 'module.ClassName' strings and replaced with the classes
+    when they are accessed.
+    """
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if isinstance(value, str):
+            module_name, class_name = value.rsplit(".", 1)
+            value = getattr(importlib.import_module(module_name), class_name)
+            super().__setitem__(key, value)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+
 # Dictionary to store platform classes
-platforms = {}
-ui_extensions = {}
-
-from tik_manager4.management.shotgrid.main import ProductionPlatform as sg_platform
-from tik_manager4.management.shotgrid.ui_extension import UiExtensions as sg_ui_extension
-platforms["shotgrid"] = sg_platform
-ui_extensions["shotgrid"] = sg_ui_extension
-
-from tik_manager4.management.kitsu.main import ProductionPlatform as kitsu_platform
-from tik_manager4.management.kitsu.ui_extension import UiExtensions as kitsu_ui_extension
-platforms["kitsu"] = kitsu_platform
-ui_extensions["kitsu"] = kitsu_ui_extension
+platforms = _LazyRegistry()
+ui_extensions = _LazyRegistry()
+
+platforms["shotgrid"] = "tik_manager4.management.shotgrid.main.ProductionPlatform"
+ui_extensions["shotgrid"] = "tik_manager4.management.shotgrid.ui_extension.UiExtensions"
+
+platforms["kitsu"] = "tik_manager4.management.kitsu.main.ProductionPlatform"
+ui_extensions["kitsu"] = "tik_manager4.management.kitsu.ui_extension.UiExtensions"
 
 __all__ = ["platforms"]
@@ -2,14 +2,78 @@
 
 from pathlib import Path
 
-from tik_manager4.core import utils
+from tik_manager4.core import sync_queue
 from tik_manager4.core.constants import ObjectType
 from tik_manager4.objects.entity import Entity
+from tik_manager4.objects.guard import Guard
 
 from tik_manager4.core import filelog
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
+# Folder of the sync queue under the local project folder.
+SYNC_FOLDER = ".tik_sync"
+
+def get_sync_queue(create=True):
+    """Return the sync queue of the current project in the local cache folder.
+
+    Args:
+        create (bool): If False, the queue is only returned if it is
+            already running or it has unfinished jobs from an earlier
+            session.
+
+    Returns:
+        SyncQueue: The started queue or None.
+    """
+    guard = Guard()
+    localize_settings = guard.localize_settings
+    if not localize_settings or not guard.project_root:
+        return None
+    local_folder = localize_settings.get("local_cache_folder")
+    if not local_folder:
+        return None
+    folder = Path(local_folder, Path(guard.project_root).name, SYNC_FOLDER)
+    if not create and not (
+        sync_queue.find_queue(folder) or (folder / sync_queue.QUEUE_FILE).is_file()
+    ):
+        return None
+    return sync_queue.get_queue(
+        folder,
+        workers=localize_settings.get("sync_workers", sync_queue.DEFAULT_WORKERS),
+        bandwidth=int(localize_settings.get("sync_bandwidth", 0) * 1024 * 1024),
+        verify=localize_settings.get("verify_sync", False),
+        finalizer=_finalize_sync,
+    )
+
+
+def _load_synced_entity(data):
+    """Load the synced version of a job from an earlier session."""
+    # pylint: disable=import-outside-toplevel
+    from tik_manager4.objects.version import PublishVersion
+    from tik_manager4.objects.work import Work
+
+    if data.get("object_type") == ObjectType.PUBLISH_VERSION.value:
+        return PublishVersion(data["settings_file"])
+    work = Work(data["settings_file"])
+    return work.get_version(data["version_number"])
+
+
+def _finalize_sync(job):
+    """Mark the version of the finished job as synced. Runs in a sync thread.
+
+    The version is loaded again, so the objects used by the other threads
+    are not changed. They are marked with mark_synced by their owners.
+    """
+    try:
+        entity = _load_synced_entity(job.data)
+    except Exception as exc:  # pylint: disable=broad-except
+        return False, f"Synced version cannot be loaded: {exc}"
+    if not entity:
+        return False, f"Synced version not found: {job.data}"
+    entity.finish_sync()
+    return True, ""
+
+
 class LocalizeMixin(Entity):
     """Localize mixin for Works and Publishes."""
     def __init__(self):
@@ -118,46 +182,109 @@ class LocalizeMixin(Entity):
         else:
             super().show_database_folder()
 
-    def sync(self):
+    @property
+    def sync_job_id(self):
+        """Id of the sync job of the version."""
+        if self.object_type == ObjectType.WORK_VERSION:
+            return f"{self.parent_work.settings_file}:{self.version}"
+        return str(self.settings_file)
+
+    def get_sync_job(self):
+        """Return the sync job of the version in this session or None."""
+        queue = get_sync_queue(create=False)
+        return queue.get_job(self.sync_job_id) if queue else None
+
+    def sync(self, progress=None, wait=True, callback=None):
         """Sync the entity to the origin.
 
-        This will copy the entity to the origin path. Sync is single direction.
+        This will move the entity to the origin path. Sync is single direction.
+        The elements are moved by the background sync queue. An interrupted
+        sync continues from the already copied files, also after a crash.
+
+        Args:
+            progress (callable, optional): Called with the copied bytes, the
+                total bytes and the path of the last copied file.
+            wait (bool): Wait until the sync is finished. If False, returns
+                after the sync is queued.
+            callback (callable, optional): Called with the sync job and the
+                changed item from the sync threads. If not waiting, the
+                owner of the object calls mark_synced after the job is done.
+
+        Returns:
+            tuple: (bool, msg) The state and the message or the list of
+                errors.
         """
         if not self.localized:
-            LOG.error("Entity is not localized.")
-            return False
+            msg = "Entity is not localized."
+            LOG.error(msg)
+            return False, msg
+        if self.object_type not in (ObjectType.WORK_VERSION, ObjectType.PUBLISH_VERSION):
+            msg = f"Syncing is not supported for {self.object_type.value}."
+            LOG.error(msg)
+            return False, msg
+        queue = get_sync_queue()
+        if not queue:
+            msg = "Local cache folder not set."
+            LOG.error(msg)
+            return False, msg
+
         LOG.info("Syncing...")
+        job = queue.get_job(self.sync_job_id)
+        pairs = []
+        data = {"object_type": self.object_type.value}
         if self.object_type == ObjectType.WORK_VERSION:
-            ret, msg = utils.move(self.localized_path,  self.get_abs_project_path(), force=False)
-            if not ret:
-                return False, msg
-            self._localized = False
-            self._localized_path = ""
-        elif self.object_type == ObjectType.PUBLISH_VERSION:
+            pairs.append((self.localized_path, self.get_abs_project_path()))
+            data["settings_file"] = str(self.parent_work.settings_file)
+            data["version_number"] = self.version
+        else:
             # before moving, validate all paths
             publish_base = Path(self.localized_path)
             sources = [publish_base / el["path"] for el in
                        self._elements]
             targets = [Path(self.get_abs_project_path(el["path"])) for el in
                        self._elements]
-            list_of_errors = list(self.validate_paths(sources, targets))
-            if list_of_errors:
-                return False, list_of_errors
-
-            for source, target in zip(sources, targets):
-                ret, msg = utils.move(source.as_posix(), target.as_posix(), force=False)
-                if not ret:
-                    return False, msg
-            self._localized = False
+            # the targets of an interrupted sync are partially moved already.
+            if not job:
+                list_of_errors = list(self.validate_paths(sources, targets))
+                if list_of_errors:
+                    return False, list_of_errors
+            pairs.extend(
+                (source.as_posix(), target.as_posix())
+                for source, target in zip(sources, targets)
+            )
+            data["settings_file"] = str(self.settings_file)
+
+        def _on_change(_job, item):
+            if progress and item:
+                done, total = _job.progress()
+                progress(done, total, item.target)
+            if callback:
+                callback(_job, item)
+
+        job = queue.submit(self.sync_job_id, pairs, data=data, callback=_on_change)
+        if not wait:
+            return True, "Sync queued."
+        queue.wait(job.job_id)
+        if job.status != sync_queue.DONE:
+            return False, job.errors
+        self.mark_synced()
+        return True, "Sync successful."
+
+    def mark_synced(self):
+        """Mark the version as synced to the origin without saving it."""
+        self._localized = False
+        self._localized_path = ""
+        if self.object_type != ObjectType.WORK_VERSION:
             self.edit_property("localized", False)
-            self._localized_path = ""
             self.edit_property("localized_path", "")
-            self.apply_settings(force=True)
+
+    def finish_sync(self):
+        """Mark the version as synced to the origin and save it."""
+        self.mark_synced()
+        if self.object_type == ObjectType.WORK_VERSION:
+            self.parent_work.apply_settings(force=True)
         else:
-            msg = f"Syncing is not supported for {self.object_type.value}."
-            LOG.error(msg)
-            return False, msg
-        return True, "Sync successful."
+            self.apply_settings(force=True)
 
     # A helper function to validate paths before attempting the actual move
     def validate_paths(self, sources, targets):
@@ -11,7 +11,7 @@ from fnmatch import fnmatch
 from tik_manager4.core.constants import ObjectType
 from tik_manager4.objects.entity import Entity
 from tik_manager4.objects.work import Work
-from tik_manager4.core import filelog
+from tik_manager4.core import filelog, scanner, trace
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
@@ -61,31 +61,70 @@ class Category(Entity):
                 matched_items.append(work)
         return matched_items
 
+    @trace.traced("Category.scan_works", category="scan")
     def scan_works(self):
         """Scan the category folder and return the works.
 
         Returns:
             dict: Dictionary of works under the category.
         """
-        # get all files recursively, regardless of the dcc
-        search_dir = self.get_abs_database_path()
-        _work_paths = list(Path(search_dir).rglob("**/*.twork"))
+        _work_mtimes = self._scan_work_mtimes()
 
         # add the file if it is new. if it is not new,
         # check the modified time and update if necessary
-        for w_path, _w_data in dict(self._works).items():
-            if w_path not in _work_paths:
+        for w_path in list(self._works):
+            if w_path not in _work_mtimes:
                 self._works.pop(w_path)
-        for _work_path in _work_paths:
+        for _work_path, _mtime in _work_mtimes.items():
             existing_work = self._works.get(_work_path, None)
             if not existing_work:
                 work = Work(absolute_path=_work_path, parent_task=self.parent_task)
                 self._works[_work_path] = work
             else:
-                if existing_work.is_modified():
+                if existing_work.is_modified(_mtime):
                     existing_work.reload()
         return self._works
 
+    def _scan_work_mtimes(self):
+        """Return the modified times of the work files keyed by their paths."""
+        # get all files recursively, regardless of the dcc
+        _index = self.metadata_index
+        if _index:
+            _work_entries = _index.query_entries(
+                "work", folder=self.path, recursive=True
+            )
+        else:
+            _work_entries = scanner.scan_directory(
+                self.get_abs_database_path(), ".twork", recursive=True
+            )
+        return {entry.path: entry.mtime for entry in _work_entries}
+
+    def collect_works(self):
+        """Scan the works into a new dictionary without changing the category.
+
+        Safe to call from a worker thread. The unchanged works are re-used,
+        the new and the modified ones are loaded as new objects. Install
+        the result in the ui thread with set_works.
+
+        Returns:
+            dict: All works under the category, including the deleted ones.
+        """
+        works = {}
+        for _work_path, _mtime in self._scan_work_mtimes().items():
+            work = self._works.get(_work_path, None)
+            if not work or work.is_modified(_mtime):
+                work = Work(absolute_path=_work_path, parent_task=self.parent_task)
+            works[_work_path] = work
+        return works
+
+    def set_works(self, works):
+        """Replace the works with the ones collected with collect_works.
+
+        Args:
+            works (dict): The works keyed by their file paths.
+        """
+        self._works = works
+
     def is_empty(self):
         """Check if the category is empty.
 
@@ -107,6 +146,8 @@ class Category(Entity):
         work.add_property("task_id", self.parent_task.id)
         work.add_property("path", relative_path)
         work.add_property("state", "active")
+        work.add_property("published", False)
+        work.add_property("latest_publish_version", 0)
         work.init_properties()
 
     def create_work_from_path(self, name, file_path, override_dcc="standalone", notes="", ignore_checks=True, direct_publish=False):
@@ -10,6 +10,7 @@ from tik_manager4.core.constants import ObjectType
 from tik_manager4.external import pyperclip
 from tik_manager4.objects.guard import Guard
 from tik_manager4.core import filelog
+from tik_manager4.core import index
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
@@ -73,6 +74,11 @@ class Entity:
         """Return the authentication status of the user."""
         return self.guard.is_authenticated
 
+    @property
+    def metadata_index(self):
+        """Return the active metadata index of the project or None."""
+        return index.get_index(self.guard.database_root)
+
     @staticmethod
     def generate_id():
         """Generate a unique id for the entity."""
@@ -105,6 +111,29 @@ class Entity:
         """
         return Path(self.guard.database_root, self.path, *args).as_posix()
 
+    def is_affected(self, events, recursive=True):
+        """Check if any of the database watcher events is under the entity.
+
+        Args:
+            events (list): List of watcher.WatchEvent objects.
+            recursive (bool, optional): If False, only the files directly
+                in the database folder of the entity are considered.
+
+        Returns:
+            bool: True if a changed file lives under the database folder
+                of the entity.
+        """
+        folder = os.path.normcase(os.path.abspath(self.get_abs_database_path()))
+        if not recursive:
+            return any(
+                os.path.normcase(os.path.abspath(event.folder)) == folder
+                for event in events
+            )
+        return any(
+            os.path.normcase(event.path).startswith(folder + os.sep)
+            for event in events
+        )
+
     def get_abs_project_path(self, *args):
         """Return the absolute project path for the entity.
 
@@ -0,0 +1,92 @@
+"""Concurrent loading of the publishes.
+
+Scanning the publish folders is mostly waiting for the file server. The
+functions in this module run the scans in a thread pool and return the
+same dictionaries as the serial scans.
+
+The number of workers is defined by the 'loader_workers' project setting.
+Zero or one disables the thread pool. Dcc handlers can disable it as well
+with the 'threading_enabled' class attribute.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from tik_manager4.objects.guard import Guard
+
+DEFAULT_WORKERS = 8
+
+
+def get_worker_count():
+    """Return the number of worker threads to use for loading.
+
+    Returns:
+        int: Number of workers. See is_serial.
+    """
+    guard = Guard()
+    dcc_handler = guard.dcc_handler
+    if dcc_handler and not getattr(dcc_handler, "threading_enabled", True):
+        return 0
+    if guard.project_settings is None:
+        return DEFAULT_WORKERS
+    workers = guard.project_settings.get("loader_workers", DEFAULT_WORKERS)
+    try:
+        return max(int(workers), 0)
+    except (TypeError, ValueError):
+        return DEFAULT_WORKERS
+
+
+def is_serial(workers):
+    """Return True if the number of workers means loading serially.
+
+    Args:
+        workers (int): Number of workers.
+
+    Returns:
+        bool: True for zero or one worker.
+    """
+    return workers <= 1
+
+
+def run(function, items, workers=None):
+    """Call the function for each item and return the results in order.
+
+    Args:
+        function (function): Function to call with each item.
+        items (list): Items to process.
+        workers (int, optional): Number of workers. If not given, resolved
+            with get_worker_count.
+
+    Returns:
+        list: The results in the order of the items.
+    """
+    items = list(items)
+    workers = get_worker_count() if workers is None else workers
+    workers = min(workers, len(items))
+    if is_serial(workers):
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="tik_loader"
+    ) as executor:
+        return list(executor.map(function, items))
+
+
+def scan_publishes(publishes, workers=None, token=None):
+    """Scan the publish versions of the publish objects.
+
+    Args:
+        publishes (list): Publish objects.
+        workers (int, optional): Number of workers.
+        token (CancelToken, optional): The publishes not yet scanned are
+            skipped once the token is cancelled.
+
+    Returns:
+        list: The publish versions dictionaries in the order of the
+            publishes. Empty dictionaries for the skipped ones.
+    """
+
+    def _scan(publish_obj):
+        if token is not None and token.cancelled:
+            return {}
+        return publish_obj.scan_publish_versions()
+
+    return run(_scan, publishes, workers=workers)
@@ -8,6 +8,7 @@ import uuid
 from tik_manager4.core import filelog, settings, utils
 from tik_manager4.core.constants import ValidationState, ValidationResult
 from tik_manager4.objects import user, project, purgatory
+from tik_manager4.mixins import localize
 from tik_manager4 import dcc
 from tik_manager4 import management
 from tik_manager4.external.packaging.version import Version
@@ -245,8 +246,20 @@ class Main:
         self.user.last_project = absolute_path
         self.dcc.set_project(absolute_path)
         self.globalize_management_platform()
+        self.resume_sync()
         return True, "Success"
 
+    def resume_sync(self):
+        """Resume the syncs of the project interrupted in an earlier session.
+
+        Returns:
+            SyncQueue: The sync queue or None if there is nothing to resume.
+        """
+        queue = localize.get_sync_queue(create=False)
+        if queue and queue.jobs:
+            self.log.info(f"Resuming {len(queue.jobs)} sync jobs.")
+        return queue
+
     def add_project_as_structure_template(self, template_name=None):
         """Add the current project as a new structure template."""
         # check for the permission level
@@ -10,18 +10,100 @@ class Metaitem:
     overridden: bool
 
 class Metadata(dict):
-    """Metadata class."""
-    def __init__(self, data_dictionary):
+    """Metadata class.
+
+    Metadata can be chained to a parent metadata. Only the items added to
+    this metadata are stored locally, the rest of the lookups fall through
+    to the parent. Inherited items are returned as detached non-overridden
+    copies, so writing to them never changes the parent.
+    """
+    def __init__(self, data_dictionary, parent=None):
         """Initialize Metadata object.
         Args:
             data_dictionary (dict): The dictionary to initialize the metadata with.
+            parent (Metadata, optional): The metadata to inherit the values from.
         """
-        super().__init__(data_dictionary)
+        super().__init__()
+        self._parent = parent
 
         # create a Metaitem for each key in the data_dictionary
         for key, val in data_dictionary.items():
             self.add_item(key, val)
 
+    @property
+    def parent(self):
+        """The parent metadata."""
+        return self._parent
+
+    @parent.setter
+    def parent(self, value):
+        self._parent = value
+
+    def _find(self, key):
+        """Return the closest Metaitem of the key in the chain or None."""
+        metadata = self
+        while metadata is not None:
+            if dict.__contains__(metadata, key):
+                return dict.__getitem__(metadata, key)
+            metadata = metadata._parent
+        return None
+
+    def __getitem__(self, key):
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        item = self._parent._find(key) if self._parent is not None else None
+        if item is None:
+            raise KeyError(key)
+        return Metaitem(item.value, overridden=False)
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        if self._parent is None:
+            return dict.__len__(self)
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, Metadata):
+            other = dict(other.items())
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def get(self, key, default=None):
+        """Return the Metaitem of the key or the default."""
+        if key in self:
+            return self[key]
+        return default
+
+    def keys(self):
+        """Return the inherited and the local keys."""
+        if self._parent is None:
+            return dict.keys(self)
+        keys = list(self._parent.keys())
+        inherited = set(keys)
+        keys.extend(key for key in dict.keys(self) if key not in inherited)
+        return keys
+
+    def items(self):
+        """Return the inherited and the local items."""
+        if self._parent is None:
+            return dict.items(self)
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        """Return the inherited and the local Metaitems."""
+        if self._parent is None:
+            return dict.values(self)
+        return [self[key] for key in self.keys()]
+
     def add_item(self, key, value, overridden=False):
         """Add an item to the metadata.
 
@@ -49,8 +131,9 @@ class Metadata(dict):
             key (str): The key to get the value of.
             fallback_value (any): The value to return if the key is not found.
         """
-        if key in self:
-            return self[key].value
+        item = self._find(key)
+        if item is not None:
+            return item.value
         return fallback_value
 
     def is_overridden(self, key):
@@ -62,8 +145,8 @@ class Metadata(dict):
         Returns:
             bool: True if the key is overridden, False otherwise.
         """
-        if key in self:
-            return self[key].overridden
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key).overridden
         return False
 
     def override(self, data_dictionary):
@@ -3,14 +3,67 @@
 Inherits from Subproject and adds project specific methods and properties.
 """
 
+from collections import deque
 from pathlib import Path
 
 from tik_manager4.core.constants import ObjectType
 from tik_manager4.objects.publisher import Publisher, SnapshotPublisher
 from tik_manager4.core import filelog
+from tik_manager4.core import index
+from tik_manager4.core import io
+from tik_manager4.core import journal
+from tik_manager4.core import scanner
+from tik_manager4.core import watcher
 from tik_manager4.core.settings import Settings
 from tik_manager4.objects.subproject import Subproject
-from tik_manager4.objects.work import Work
+from tik_manager4.objects.work import Work, SCENE_INDEX
+
+# Number of journaled branches to collect before compacting the journal
+# into the project structure file.
+STRUCTURE_JOURNAL_LIMIT = 500
+
+
+def _apply_structure_entries(structure_data, entries):
+    """Apply the journaled branches on the structure data in place.
+
+    Each entry holds the tree of a changed branch and the id of its parent.
+    A branch replaces the node with the same id or is added under its
+    parent if it is new.
+
+    Args:
+        structure_data (dict): The project structure data.
+        entries (list): Journal entries in the order they are written.
+
+    Returns:
+        dict: The updated structure data.
+    """
+    nodes = {}
+
+    def _index_nodes(start_node):
+        queue = deque([start_node])
+        while queue:
+            node = queue.popleft()
+            nodes[node.get("id")] = node
+            queue.extend(node.get("subs", []))
+
+    _index_nodes(structure_data)
+    for entry in entries:
+        tree = entry.get("tree") or {}
+        node = nodes.get(tree.get("id"))
+        if node is None:
+            parent = nodes.get(entry.get("parent_id"))
+            if parent is None:
+                Project.log.warning(
+                    f"Parent of the journaled subproject {tree.get('path')} "
+                    f"does not exist. Skipping."
+                )
+                continue
+            node = {}
+            parent.setdefault("subs", []).append(node)
+        node.clear()
+        node.update(tree)
+        _index_nodes(node)
+    return structure_data
 
 
 class Project(Subproject):
@@ -30,6 +83,7 @@ class Project(Subproject):
         self.publisher = Publisher(self)
         self.snapshot_publisher = SnapshotPublisher(self)
         self.structure = Settings()
+        self.structure_journal = journal.Journal()
         self.settings = Settings()
         self.preview_settings = Settings()
         self.category_definitions = Settings()
@@ -38,6 +92,7 @@ class Project(Subproject):
         self._database_path = None
         self._name = name
         self.__mode = ""
+        self._watcher = None
         # This makes sure the project folder is tik_manager4 ready
         if path:
             self._set(path)
@@ -72,15 +127,134 @@ class Project(Subproject):
     def save_structure(self):
         """Save the project structure to the database.
 
-        Project structure is the tree of subprojects.
+        Project structure is the tree of subprojects. Only the folders of
+        the branches changed since the last save are created. If the
+        'structure_journal' project setting is enabled, the changed
+        branches are appended to the structure journal instead of
+        rewriting the whole structure file.
+
+        If there is no record of the changed branches, the whole
+        structure is saved and all the folders are created.
         """
+        branches = self._pop_changed_branches()
+        if not branches or self in branches:
+            self.create_folders(root=self.database_path)
+            self.create_folders(root=self.absolute_path)
+            self._write_structure()
+            return
+
+        for branch in branches:
+            if branch.deleted:
+                continue
+            self.create_folders(root=self.database_path, sub=branch)
+            self.create_folders(root=self.absolute_path, sub=branch)
+
+        use_journal = self.settings.get_property("structure_journal", False)
+        if not use_journal or len(self.structure_journal) >= STRUCTURE_JOURNAL_LIMIT:
+            self._write_structure()
+            return
+        entries = [
+            {"parent_id": branch.parent_sub.id, "tree": branch.get_sub_tree()}
+            for branch in branches
+        ]
+        self.structure_journal.append(*entries)
+        # keep the in-memory structure data in sync without a full rebuild.
+        _apply_structure_entries(self.structure.properties, entries)
+
+    def _write_structure(self):
+        """Write the whole structure file and compact the journal."""
+        compact = len(self.structure_journal) > 0
         self.structure._current_value = self.get_sub_tree()
-        self.create_folders(root=self.database_path)
-        self.create_folders(root=self.absolute_path)
-        self.structure.apply_settings()
+        self.structure.apply_settings(force=compact)
+        if compact:
+            self.structure_journal.clear()
+
+    def _pop_changed_branches(self):
+        """Return and forget the branches changed since the last save.
+
+        Branches under another changed branch and the subprojects which
+        are no longer in the tree are left out.
+
+        Returns:
+            list: The top-most changed subprojects.
+        """
+        changed, self._changed_subs = self._changed_subs, {}
+        branches = []
+        for sub in changed.values():
+            current = sub
+            covered = False
+            while current.parent_sub is not None:
+                current = current.parent_sub
+                if id(current) in changed:
+                    covered = True
+                    break
+            if not covered and current is self:
+                branches.append(sub)
+        return branches
+
+    def is_modified(self):
+        """Check if the project files are changed since the project is set.
+
+        Only the structure and the project settings are checked. Tasks,
+        works and publishes are validated by their own scans.
+
+        Returns:
+            bool: True if the project needs to be set again.
+        """
+        return (
+            self.structure.is_modified()
+            or self.structure_journal.is_modified()
+            or self.settings.is_modified()
+        )
+
+    @property
+    def watcher(self):
+        """Return the running database watcher or None."""
+        return self._watcher
+
+    def start_watcher(self, callback=None, interval=2.0):
+        """Watch the database for the changes made by the other users.
+
+        While the watcher is running, only the folders reported by the
+        watcher are listed again by the scans.
+
+        Args:
+            callback (function, optional): Function to call with the list
+                of watcher.WatchEvent objects. Called from the watcher thread.
+            interval (float, optional): Seconds between the polls.
+
+        Returns:
+            DatabaseWatcher: The running watcher.
+        """
+        self.stop_watcher()
+        self._watcher = watcher.DatabaseWatcher(self._database_path, interval=interval)
+        if callback:
+            self._watcher.add_callback(callback)
+        self._watcher.start()
+        return self._watcher
+
+    def stop_watcher(self):
+        """Stop the database watcher if it is running."""
+        if self._watcher:
+            self._watcher.stop()
+            self._watcher = None
+
+    def rebuild_index(self):
+        """Rebuild the metadata index of the project from the database files.
+
+        This is a recovery command. It can be used when the index is out
+        of sync with the database, e.g. after files are edited manually.
+
+        Returns:
+            int: Number of indexed files.
+        """
+        count = index.rebuild_index(self._database_path)
+        self.log.info(f"Metadata index rebuilt. {count} files indexed.")
+        return count
 
     def _set(self, absolute_path, commons_id=None):
         """Set the project path and initialize the project structure."""
+        self.stop_watcher()
         self.__init__()
         _absolute_path_obj = Path(absolute_path)
 
@@ -93,7 +267,13 @@ class Project(Subproject):
         self.structure.settings_file = str(
             _database_path_obj / "project_structure.json"
         )
-        self.set_sub_tree(self.structure.properties)
+        self.structure_journal.file_path = str(
+            _database_path_obj / "project_structure.journal"
+        )
+        structure_data = self.structure.properties
+        if len(self.structure_journal):
+            _apply_structure_entries(structure_data, self.structure_journal.read())
+        self.set_sub_tree(structure_data)
         self.guard.set_project_root(self.absolute_path)
         self.guard.set_database_root(self.database_path)
         # get project settings
@@ -103,6 +283,19 @@ class Project(Subproject):
         if project_commons_id and project_commons_id != commons_id:
             return False, f"Commons ID Mismatch\n\nThis project is linked to a different commons:\nID: {project_commons_id}\nName: {project_commons_name}\n\nTo access this project, you need to switch to the corresponding commons."
         self.guard.set_project_settings(self.settings)
+        scanner.SCAN_CACHE.trust_window = float(
+            self.settings.get_property("scan_trust_window", 0) or 0
+        )
+        scanner.SCAN_CACHE.restat = bool(
+            self.settings.get_property("scan_restat_files", False)
+        )
+        io.set_compact(
+            self._absolute_path, self.settings.get_property("compact_files", False)
+        )
+        if self.settings.get_property("metadata_index", False):
+            index.activate(self._database_path)
+        else:
+            index.deactivate(self._database_path)
         # get preview settings
         self.preview_settings.settings_file = str(
             _database_path_obj / "preview_settings.json"
@@ -186,7 +379,6 @@ class Project(Subproject):
         if new_sub == -1:
             return -1
         self.save_structure()
-        self.create_folders(self._database_path)
         return new_sub
 
     def edit_sub_project(self, uid=None, path=None, name=None, **properties):
@@ -225,6 +417,7 @@ class Project(Subproject):
         sub_tree.update(properties)
 
         sub.set_sub_tree(sub_tree)
+        sub._mark_changed()
         self.save_structure()
         return 1
 
@@ -300,6 +493,9 @@ class Project(Subproject):
     def find_work_by_absolute_path(self, file_path):
         """Using the absolute path of the scene file return work object and version number.
 
+        The scene index is checked first. The work files in the folder are
+        scanned only if the scene is not in the index.
+
         Args:
             file_path: (String) Absolute path of the scene file.
 
@@ -317,18 +513,44 @@ class Project(Subproject):
         if not relative_path:
             self.log.error("File path is not under the project root")
             return None, None
+        resolved_path = Path(work_path.stem, base_name).as_posix()
+        scene_key = Path(relative_path, resolved_path).as_posix()
+        entry = SCENE_INDEX.get(self._database_path, scene_key)
+        if entry and Path(entry.work_file).is_file():
+            result = self.__match_work_version(Work(entry.work_file), resolved_path)
+            if result[0] is not None:
+                return result
+            # the version is deleted or moved. Forget the entry.
+            SCENE_INDEX.discard(self._database_path, scene_key)
+
         database_path = Path(self.get_abs_database_path(str(relative_path)))
         work_files = database_path.glob("*.twork")
         for work_file in work_files:
             work_obj = Work(work_file)
-            for nmb, version in enumerate(work_obj.versions):
-                resolved_path = Path(work_path.stem, base_name).as_posix()
-                if version.scene_path == resolved_path:
-                    # if this the the version and work that we are looking for
-                    # find its parent and define it within the work object
-                    parent_task = self.find_task_by_id(work_obj.task_id)
-                    work_obj.set_parent_task(parent_task)
-                    return work_obj, version.version or nmb
+            # the next lookups of the scanned works hit the index.
+            work_obj.index_scenes()
+            result = self.__match_work_version(work_obj, resolved_path)
+            if result[0] is not None:
+                return result
+        return None, None
+
+    def __match_work_version(self, work_obj, resolved_path):
+        """Return the work and the version number if the work has the scene.
+
+        Args:
+            work_obj (Work): The work object to search.
+            resolved_path (str): Scene path relative to the work folder.
+
+        Returns:
+            Tuple: (<work object>, <version number>) or (None, None)
+        """
+        for nmb, version in enumerate(work_obj.versions):
+            if version.scene_path == resolved_path:
+                # if this the the version and work that we are looking for
+                # find its parent and define it within the work object
+                parent_task = self.find_task_by_id(work_obj.task_id)
+                work_obj.set_parent_task(parent_task)
+                return work_obj, version.version or nmb
         return None, None
 
     def get_current_work(self):
@@ -9,7 +9,7 @@ from tik_manager4.objects.version import PromotedVersion
 from tik_manager4.core.constants import ObjectType, BranchingModes
 from tik_manager4.objects.version import PublishVersion, LiveVersion
 from tik_manager4.mixins.localize import LocalizeMixin
-from tik_manager4.core import filelog
+from tik_manager4.core import filelog, scanner, trace
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
@@ -176,19 +176,26 @@ class Publish(LocalizeMixin):
             if version.is_promoted():
                 return version
 
+    @trace.traced("Publish.scan_publish_versions", category="scan")
     def scan_publish_versions(self):
         """Return the publish versions in the publish folder."""
         # search directory is resolved from the work object
-        _search_dir = Path(self.get_publish_data_folder())
-        if not _search_dir.exists():
-            return {}
-        _publish_version_paths = list(_search_dir.glob("*.tpub"))
+        _index = self.metadata_index
+        if _index:
+            _publish_entries = _index.query_entries(
+                "publish", folder=Path(self.path, self.work_object.name).as_posix()
+            )
+        else:
+            _publish_entries = scanner.scan_directory(
+                self.get_publish_data_folder(), ".tpub"
+            )
+        _publish_mtimes = {entry.path: entry.mtime for entry in _publish_entries}
 
-        for _p_path, _p_data in dict(self._publish_versions).items():
-            if _p_path not in _publish_version_paths:
+        for _p_path in list(self._publish_versions):
+            if _p_path not in _publish_mtimes:
                 self._publish_versions.pop(_p_path)
 
-        for _publish_version_path in _publish_version_paths:
+        for _publish_version_path, _mtime in _publish_mtimes.items():
             existing_publish = self._publish_versions.get(_publish_version_path, None)
             if not existing_publish:
                 _publish = PublishVersion(
@@ -198,9 +205,17 @@ class Publish(LocalizeMixin):
                 )
                 self._publish_versions[_publish_version_path] = _publish
             else:
-                if existing_publish.is_modified():
+                if existing_publish.is_modified(_mtime):
                     existing_publish.reload()
 
+        # live and promoted links can be changed by the other users.
+        for _link_object in (self._live_object, self._promoted_object):
+            try:
+                if _link_object and _link_object.is_modified():
+                    _link_object.reload()
+            except OSError:
+                continue
+
         # make a similar caching for live and promoted versions. The process is costly
         # and we don't want to do it every time.
 
@@ -430,6 +445,7 @@ class Publish(LocalizeMixin):
 
         # clear the publish versions
         self._publish_versions = {}
+        self.work_object.update_publish_info()
         return 1, "success"
 
     def check_owner_permissions(self, version_number=None):
@@ -473,6 +489,7 @@ class Publish(LocalizeMixin):
         if not state:
             return -1, msg
 
+        self.work_object.update_publish_info()
         # remove the publish version from the publish versions
         return 1, "success"
 
@@ -498,4 +515,5 @@ class Publish(LocalizeMixin):
         if not dont_resurrect_versions:
             # resurrect only the last version. This is because we dont want any versionless works.
             self.all_versions[-1].resurrect()
+            self.work_object.update_publish_info()
         return 1
\ No newline at end of file
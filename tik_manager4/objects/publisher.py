@@ -4,10 +4,15 @@
 
 This module is responsible for handling the publish process.
 """
+import concurrent.futures
 import logging
 from pathlib import Path
 
+from tik_manager4.core import blobstore
+from tik_manager4.core import checksum
 from tik_manager4.core import filelog
+from tik_manager4.core import scanner
+from tik_manager4.core import trace
 from tik_manager4.core import utils
 
 from tik_manager4.objects.preview import Preview
@@ -43,6 +48,11 @@ class Publisher:
         self._published_object = None
         self.warnings = []
 
+        # checksums of the extracted elements are calculated in the background
+        # while the next elements are extracted.
+        self._checksum_pool = None
+        self._checksums = {}
+
     @property
     def validators(self):
         """List of resolved validators."""
@@ -66,6 +76,7 @@ class Publisher:
         return self._work_object.parent_task or \
         self._project_object.find_task_by_id(self._work_object.task_id)
 
+    @trace.traced("Publisher.resolve", category="publish")
     def resolve(self):
         """Resolve the publish data file name.
 
@@ -137,6 +148,7 @@ class Publisher:
         )
         return self._publish_file_name
 
+    @trace.traced("Publisher.reserve", category="publish")
     def reserve(self):
         """Reserve the slot for publish.
 
@@ -170,6 +182,7 @@ class Publisher:
         )
         self._published_object.add_property("elements", [])
         self._published_object.init_properties()  # make sure the properties are initialized
+        self._checksums = {}
         is_localized = self._published_object.can_localize()
         if is_localized:
             self._published_object.add_property("localized", True)
@@ -197,7 +210,52 @@ class Publisher:
         extract_object.version_string = f"v{self._publish_version:03d}"  # define the version string
         extract_object.extract()
         utils.write_protect(extract_object.resolve_output())
+        self._checksums.pop(extract_object.name, None)
+        if extract_object.state == "success" and self.guard.project_settings.get(
+            "element_checksums", True
+        ):
+            if not self._checksum_pool:
+                self._checksum_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+            self._checksums[extract_object.name] = self._checksum_pool.submit(
+                checksum.element_checksum, extract_object.resolve_output()
+            )
+
+    def _collect_checksum(self, extract_object):
+        """Wait for the checksum of the extracted element and return it.
+
+        Returns:
+            dict: The checksum record or None if it is not calculated.
+        """
+        future = self._checksums.pop(extract_object.name, None)
+        if not future:
+            return None
+        try:
+            return future.result()
+        except OSError as exc:
+            LOG.warning(f"Checksum of {extract_object.name} cannot be calculated: {exc}")
+            return None
+
+    def _store_element(self, element_path, element_checksum):
+        """Add the published element to the content store of the project.
+
+        Files with the same content as a previous publish are replaced with
+        hardlinks to the stored files. Elements outside of the project, e.g.
+        localized publishes, are not stored.
+        """
+        if not self.guard.project_settings.get("content_store", False):
+            return
+        project_root = Path(self.guard.project_root)
+        if project_root not in Path(element_path).parents:
+            return
+        store = blobstore.BlobStore.for_project(project_root)
+        try:
+            stats = store.add(element_path, element_checksum)
+        except OSError as exc:
+            LOG.warning(f"Element cannot be added to the content store => {element_path}: {exc}")
+            return
+        LOG.info(f"Content store: {element_path} => {stats}")
 
+    @trace.traced("Publisher.extract", category="publish")
     def extract(self):
         """Extract the elements.
 
@@ -208,6 +266,7 @@ class Publisher:
         for _extract_type_name, extract_object in self._resolved_extractors.items():
             self.extract_single(extract_object)
 
+    @trace.traced("Publisher.publish", category="publish")
     def publish(self,
                 notes=None,
                 preview_context=None,
@@ -256,6 +315,10 @@ class Publisher:
                 "bundle_info": extract_object.bundle_info,
                 "bundle_match_id": extract_object.bundle_match_id,
             }
+            element_checksum = self._collect_checksum(extract_object)
+            if element_checksum:
+                element["checksum"] = element_checksum
+                self._store_element(extract_object.resolve_output(), element_checksum)
             self._published_object._elements.append(element)
 
         self._published_object.edit_property(
@@ -297,6 +360,7 @@ class Publisher:
 
         self._published_object.apply_settings(force=True)
         self._published_object.make_live()
+        self._work_object.update_publish_info()
 
         # hook for post publish can be defined in per dcc handler.
         message_callback("Performing post publish operations")
@@ -328,6 +392,9 @@ class Publisher:
 
     def discard(self):
         """Discard the reserved slot."""
+        # the checksums must not read the files while they are deleted
+        concurrent.futures.wait(list(self._checksums.values()))
+        self._checksums = {}
         # find any extracted files and delete them
         for _extract_type_name, extract_object in self._resolved_extractors.items():
             if extract_object.state == "failed":
@@ -344,6 +411,10 @@ class Publisher:
         )
         if _publish_file_path.exists():
             _publish_file_path.unlink()
+            scanner.invalidate(self._abs_publish_data_folder)
+        _index = self._work_object.metadata_index
+        if _index:
+            _index.remove(str(_publish_file_path))
         self._published_object = None
         LOG.info("Publish discarded.")
 
@@ -508,6 +579,7 @@ class SnapshotPublisher(Publisher):
         """
         self._source_path = value
 
+    @trace.traced("SnapshotPublisher.resolve", category="publish")
     def resolve(self):
         """Resolve the file name for the snapshot.
 
@@ -3,6 +3,8 @@
 from pathlib import Path
 import shutil
 
+from tik_manager4.core import blobstore
+
 class Purgatory(object):
     """Purgatory is the place where all entities go to be deleted."""
 
@@ -13,14 +15,25 @@ class Purgatory(object):
     def purge_origin(self):
         """Purge all the entities in origin project purgatory"""
         purgatory_folder = Path(self.main.project.absolute_path) / ".purgatory"
-        if not purgatory_folder.exists():
-            return True, "Origin Project Purgatory already empty."
-        # delete the purgatory folder
-        try:
-            shutil.rmtree(purgatory_folder)
-        except Exception as exc:
-            return False, f"Error purging purgatory: {exc}"
-        return True, "Origin Purgatory purged successfully."
+        if purgatory_folder.exists():
+            # delete the purgatory folder
+            try:
+                shutil.rmtree(purgatory_folder)
+            except Exception as exc:
+                return False, f"Error purging purgatory: {exc}"
+            msg = "Origin Purgatory purged successfully."
+        else:
+            msg = "Origin Project Purgatory already empty."
+        # the stored files of the purged publishes are not used anymore.
+        if not self.main.project.settings.get_property("content_store", False):
+            return True, msg
+        store = blobstore.BlobStore.for_project(self.main.project.absolute_path)
+        if not Path(store.root).is_dir():
+            return True, msg
+        stats = store.collect_garbage()
+        if stats.removed:
+            msg += f" {stats.removed} unused stored files removed."
+        return True, msg
 
     def purge_local(self):
         """Purge all the entities in local project purgatory"""
@@ -0,0 +1,198 @@
+"""Resolve the published element paths for the loaders.
+
+Loaders like the Houdini HDAs resolve a path from the names of the project,
+subproject, task, category, work, version and element on every parameter
+change. Setting the project for each of them reloads all the project
+files. The Resolver keeps the project loaded as long as its structure and
+settings files are not modified. The rest is resolved with the incremental
+scans of the objects, which only reload the changed files.
+"""
+
+import os
+
+from tik_manager4.core import filelog
+
+LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
+
+
+class Resolver:
+    """Map the entity names to the objects and the element paths."""
+
+    version_exceptions = {
+        "LIVE": -1,
+        "PRO": 0,
+    }
+
+    def __init__(self, tik_main):
+        """Initialize the Resolver.
+
+        Args:
+            tik_main (tik_manager4.objects.main.Main): The main object
+                holding the project.
+        """
+        self.tik_main = tik_main
+
+    @staticmethod
+    def _normalize(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def get_project(self, project):
+        """Return the project object, setting the project only if necessary.
+
+        Args:
+            project (str): Absolute path of the project.
+
+        Returns:
+            Project: The project object or None if the project cannot be set.
+        """
+        project_obj = self.tik_main.project
+        if (
+            project_obj.absolute_path
+            and self._normalize(project_obj.absolute_path) == self._normalize(project)
+            and not project_obj.is_modified()
+        ):
+            return project_obj
+        state, _msg = self.tik_main.set_project(project)
+        if not state:
+            return None
+        return self.tik_main.project
+
+    def get_subproject(self, project, subproject):
+        """Return the subproject object.
+
+        Args:
+            project (str): Absolute path of the project.
+            subproject (str): Relative path of the subproject.
+
+        Returns:
+            Subproject: The subproject object or None if not found.
+        """
+        project_obj = self.get_project(project)
+        if not project_obj:
+            return None
+        subproject_obj = project_obj.find_sub_by_path(subproject)
+        return None if subproject_obj == -1 else subproject_obj
+
+    def get_task(self, project, subproject, task):
+        """Return the task object.
+
+        Args:
+            project (str): Absolute path of the project.
+            subproject (str): Relative path of the subproject.
+            task (str): Name of the task.
+
+        Returns:
+            Task: The task object or None if not found.
+        """
+        subproject_obj = self.get_subproject(project, subproject)
+        if not subproject_obj:
+            return None
+        subproject_obj.scan_tasks()
+        return subproject_obj.tasks.get(task)
+
+    def get_category(self, project, subproject, task, category):
+        """Return the category object.
+
+        Args:
+            project (str): Absolute path of the project.
+            subproject (str): Relative path of the subproject.
+            task (str): Name of the task.
+            category (str): Name of the category.
+
+        Returns:
+            Category: The category object or None if not found.
+        """
+        task_obj = self.get_task(project, subproject, task)
+        if not task_obj:
+            return None
+        return task_obj.categories.get(category)
+
+    def get_publish(self, project, subproject, task, category, work):
+        """Return the publish object of the work.
+
+        Args:
+            project (str): Absolute path of the project.
+            subproject (str): Relative path of the subproject.
+            task (str): Name of the task.
+            category (str): Name of the category.
+            work (str): Name of the work.
+
+        Returns:
+            Publish: The publish object or None if not found.
+        """
+        category_obj = self.get_category(project, subproject, task, category)
+        if not category_obj:
+            return None
+        for work_obj in category_obj.works.values():
+            if work_obj.name == work:
+                return work_obj.publish
+        return None
+
+    def get_version_number(self, version):
+        """Convert the version label to the version number.
+
+        Args:
+            version (str or int): Version number or one of the exceptions
+                like 'LIVE' and 'PRO'.
+
+        Returns:
+            int: The version number or None if the label is not valid.
+        """
+        if version in self.version_exceptions:
+            return self.version_exceptions[version]
+        try:
+            return int(version)
+        except (TypeError, ValueError):
+            return None
+
+    def get_version(self, project, subproject, task, category, work, version):
+        """Return the publish version object.
+
+        Args:
+            project (str): Absolute path of the project.
+            subproject (str): Relative path of the subproject.
+            task (str): Name of the task.
+            category (str): Name of the category.
+            work (str): Name of the work.
+            version (str or int): Version number, 'LIVE' or 'PRO'.
+
+        Returns:
+            PublishVersion: The publish version object or None if not found.
+        """
+        version_number = self.get_version_number(version)
+        if version_number is None:
+            return None
+        publish_obj = self.get_publish(project, subproject, task, category, work)
+        if not publish_obj:
+            return None
+        publish_obj.scan_publish_versions()
+        return publish_obj.get_version(version_number)
+
+    def resolve(self, project, subproject, task, category, work, version, element,
+                relative=False):
+        """Resolve the path of the published element.
+
+        Args:
+            project (str): Absolute path of the project.
+            subproject (str): Relative path of the subproject.
+            task (str): Name of the task.
+            category (str): Name of the category.
+            work (str): Name of the work.
+            version (str or int): Version number, 'LIVE' or 'PRO'.
+            element (str): The element type. e.g. 'alembic'
+            relative (bool, optional): If True, returns the path relative
+                to the project.
+
+        Returns:
+            str: The path of the element or None if it cannot be resolved.
+        """
+        version_obj = self.get_version(
+            project, subproject, task, category, work, version
+        )
+        if not version_obj:
+            LOG.warning(
+                f"Cannot resolve the publish version => "
+                f"{subproject}/{task}/{category}/{work} v{version}"
+            )
+            return None
+        return version_obj.get_element_path(element, relative=relative)
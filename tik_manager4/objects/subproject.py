@@ -1,6 +1,7 @@
 90# pylint: disable=super-with-arguments
 """Module for Subproject object."""
 
+from collections import deque
 from pathlib import Path
 import shutil
 
@@ -8,7 +9,7 @@ from fnmatch import fnmatch
 
 from tik_manager4.core.constants import ObjectType
 import tik_manager4.objects.task
-from tik_manager4.core import filelog
+from tik_manager4.core import filelog, scanner, trace
 from tik_manager4.objects.metadata import Metadata
 from tik_manager4.objects.entity import Entity
 from tik_manager4.objects.task import Task
@@ -35,7 +36,13 @@ class Subproject(Entity):
         self.__parent_sub = parent_sub
         self._sub_projects: dict = {}
         self._tasks: dict = {}
-        self._metadata = metadata or Metadata({})
+        self._metadata = metadata if metadata is not None else Metadata({})
+        # lookup tables of the whole tree. Only used on the root subproject.
+        self._subs_by_id = None
+        self._subs_by_path = None
+        self._tasks_by_id = None
+        # branches changed since the last structure save. Root only.
+        self._changed_subs = {}
 
     @property
     def parent(self):
@@ -91,6 +98,7 @@ class Subproject(Entity):
         This is a soft recover. DATABASE IS NOT TOUCHED.
         """
         self.metadata.add_item("deleted", False, overridden=True)
+        self._mark_changed()
         return 1
 
     def resurrect(self):
@@ -106,11 +114,13 @@ class Subproject(Entity):
     def replace_metadata(self, metadata):
         """Replace the metadata with the given one."""
         self._metadata = metadata
+        for sub in self._sub_projects.values():
+            sub.metadata.parent = metadata
 
     def get_sub_tree(self):
         """Return the subproject tree as a dictionary."""
-        visited = []
-        queue = []
+        visited = set()
+        queue = deque()
 
         # start with the initial dictionary with self subproject
         all_data = {
@@ -131,12 +141,12 @@ class Subproject(Entity):
         queue.append([all_data, self])
 
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             parent = current[0]
             sub = current[1]
 
             for neighbour in list(sub.subs.values()):
-                if neighbour not in visited:
+                if id(neighbour) not in visited:
                     sub_data = {
                         "id": neighbour.id,
                         "name": neighbour.name,
@@ -149,7 +159,7 @@ class Subproject(Entity):
                             sub_data[key] = metaitem.value
 
                     parent["subs"].append(sub_data)
-                    visited.append(neighbour)
+                    visited.add(id(neighbour))
                     queue.append([sub_data, neighbour])
 
         return all_data
@@ -163,20 +173,20 @@ class Subproject(Entity):
             data (dict): The dictionary data to build the subproject.
         """
         # first clear the subprojects
+        self._unregister_tree()
         self._sub_projects = {}
         persistent_keys = ["id", "name", "path", "subs"]
-        visited = []
-        queue = []
+        visited = set()
+        queue = deque()
         self.id = data.get("id", None)
         self._name = data.get("name", None)
         self._relative_path = data.get("path", None)
+        self._register_sub(self)
 
         # get all remaining keys as metadata
         # inherit parents metadata
         if self.__parent_sub:
-            self._metadata = Metadata(
-                dict(self.__parent_sub.metadata.get_all_items())
-            ) or Metadata({})
+            self._metadata = Metadata({}, parent=self.__parent_sub.metadata)
 
         for key, value in data.items():
             if key not in persistent_keys:
@@ -186,21 +196,19 @@ class Subproject(Entity):
         queue.append([self, data.get("subs", [])])
 
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             sub = current[0]
             data_position = current[1]
 
             for neighbour in data_position:
-                if neighbour not in visited:
+                if id(neighbour) not in visited:
                     _deleted = neighbour.get("deleted", False)
                     _id = neighbour.get("id", None)
                     _name = neighbour.get("name", None)
                     _relative_path = neighbour.get("path", None)
 
-                    # TODO take a look at this if it can be improved
-                    _metadata = Metadata(
-                        dict(sub.metadata.get_all_items())
-                    ) or Metadata({})
+                    # only the overridden values are stored in the subproject
+                    _metadata = Metadata({}, parent=sub.metadata)
                     properties = {}
                     for key, value in neighbour.items():
                         if key not in persistent_keys:
@@ -211,13 +219,9 @@ class Subproject(Entity):
 
                     # define the path and categories separately
                     sub_project._relative_path = _relative_path
+                    self._register_sub(sub_project)
 
-                    # add and override metadata
-                    for key, metaitem in sub_project.metadata.items():
-                        if neighbour.get(key, None):
-                            sub_project.metadata[key].overridden = True
-
-                    visited.append(neighbour)
+                    visited.add(id(neighbour))
                     queue.append([sub_project, neighbour.get("subs", [])])
 
     def __build_sub_project(self, name, parent_sub, metadata, uid):
@@ -234,7 +238,7 @@ class Subproject(Entity):
         """
 
         sub_pr = Subproject(
-            name=name, parent_sub=parent_sub, metadata=metadata, uid=uid
+            name=name, parent_sub=parent_sub or self, metadata=metadata, uid=uid
         )
         sub_pr.path = str(Path(self.path, name))
         self._sub_projects[name] = sub_pr
@@ -264,8 +268,7 @@ class Subproject(Entity):
         if state != 1:
             return -1
 
-        # TODO look at this if it can be improved
-        _metadata = Metadata(dict(self.metadata.get_all_items())) or Metadata({})
+        _metadata = Metadata({}, parent=self.metadata)
         # eliminate the None values
         properties = {k: v for k, v in properties.items() if v is not None}
         _metadata.override(properties)
@@ -286,34 +289,38 @@ class Subproject(Entity):
         new_sub = self.__build_sub_project(
             name, parent_sub, _metadata, uid
         )  # keep uid at the end
+        self._register_sub(new_sub)
+        new_sub._mark_changed()
 
         return new_sub
 
+    @trace.traced("Subproject.scan_tasks", category="scan")
     def scan_tasks(self):
         """Scan the subproject for tasks.
 
         Returns:
             dict: The tasks under the subproject.
         """
-        _tasks_search_dir = Path(self.get_abs_database_path())
-        _task_paths = list(_tasks_search_dir.glob("*.ttask"))
+        _task_entries = self._scan_task_entries()
 
         # add the file if it is new. if it is not new,
         # check the modified time and update if necessary
-        for _task_path in _task_paths:
-            _task_name = _task_path.stem
+        _task_names = set()
+        for _task_entry in _task_entries:
+            _task_name = _task_entry.path.stem
+            _task_names.add(_task_name)
             existing_task = self._tasks.get(_task_name, None)
             if not existing_task:
-                _task = Task(absolute_path=_task_path, parent_sub=self)
+                _task = Task(absolute_path=_task_entry.path, parent_sub=self)
                 self._tasks[_task_name] = _task
+                self._register_task(_task)
             else:
-                if existing_task.is_modified():
+                if existing_task.is_modified(_task_entry.mtime):
                     existing_task.refresh()
+                    self._register_task(existing_task)
 
         # if the lengths are not matching that means some tasks are deleted
-        if len(_task_paths) != len(self._tasks):
-            # get the task names
-            _task_names = [_task_path.stem for _task_path in _task_paths]
+        if len(_task_names) != len(self._tasks):
             # get the task names that are not in the _task_names
             _deleted_task_names = [
                 task_name
@@ -322,10 +329,49 @@ class Subproject(Entity):
             ]
             # delete the tasks
             for _deleted_task_name in _deleted_task_names:
-                del self._tasks[_deleted_task_name]
+                self._unregister_task(self._tasks.pop(_deleted_task_name))
 
         return self._tasks
 
+    def _scan_task_entries(self):
+        """Return the scan entries of the task files of the subproject."""
+        _index = self.metadata_index
+        if _index:
+            return _index.query_entries("task", folder=self.path)
+        return scanner.scan_directory(self.get_abs_database_path(), ".ttask")
+
+    def collect_tasks(self):
+        """Scan the tasks into a new dictionary without changing the subproject.
+
+        Safe to call from a worker thread. The unchanged tasks are re-used,
+        the new and the modified ones are loaded as new objects. Install
+        the result in the ui thread with set_tasks.
+
+        Returns:
+            dict: The tasks under the subproject.
+        """
+        tasks = {}
+        for _task_entry in self._scan_task_entries():
+            _task_name = _task_entry.path.stem
+            _task = self._tasks.get(_task_name, None)
+            if not _task or _task.is_modified(_task_entry.mtime):
+                _task = Task(absolute_path=_task_entry.path, parent_sub=self)
+            tasks[_task_name] = _task
+        return tasks
+
+    def set_tasks(self, tasks):
+        """Replace the tasks with the ones collected with collect_tasks.
+
+        Args:
+            tasks (dict): The tasks keyed by their names.
+        """
+        for _task_name, _task in self._tasks.items():
+            if tasks.get(_task_name) is not _task:
+                self._unregister_task(_task)
+        self._tasks = tasks
+        for _task in tasks.values():
+            self._register_task(_task)
+
     def add_task(self,
                  name,
                  categories,
@@ -372,6 +418,7 @@ class Subproject(Entity):
             _task.revive()
             _task.edit(categories=categories, metadata_overrides=metadata_overrides, uid=uid)
             self._tasks[name] = _task
+            self._register_task(_task)
             return _task
 
         _task_id = uid or self.generate_id()
@@ -403,6 +450,7 @@ class Subproject(Entity):
 
         _task.apply_settings()
         self._tasks[name] = _task
+        self._register_task(_task)
         return _task
 
     @staticmethod
@@ -446,6 +494,86 @@ class Subproject(Entity):
 
         return True, "success"
 
+    def _get_root_sub(self):
+        """Return the root of the subproject tree."""
+        root = self
+        while root.parent_sub is not None:
+            root = root.parent_sub
+        return root
+
+    def _walk_subs(self):
+        """Yield this subproject and all the subprojects below, breadth first."""
+        queue = deque([self])
+        while queue:
+            current = queue.popleft()
+            yield current
+            queue.extend(current.subs.values())
+
+    def _get_lookup_root(self):
+        """Return the root subproject with the lookup tables built."""
+        root = self._get_root_sub()
+        if root._subs_by_id is None:
+            root._subs_by_id = {}
+            root._subs_by_path = {}
+            root._tasks_by_id = {}
+            for sub in root._walk_subs():
+                root._subs_by_id.setdefault(sub.id, sub)
+                root._subs_by_path.setdefault(sub.path, sub)
+                for task in sub.all_tasks.values():
+                    root._tasks_by_id[task.id] = task
+        return root
+
+    def _register_sub(self, sub):
+        """Add the subproject to the lookup tables if they are built."""
+        root = self._get_root_sub()
+        if root._subs_by_id is None:
+            return
+        root._subs_by_id.setdefault(sub.id, sub)
+        root._subs_by_path.setdefault(sub.path, sub)
+
+    def _mark_changed(self):
+        """Mark the branch starting from this subproject for the next save."""
+        self._get_root_sub()._changed_subs[id(self)] = self
+
+    def _unregister_tree(self):
+        """Remove this subproject and the ones below from the lookup tables."""
+        root = self._get_root_sub()
+        # the subprojects below are about to be replaced.
+        for sub in self._walk_subs():
+            if sub is not self:
+                root._changed_subs.pop(id(sub), None)
+        if root._subs_by_id is None:
+            return
+        for sub in self._walk_subs():
+            if root._subs_by_id.get(sub.id) is sub:
+                del root._subs_by_id[sub.id]
+            if root._subs_by_path.get(sub.path) is sub:
+                del root._subs_by_path[sub.path]
+            if sub is self:
+                continue
+            for task in sub.all_tasks.values():
+                self._unregister_task(task)
+
+    def _register_task(self, task):
+        """Add the task to the lookup table if it is built."""
+        root = self._get_root_sub()
+        if root._tasks_by_id is not None:
+            root._tasks_by_id[task.id] = task
+
+    def _unregister_task(self, task):
+        """Remove the task from the lookup table."""
+        root = self._get_root_sub()
+        if root._tasks_by_id is not None and root._tasks_by_id.get(task.id) is task:
+            del root._tasks_by_id[task.id]
+
+    def _is_in_tree(self, sub):
+        """Check if the given subproject is this one or below this one."""
+        while sub is not None:
+            if sub is self:
+                return True
+            sub = sub.parent_sub
+        return False
+
     def find_tasks_by_wildcard(self, wildcard, query_all=False):
         """Return the tasks matching the wildcard.
 
@@ -459,16 +587,20 @@ class Subproject(Entity):
             list: List of tasks matching the wildcard.
         """
         _tasks = self.get_tasks_by_wildcard(wildcard, query_all=query_all)
-        queue = list(self.subs.values())
+        queue = deque(self.subs.values())
         while queue:
-            current = queue.pop(0)
-            queue.extend(list(current.subs.values()))
+            current = queue.popleft()
+            queue.extend(current.subs.values())
             _tasks.extend(current.get_tasks_by_wildcard(wildcard))
         return _tasks
 
     def find_task_by_id(self, uid, query_all=False):
         """Find the task by id.
 
+        Known tasks are looked up from the table kept on the root subproject
+        and only their parent subproject is scanned. Unknown ids fall back
+        to scanning all subprojects.
+
         Args:
             uid (int): Unique id of the task.
             query_all (bool, optional): If True, returns deleted tasks as well.
@@ -476,14 +608,26 @@ class Subproject(Entity):
         Returns:
             Task or int: The task object if successful, -1 otherwise.
         """
+        _task = self._get_lookup_root()._tasks_by_id.get(uid)
+        if _task is not None and self._is_in_tree(_task.parent_sub):
+            parent = _task.parent_sub
+            # make sure the task is still there and up to date.
+            parent.scan_tasks()
+            _task = parent.all_tasks.get(_task.name)
+            if _task is not None and _task.id == uid:
+                # deleted tasks are only returned from this subproject.
+                if not _task.deleted or (query_all and parent is self):
+                    return _task
+                return -1
+
         # first check if the task is under this subproject
         _search = self.get_task_by_id(uid, query_all=query_all)
         if _search != -1:
             return _search
-        queue = list(self.subs.values())
+        queue = deque(self.subs.values())
         while queue:
-            current = queue.pop(0)
-            queue.extend(list(current.subs.values()))
+            current = queue.popleft()
+            queue.extend(current.subs.values())
             _search = current.get_task_by_id(uid)
             if _search != -1:
                 return _search
@@ -501,12 +645,12 @@ class Subproject(Entity):
         """
         if self.id == uid:
             return self
-        queue = list(self.subs.values())
-        while queue:
-            current = queue.pop(0)
+        sub = self._get_lookup_root()._subs_by_id.get(uid)
+        if sub is not None and sub.id == uid and self._is_in_tree(sub):
+            return sub
+        for current in self._walk_subs():
             if current.id == uid:
                 return current
-            queue.extend(list(current.subs.values()))
         return -1
 
     def find_sub_by_path(self, path):
@@ -521,12 +665,12 @@ class Subproject(Entity):
         """
         if path in ("", "."):  # this is root
             return self
-        queue = list(self.subs.values())
-        while queue:
-            current = queue.pop(0)
+        sub = self._get_lookup_root()._subs_by_path.get(path)
+        if sub is not None and sub.path == path and self._is_in_tree(sub):
+            return sub
+        for current in self._walk_subs():
             if current.path == path:
                 return current
-            queue.extend(list(current.subs.values()))
         return -1
 
     def find_subs_by_wildcard(self, wildcard):
@@ -539,14 +683,12 @@ class Subproject(Entity):
             list: List of subprojects matching the wildcard.
         """
         subs = []
-        queue = list(self.subs.values())
-        visited = []
+        queue = deque(self.subs.values())
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             if fnmatch(current.name, wildcard):
                 subs.append(current)
-            if current not in visited:
-                queue.extend(list(current.subs.values()))
+            queue.extend(current.subs.values())
         return subs
 
     def get_uid_by_path(self, path):
@@ -655,6 +797,7 @@ class Subproject(Entity):
                 return -1
 
         self.metadata.add_item("deleted", True, overridden=True)
+        self._mark_changed()
 
         for task in self.tasks.values():
             result = task.destroy()
@@ -58,6 +58,7 @@ class Task(Settings, Entity):
         self._works = {}
         self._publishes = {}
         self._metadata_overrides = metadata_overrides or self.get_property("metadata_overrides", default={})
+        self._metadata = None
         self._task_id = self.get_property("task_id") or task_id
         self._relative_path = self.get_property("path") or path
         self._file_name = self.get_property("file_name") or file_name
@@ -116,12 +117,19 @@ class Task(Settings, Entity):
 
     @property
     def metadata(self):
-        """Metadata of the task."""
-        if self._parent_sub:
-            _metadata = self._parent_sub.metadata.copy()
-            _metadata.override(self._metadata_overrides)
-            return _metadata
-        return Metadata(self._metadata_overrides)
+        """Metadata of the task.
+
+        Chained to the metadata of the parent sub. Only the overrides of
+        the task are stored in it.
+        """
+        parent = self._parent_sub.metadata if self._parent_sub else None
+        if self._metadata is None or self._metadata.parent is not parent:
+            if parent is None:
+                self._metadata = Metadata(self._metadata_overrides)
+            else:
+                self._metadata = Metadata({}, parent=parent)
+                self._metadata.override(self._metadata_overrides)
+        return self._metadata
 
     @property
     def state(self):
@@ -235,6 +243,7 @@ class Task(Settings, Entity):
             self.edit_property("categories", list(categories))
         if metadata_overrides is not None: # explicitly check for None
             self._metadata_overrides = metadata_overrides
+            self._metadata = None
             self.edit_property("metadata_overrides", metadata_overrides)
         if uid and uid != self.id:
             self._task_id = uid
@@ -3,8 +3,16 @@
 from datetime import datetime
 from pathlib import Path
 
+from tik_manager4.core import checksum
 from tik_manager4.core import utils
-from tik_manager4.core.constants import ObjectType, ColorCodes, ValidationResult, ValidationState, BranchingModes
+from tik_manager4.core.constants import (
+    ObjectType,
+    ColorCodes,
+    ValidationResult,
+    ValidationState,
+    BranchingModes,
+    BranchMaterialization,
+)
 from tik_manager4.core.settings import Settings
 from tik_manager4.mixins.localize import LocalizeMixin
 from tik_manager4.core import filelog
@@ -214,6 +222,38 @@ class PublishVersion(Settings, LocalizeMixin):
         promoted_folder = Path(self.get_abs_project_path()).parent / "PROMOTED"
         return promoted_folder
 
+    def _materialize_element(self, publish_path, branch_path, element_data, branch_object):
+        """Create the branch element from the published element.
+
+        The project setting 'branch_materialization' selects copies, clones
+        or links of the published files. The element is not touched if the
+        branch already holds the same content according to the checksums,
+        except for the symlinks which must point to this version.
+        """
+        mode = self.guard.project_settings.get(
+            "branch_materialization", BranchMaterialization.COPY.value
+        )
+        if mode == BranchMaterialization.SYMLINK.value:
+            return utils.materialize(publish_path.as_posix(), branch_path.as_posix(), mode=mode)
+        previous = next(
+            (
+                element
+                for element in branch_object.get_property("elements", default=[]) or []
+                if element.get("type") == element_data["type"]
+            ),
+            {},
+        )
+        if (
+            checksum.is_same(previous.get("checksum"), element_data.get("checksum"))
+            and branch_path.exists()
+            and (
+                branch_path.is_dir()
+                or branch_path.stat().st_size == element_data["checksum"].get("size")
+            )
+        ):
+            return True, f"{branch_path} is unchanged."
+        return utils.materialize(publish_path.as_posix(), branch_path.as_posix(), mode=mode)
+
     def is_deleted(self):
         """Convenience method to check if the publish version is deleted."""
         return self._deleted
@@ -263,7 +303,9 @@ class PublishVersion(Settings, LocalizeMixin):
             else:
                 live_element_name = f"{element_type.upper()}_{self._name}{publish_path.suffix}"
                 live_path = live_folder / live_element_name
-                state, msg = utils.copy(publish_path.as_posix(), live_path.as_posix())
+                state, msg = self._materialize_element(
+                    publish_path, live_path, element_data, self._live_object
+                )
                 if not state:
                     # TODO: FIX - TEST - STREAMLINE
                     LOG.error(f"Error copying {publish_path} to {live_path}: {msg}")
@@ -282,6 +324,7 @@ class PublishVersion(Settings, LocalizeMixin):
                 "bundled": element_data["bundled"],
                 "bundle_info": element_data["bundle_info"],
                 "bundle_match_id": element_data["bundle_match_id"],
+                "checksum": element_data.get("checksum"),
             })
         self._live_object.set_data(_data)
         self._live_object.apply_settings(force=True)
@@ -358,7 +401,9 @@ class PublishVersion(Settings, LocalizeMixin):
             else:
                 promoted_element_name = f"{element_type.upper()}_{self._name}{publish_path.suffix}"
                 promoted_path = promoted_folder / promoted_element_name
-                state, msg = utils.copy(publish_path.as_posix(), promoted_path.as_posix())
+                state, msg = self._materialize_element(
+                    publish_path, promoted_path, element_data, self._promoted_object
+                )
                 if not state:
                     LOG.error(f"Error copying {publish_path} to {promoted_path}: {msg}")
                     return ValidationResult(ValidationState.ERROR, msg, False)
@@ -375,6 +420,7 @@ class PublishVersion(Settings, LocalizeMixin):
                 "bundled": element_data.get("bundled", False),
                 "bundle_info": element_data.get("bundle_info", {}),
                 "bundle_match_id": element_data.get("bundle_match_id", 0),
+                "checksum": element_data.get("checksum"),
             })
         self._promoted_object.set_data(_data)
         self._promoted_object.apply_settings(force=True)
@@ -443,6 +489,24 @@ class PublishVersion(Settings, LocalizeMixin):
                 return path
         return None
 
+    def verify_elements(self):
+        """Compare the published elements with their recorded checksums.
+
+        Returns:
+            dict: Element types mapped to True if the content matches, False
+                if it is changed or missing and None if the element has no
+                checksum, e.g. published by an older version.
+        """
+        results = {}
+        for element in self.elements:
+            record = element.get("checksum")
+            if not record:
+                results[element["type"]] = None
+                continue
+            element_path = self.get_element_path(element["type"], relative=False)
+            results[element["type"]] = checksum.verify(element_path, record)
+        return results
+
     def get_element_suffix(self, element_type):
         """Return the element suffix of the given element type.
 
@@ -4,12 +4,17 @@
 
 import socket
 import shutil
+import threading
 from pathlib import Path
+from typing import NamedTuple
 
 from tik_manager4.core.constants import ObjectType
 from tik_manager4.dcc.standalone.main import Dcc as StandaloneDcc
 from tik_manager4.core.settings import Settings
 from tik_manager4.core import filelog
+from tik_manager4.core import index
+from tik_manager4.core import journal
+from tik_manager4.core import trace
 from tik_manager4.objects.publish import Publish
 from tik_manager4.objects.version import WorkVersion
 from tik_manager4.mixins.localize import LocalizeMixin
@@ -17,6 +22,162 @@ from tik_manager4.mixins.localize import LocalizeMixin
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
 
+class SceneEntry(NamedTuple):
+    """Work version of a scene file."""
+    work_file: str
+    version: int
+    task_id: int
+
+
+class SceneIndex:
+    """Process-wide reverse index of the scene files to the work versions.
+
+    Scene paths are kept relative to the project root, so the localized
+    copies of the scene files resolve to the same entries. The versions
+    are added when they are saved and when a lookup scans the works of a
+    folder. Loading a work does not add its versions.
+    Entries are not removed when the versions are deleted. Callers must
+    validate the entries they get.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, database_root, scene_path, entry):
+        """Add or replace the entry of the scene.
+
+        Args:
+            database_root (str): The database folder of the project.
+            scene_path (str): Posix scene path relative to the project root.
+            entry (SceneEntry): The work version of the scene.
+        """
+        with self._lock:
+            self._entries[(database_root, scene_path)] = entry
+
+    def get(self, database_root, scene_path):
+        """Return the SceneEntry of the scene or None."""
+        return self._entries.get((database_root, scene_path))
+
+    def discard(self, database_root, scene_path):
+        """Remove the entry of the scene if it exists."""
+        with self._lock:
+            self._entries.pop((database_root, scene_path), None)
+
+    def clear(self):
+        """Remove all the entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+SCENE_INDEX = SceneIndex()
+
+# Number of journaled versions before the work file is rewritten.
+VERSION_JOURNAL_LIMIT = 50
+
+
+def _merge_versions(versions, entries):
+    """Merge the journaled version dictionaries into the versions.
+
+    Versions are only journaled when they are created, so a journaled
+    version number found in the work file is either the same version
+    written into the file before the journal is cleared, or another version
+    saved with the same number by a client which does not read the journal.
+    The version in the work file is kept in both cases.
+
+    Args:
+        versions (list): Version dictionaries of the work file.
+        entries (list): Journaled version dictionaries.
+
+    Returns:
+        list: The merged version dictionaries.
+    """
+    versions = list(versions)
+    file_versions = {version.get("version_number"): version for version in versions}
+    positions = {}
+    for entry in entries:
+        version_number = entry.get("version_number")
+        if version_number in file_versions:
+            if entry != file_versions[version_number]:
+                LOG.warning(
+                    f"Journaled version {version_number} is saved again without "
+                    f"the journal. Keeping the version in the work file."
+                )
+            continue
+        position = positions.get(version_number)
+        if position is None:
+            positions[version_number] = len(versions)
+            versions.append(entry)
+        else:
+            versions[position] = entry
+    return versions
+
+
+class VersionList:
+    """Versions of a work. WorkVersion objects are created on first access.
+
+    Works with long histories load fast since only the accessed versions
+    are converted to objects. Untouched versions are serialized back as
+    they are read.
+    """
+
+    def __init__(self, work, data=()):
+        """Initialize the VersionList.
+
+        Args:
+            work (Work): The parent work.
+            data (list): Version dictionaries.
+        """
+        self._work = work
+        self._items = list(data)
+
+    def _materialize(self, position):
+        item = self._items[position]
+        if isinstance(item, dict):
+            item = WorkVersion(self._work._relative_path, item, self._work)
+            self._items[position] = item
+        return item
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [
+                self._materialize(pos)
+                for pos in range(*position.indices(len(self._items)))
+            ]
+        return self._materialize(position)
+
+    def __iter__(self):
+        for position in range(len(self._items)):
+            yield self._materialize(position)
+
+    def append(self, version_obj):
+        """Append the WorkVersion object or the version dictionary."""
+        self._items.append(version_obj)
+
+    def iter_data(self):
+        """Yield the version dictionaries without creating the objects."""
+        for item in self._items:
+            yield item if isinstance(item, dict) else item.to_dict()
+
+    def find(self, version_number):
+        """Return the WorkVersion of the given version number or None."""
+        for position, item in enumerate(self._items):
+            if isinstance(item, dict):
+                number = item.get("version_number")
+            else:
+                number = item.version
+            if number == version_number:
+                return self._materialize(position)
+        return None
+
+    def to_list(self):
+        """Return the list of the version dictionaries."""
+        return list(self.iter_data())
+
+
 class Work(Settings, LocalizeMixin):
     """Work object to handle works and publishes."""
 
@@ -40,7 +201,8 @@ class Work(Settings, LocalizeMixin):
         self._category = None
         self._dcc = self.guard.dcc
         self._dcc_version = None
-        self._versions = []
+        self._versions = VersionList(self)
+        self._journal = journal.Journal()
         self._work_id = self._id
         self._task_name = None
         self._task_id = None
@@ -54,10 +216,8 @@ class Work(Settings, LocalizeMixin):
         self._state = "working"
 
         self.modified_time = None  # to compare and update if necessary
-        self.publish = None
+        self._publish = None  # created on first access
         self.init_properties()
-        self.init_publish()
-
 
     def init_properties(self):
         """Initialize the properties of the work from the inherited dictionary."""
@@ -70,18 +230,101 @@ class Work(Settings, LocalizeMixin):
         self._task_name = self.get_property("task_name", self._task_name)
         self._task_id = self.get_property("task_id")
         self._relative_path = self.get_property("path", self._relative_path)
-        self._versions = [WorkVersion(self._relative_path, version, self) for version in self.get_property("versions", [])]
+        version_data = self.get_property("versions", [])
+        if self.get_property("version_journal", False):
+            self._journal.file_path = self.journal_file
+            version_data = _merge_versions(version_data, self._journal.read())
+        self._versions = VersionList(self, version_data)
         self._software_version = self.get_property("softwareVersion")
         self._state = self.get_property("state", self._state)
         # keeping the 'working' state for backward compatibility.
+        if self._state in ("active", "working") and self._is_published():
+            self._state = "published"
+
+    def _is_published(self):
+        """Resolve the published flag of the work.
+
+        Works saved before the flag was stored fall back to the publish
+        folder. Works without versions have nothing published.
+        """
+        published = self.get_property("published")
+        if published is None:
+            return bool(self._versions) and bool(self.publish.get_versions())
+        return published
+
+    def index_scenes(self):
+        """Add the scene files of all versions to the scene index."""
+        for version_dict in self._versions.iter_data():
+            self._index_scene(version_dict)
+
+    def _index_scene(self, version_dict):
+        """Add the scene file of the version to the scene index."""
+        scene_path = version_dict.get("scene_path")
+        if not scene_path or not self.guard.database_root:
+            return
+        SCENE_INDEX.add(
+            self.guard.database_root,
+            Path(self.path, scene_path).as_posix(),
+            SceneEntry(
+                str(self.settings_file),
+                version_dict.get("version_number"),
+                self._task_id,
+            ),
+        )
+
+    @property
+    def journal_file(self):
+        """Path of the version journal next to the work file."""
+        return f"{self.settings_file}{index.JOURNAL_SUFFIX}"
+
+    @property
+    def publish(self):
+        """Publish object of the work. Created on first access."""
+        if self._publish is None:
+            self.init_publish()
+        return self._publish
 
     def init_publish(self):
-        self.publish = Publish(
+        """(Re)create the publish object of the work."""
+        self._publish = Publish(
             self
         )
-        if self._state == "active" or self._state == "working":
-            if self.publish.versions:
-                self._state = "published"
+
+    def set_publish(self, publish_obj):
+        """Replace the publish object, e.g. with one scanned in a worker thread.
+
+        Args:
+            publish_obj (Publish): The publish object of the work.
+        """
+        self._publish = publish_obj
+
+    @property
+    def latest_publish_version(self):
+        """Number of the latest publish version stored in the work file.
+
+        Zero if the work is not published. Reading it does not scan the
+        publish folder, unless the work was saved before the number was
+        stored.
+        """
+        latest = self.get_property("latest_publish_version")
+        if latest is None:
+            versions = self.publish.get_versions()
+            return max((version.version for version in versions), default=0)
+        return latest
+
+    def update_publish_info(self):
+        """Store the published flag and the latest publish version number.
+
+        The stored values let the state of the work be resolved without
+        scanning the publish folder.
+        """
+        versions = self.publish.get_versions()
+        latest = max((version.version for version in versions), default=0)
+        self.add_property("published", bool(versions))
+        self.add_property("latest_publish_version", latest)
+        if self._state != "omitted":
+            self._state = "published" if versions else "active"
+        self.apply_settings()
 
     @property
     def state(self):
@@ -156,8 +399,8 @@ class Work(Settings, LocalizeMixin):
 
     def has_valid_versions(self):
         """Check if the work has at least one valid version."""
-        for version in self._versions:
-            if not version.deleted:
+        for version_dict in self._versions.iter_data():
+            if not version_dict.get("deleted", False):
                 return True
         return False
 
@@ -167,6 +410,17 @@ class Work(Settings, LocalizeMixin):
         self._task_id = task_obj.id
         self._task_name = task_obj.name
 
+    def is_modified(self, modified_time=None):
+        """Check if the work file or its version journal is modified.
+
+        Args:
+            modified_time (float, optional): The modified time of the work
+                file if it is already known.
+        """
+        if super(Work, self).is_modified(modified_time):
+            return True
+        return bool(self._journal.file_path) and self._journal.is_modified()
+
     def reload(self):
         """Reload the work from file."""
         self.__init__(
@@ -203,10 +457,9 @@ class Work(Settings, LocalizeMixin):
         Args:
             version_number (int): Version number.
         """
-        for version in self._versions:
-            if version.version == version_number:
-                return version
+        return self._versions.find(version_number)
 
+    @trace.traced("Work.new_version_from_path", category="work")
     def new_version_from_path(self, file_path, notes="", dry_version=False):
         """Register a given path (file or folder) as a new version of the work.
 
@@ -268,15 +521,68 @@ class Work(Settings, LocalizeMixin):
         }
         version_obj = WorkVersion(self.path, version_dict, self)
         self._versions.append(version_obj)
-        self.apply_settings()
+        self.save_new_version(version_obj)
         return version_obj
 
+    def _use_version_journal(self):
+        """Check if the project journals the new work versions."""
+        project_settings = self.guard.project_settings
+        return bool(
+            project_settings and project_settings.get("version_journal", False)
+        )
+
+    def save_new_version(self, version_obj):
+        """Save the work after the version is appended.
+
+        If the project uses the version journal, the version is appended to
+        the journal instead of rewriting the whole work file. The work file
+        is rewritten if anything else is changed or the journal is full.
+
+        Args:
+            version_obj (WorkVersion): The appended version.
+        """
+        version_dict = version_obj.to_dict()
+        self._index_scene(version_dict)
+        current = dict(self._current_value, versions=None)
+        original = dict(self._original_value, versions=None)
+        if (
+            not original.get("version_journal", False)
+            or not self._use_version_journal()
+            or current != original
+            or len(self._journal) >= VERSION_JOURNAL_LIMIT
+        ):
+            self.apply_settings()
+            return
+        self._journal.append(version_dict)
+        _index = index.find_index(str(self.settings_file))
+        if _index is not None:
+            _index.update(
+                str(self.settings_file), dict(current, versions=[version_dict])
+            )
+
     def apply_settings(self, force=False):
-        """Override the apply settings to add version serialization before."""
-        self.edit_property("versions",
-                           [version.to_dict() for version in self._versions])
-        super(Work, self).apply_settings(force=force)
+        """Override the apply settings to add version serialization before.
 
+        The journaled versions are written into the work file and the
+        journal is cleared.
+        """
+        if self._journal.file_path and self._journal.is_modified():
+            # versions journaled by the other processes since loaded.
+            for version_dict in _merge_versions([], self._journal.read()):
+                if not self._versions.find(version_dict.get("version_number")):
+                    self._versions.append(version_dict)
+        self.edit_property("versions", self._versions.to_list())
+        if self._use_version_journal():
+            self.add_property("version_journal", True)
+            self._journal.file_path = self._journal.file_path or self.journal_file
+        elif "version_journal" in self._current_value:
+            self.delete_property("version_journal")
+        written = super(Work, self).apply_settings(force=force)
+        if written and self._journal.file_path:
+            self._journal.clear()
+        return written
+
+    @trace.traced("Work.new_version", category="work")
     def new_version(self, file_format=None, notes="", ignore_checks=True, from_selection=False):
         """Create a new version of the work.
 
@@ -357,7 +663,7 @@ class Work(Settings, LocalizeMixin):
             version_dict["localized_path"] = output_path
         version_obj = WorkVersion(self.path, version_dict, self)
         self._versions.append(version_obj)
-        self.apply_settings()
+        self.save_new_version(version_obj)
         self._dcc_handler.post_save()
         return version_obj
 
@@ -5,7 +5,7 @@ import sys  # This is required for the 'frozen' attribute DO NOT REMOVE
 from pathlib import Path
 import logging
 
-from tik_manager4.core.constants import DataTypes, BranchingModes
+from tik_manager4.core.constants import DataTypes, BranchingModes, BranchMaterialization
 
 from tik_manager4.ui.Qt import QtWidgets, QtCore
 from tik_manager4.ui.widgets.validated_string import ValidatedString
@@ -304,6 +304,29 @@ class SettingsDialog(QtWidgets.QDialog):
                 "type": DataTypes.BOOLEAN.value,
                 "tooltip": "If enabled, publish files will be stored in the cache folder and won't be accessible for other users until its synced.",
                 "value": self.main_object.user.localization.get_property("cache_publishes", False),
+            },
+            "verify_sync": {
+                "display_name": "Verify Synced Files",
+                "type": DataTypes.BOOLEAN.value,
+                "tooltip": "If enabled, the checksums of the files copied to the project while syncing are compared with the local files before the local files are removed.",
+                "value": self.main_object.user.localization.get_property("verify_sync", False),
+            },
+            "sync_workers": {
+                "display_name": "Sync Workers",
+                "type": DataTypes.INTEGER.value,
+                "tooltip": "Number of elements synced to the project at the same time.",
+                "value": self.main_object.user.localization.get_property("sync_workers", 4),
+                "minimum": 1,
+                "maximum": 32,
+            },
+            "sync_bandwidth": {
+                "display_name": "Sync Bandwidth (MB/s)",
+                "type": DataTypes.INTEGER.value,
+                "tooltip": "Maximum bandwidth used by the sync in megabytes per second.\n"
+                           "Set 0 for no limit.",
+                "value": self.main_object.user.localization.get_property("sync_bandwidth", 0),
+                "minimum": 0,
+                "maximum": 10000,
             }
         }
 
@@ -480,6 +503,112 @@ class SettingsDialog(QtWidgets.QDialog):
                            "Active branches are overwritten duplicates of specific published versions.\n"
                            "Passive branches method won't overwrite the branch but still keep\n"
                            "track of the versions that the branches are originated from.\n",
+            },
+            "metadata_index": {
+                "display_name": "Metadata Index",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("metadata_index", False),
+                "tooltip": "Keep a SQLite index of tasks, works and publishes under tikDatabase.\n"
+                           "Browsing reads the index instead of scanning the database folders.\n"
+                           "Recommended for large projects on network shares.\n",
+            },
+            "scan_trust_window": {
+                "display_name": "Scan Trust Window",
+                "type": DataTypes.FLOAT.value,
+                "value": self.main_object.project.settings.get_property("scan_trust_window", 0.0),
+                "minimum": 0.0,
+                "maximum": 3600.0,
+                "tooltip": "Seconds to re-use the folder listings without checking the folders.\n"
+                           "Unchanged folders are never listed again regardless of this value.\n"
+                           "Increase it to reduce the traffic on slow network shares.\n"
+                           "Changes made by the other users show up after this delay.\n",
+            },
+            "scan_restat_files": {
+                "display_name": "Re-stat Scanned Files",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("scan_restat_files", False),
+                "tooltip": "Check the modified time of each file in the unchanged folders.\n"
+                           "Enable it when older clients that rewrite the files in place\n"
+                           "share the project. Costs one file check per entity on each scan.\n",
+            },
+            "database_watcher": {
+                "display_name": "Database Watcher",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("database_watcher", False),
+                "tooltip": "Watch the database in the background and refresh the views\n"
+                           "when the other users create, publish or edit the entities.\n"
+                           "Folders are listed again only when the watcher reports a change.\n",
+            },
+            "loader_workers": {
+                "display_name": "Loader Workers",
+                "type": DataTypes.INTEGER.value,
+                "value": self.main_object.project.settings.get_property("loader_workers", 8),
+                "minimum": 0,
+                "maximum": 64,
+                "tooltip": "Number of threads to load the works and publishes in parallel.\n"
+                           "Set 0 to load them one by one.\n",
+            },
+            "structure_journal": {
+                "display_name": "Structure Journal",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("structure_journal", False),
+                "tooltip": "Append the changed subprojects to a journal file instead of\n"
+                           "rewriting the whole project structure on every edit.\n"
+                           "The journal is merged into the structure file periodically.\n",
+            },
+            "compact_files": {
+                "display_name": "Compact Database Files",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("compact_files", False),
+                "tooltip": "Write the database files of the project without indentation.\n"
+                           "Smaller files are faster to read and write, especially on\n"
+                           "network shares, but they are harder to read by eye.\n"
+                           "Existing files are converted when they are saved again.\n",
+            },
+            "version_journal": {
+                "display_name": "Version Journal",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("version_journal", False),
+                "tooltip": "Append the new work versions to a journal file next to the work\n"
+                           "instead of rewriting the whole work file on every save.\n"
+                           "Recommended for works with hundreds of versions.\n"
+                           "Older Tik Manager versions only see the versions merged\n"
+                           "into the work file.\n",
+            },
+            "branch_materialization": {
+                "display_name": "Branch Files",
+                "type": DataTypes.COMBO.value,
+                "items": [mode.value for mode in BranchMaterialization],
+                "value": self.main_object.project.settings.get_property("branch_materialization", BranchMaterialization.COPY.value),
+                "tooltip": "How the files of the active LIVE and PROMOTED branches are created.\n"
+                           "Copy duplicates the published files.\n"
+                           "Hardlink and Reflink share the data with the published files\n"
+                           "without using extra storage. Reflinks need a file system like\n"
+                           "btrfs or xfs and hardlinks need the same drive.\n"
+                           "Symlink links to the published files. The branch breaks if the\n"
+                           "published version is deleted.\n"
+                           "Auto uses the best supported method for each drive.\n"
+                           "Files are copied if the method is not supported.\n",
+            },
+            "element_checksums": {
+                "display_name": "Element Checksums",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("element_checksums", True),
+                "tooltip": "Record the checksums of the published elements.\n"
+                           "The checksums are used to verify the published files and\n"
+                           "to skip updating the LIVE and PROMOTED branches if the\n"
+                           "content is not changed.\n",
+            },
+            "content_store": {
+                "display_name": "Content Store",
+                "type": DataTypes.BOOLEAN.value,
+                "value": self.main_object.project.settings.get_property("content_store", False),
+                "tooltip": "Store the published files once by their checksums.\n"
+                           "Republished files with the same content are hardlinked to\n"
+                           "the stored files instead of using extra storage.\n"
+                           "Needs the Element Checksums and the publishes on the same\n"
+                           "drive as the project. Unused stored files are removed\n"
+                           "when the purgatory is purged.\n",
             }
         }
 
@@ -88,6 +88,8 @@ def launch(dcc="Standalone", dont_show=False):
 class MainUI(QtWidgets.QMainWindow):
     """Main UI for Tik Manager 4."""
 
+    database_changed = QtCore.Signal(object)
+
     def __init__(self, main_object, window_name=WINDOW_NAME, **kwargs):
         """Initialize the main UI."""
         # pylint: disable=too-many-statements
@@ -223,39 +225,19 @@ class MainUI(QtWidgets.QMainWindow):
         # subproject
 
         subproject_id = self.tik.user.last_subproject
-        if subproject_id:  # pylint: disable=too-many-nested-blocks
+        if subproject_id:
             state = self.subprojects_mcv.sub_view.select_by_id(subproject_id)
             if state:
-                # if its successfully set, then select the last selected task
-                task_id = self.tik.user.last_task
-                if task_id:
-                    state = self.tasks_mcv.task_view.select_by_id(task_id)
-                    if state:
-                        # if its successfully set, then select the last category
-                        category_index = self.tik.user.last_category or 0
-                        self.categories_mcv.set_category_by_index(category_index)
-                        work_id = self.tik.user.last_work
-                        if work_id:
-                            state = self.categories_mcv.work_tree_view.select_by_id(
-                                work_id
-                            )
-                            if state:
-                                # if its successfully set, then select the last version
-                                version_id = self.tik.user.last_version
-                                if version_id:
-                                    self.versions_mcv.set_version(version_id)
-                    else:
-                        # if the task cannot be set, then select the first one
-                        self.tasks_mcv.task_view.select_first_item()
-                else:
-                    # if there is no task, then select the first one
-                    self.tasks_mcv.task_view.select_first_item()
+                # tasks are loaded in the background. Continue once they are added.
+                self.tasks_mcv.task_view.call_when_loaded(self._resume_last_task)
         else:
             # if there are no subprojects, then select the first one
             self.subprojects_mcv.sub_view.select_first_item()
 
             # if there is no task, then select the first one
-            self.tasks_mcv.task_view.select_first_item()
+            self.tasks_mcv.task_view.call_when_loaded(
+                self.tasks_mcv.task_view.select_first_item
+            )
 
         self.subprojects_mcv.sub_view.set_expanded_state(
             self.tik.user.expanded_subprojects
@@ -299,6 +281,30 @@ class MainUI(QtWidgets.QMainWindow):
         self.user_login_visibility.setChecked(ui_elements.get("user", True))
         self.buttons_visibility.setChecked(ui_elements.get("buttons", True))
 
+    def _resume_last_task(self):
+        """Resume the last task and category after the tasks are loaded."""
+        task_id = self.tik.user.last_task
+        if not task_id or not self.tasks_mcv.task_view.select_by_id(task_id):
+            # if the task cannot be set, then select the first one
+            self.tasks_mcv.task_view.select_first_item()
+            return
+        # if its successfully set, then select the last category
+        category_index = self.tik.user.last_category or 0
+        self.categories_mcv.set_category_by_index(category_index)
+        # works are loaded in the background. Continue once they are added.
+        self.categories_mcv.call_when_loaded(self._resume_last_work)
+
+    def _resume_last_work(self):
+        """Resume the last work and version after the works are loaded."""
+        work_id = self.tik.user.last_work
+        if not work_id:
+            return
+        if self.categories_mcv.work_tree_view.select_by_id(work_id):
+            # if its successfully set, then select the last version
+            version_id = self.tik.user.last_version
+            if version_id:
+                self.versions_mcv.set_version(version_id)
+
     def set_last_state(self):
         """Set the last selections for the user"""
         # get the currently selected subproject
@@ -448,6 +454,9 @@ class MainUI(QtWidgets.QMainWindow):
         # refresh the tasks
         self.tasks_mcv.task_view.refresh()
 
+        self.database_changed.connect(self.on_database_changed)
+        self.start_database_watcher()
+
     def closeEvent(self, event):  # pylint: disable=invalid-name
         """Override the close event to save the window state."""
         self.tik.user.last_subproject = None
@@ -464,9 +473,31 @@ class MainUI(QtWidgets.QMainWindow):
         )
 
         self.tik.user.resume.apply_settings()
+        self.tik.project.stop_watcher()
         _ = QtWidgets.QApplication.allWidgets()
         event.accept()
 
+    def start_database_watcher(self):
+        """Start the database watcher if it is enabled for the project."""
+        if not self.tik.project.settings.get("database_watcher", False):
+            self.tik.project.stop_watcher()
+            return
+        # the callback runs in the watcher thread. Signal is queued to the ui thread.
+        self.tik.project.start_watcher(callback=self.database_changed.emit)
+
+    def on_database_changed(self, events):
+        """Refresh only the views affected by the changes of the other users.
+
+        Args:
+            events (list): List of watcher.WatchEvent objects.
+        """
+        if self.subprojects_mcv.sub_view.is_affected(events):
+            self.tasks_mcv.refresh()
+        category = self.categories_mcv.get_active_category()
+        if category and category.is_affected(events):
+            self.categories_mcv.refresh()
+            self.versions_mcv.refresh()
+
     def build_buttons(self):
         "Build the buttons"
         # Work buttons
@@ -1184,6 +1215,7 @@ class MainUI(QtWidgets.QMainWindow):
         self.management_lock()
         self.status_bar.showMessage(message, 3000)
         self.refresh_subprojects()
+        self.start_database_watcher()
 
     def _can_proceed_without_management(self, platform):
         """"Pops up the question dialog to proceed without management."""
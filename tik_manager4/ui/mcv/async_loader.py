@@ -0,0 +1,174 @@
+"""Non-blocking population of the views.
+
+Scanning the tasks, works and publishes can take long on big projects.
+ChunkedLoader consumes an iterable in a worker thread and delivers
+the items to the ui thread in chunks, so the host application stays
+interactive while the models are filled.
+
+Starting a new load cancels the previous one. Chunks of a cancelled load
+are dropped even if they are already on their way. Each loader has a
+single worker, so a new load never scans the same objects at the same
+time with the cancelled one.
+
+The producer runs in the worker thread and gets the CancelToken of the
+load. It must not change the objects the ui thread reads. It collects
+into its own containers instead and stores them as the result of the
+token, which is handed to the ui thread with the finished signal. Long
+producers check the token to stop early.
+
+Callbacks registered with call_when_loaded run in the ui thread after the
+current load is delivered, e.g. to restore a selection. They are dropped
+with the load if it is cancelled.
+"""
+
+import threading
+
+from tik_manager4.objects import loader
+from tik_manager4.ui.Qt import QtCore
+
+
+class CancelToken:
+    """Flag shared between the ui and the worker of a single load."""
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self.done = threading.Event()
+        # set by the producer, delivered with the finished signal.
+        self.result = None
+        # set in the ui thread after the finished signal is received.
+        self.delivered = False
+
+    @property
+    def cancelled(self):
+        """Return True if the load is cancelled."""
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Cancel the load."""
+        self._cancelled.set()
+
+
+class _LoaderSignals(QtCore.QObject):
+    """Signals emitted from the worker thread."""
+
+    chunk = QtCore.Signal(object, object)
+    finished = QtCore.Signal(object)
+
+
+class _LoaderRunnable(QtCore.QRunnable):
+    """Consume the iterable and emit the items in chunks."""
+
+    def __init__(self, producer, token, signals, chunk_size):
+        super(_LoaderRunnable, self).__init__()
+        self.producer = producer
+        self.token = token
+        self.signals = signals
+        self.chunk_size = chunk_size
+
+    def run(self):
+        """Consume the producer."""
+        try:
+            chunk = []
+            for item in self.producer(self.token):
+                if self.token.cancelled:
+                    return
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    self.signals.chunk.emit(self.token, chunk)
+                    chunk = []
+            if chunk and not self.token.cancelled:
+                self.signals.chunk.emit(self.token, chunk)
+        finally:
+            self.signals.finished.emit(self.token)
+            self.token.done.set()
+
+
+class ChunkedLoader(QtCore.QObject):
+    """Load the items of an iterable without blocking the ui thread."""
+
+    chunk_loaded = QtCore.Signal(list)
+    finished = QtCore.Signal(object)
+
+    def __init__(self, chunk_size=50, parent=None):
+        """Initialize the ChunkedLoader.
+
+        Args:
+            chunk_size (int, optional): Number of items to deliver at once.
+            parent (QObject, optional): The parent object.
+        """
+        super(ChunkedLoader, self).__init__(parent)
+        self.chunk_size = chunk_size
+        self._token = None
+        self._callbacks = []
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _LoaderSignals()
+        self._signals.chunk.connect(self._on_chunk)
+        self._signals.finished.connect(self._on_finished)
+
+    @property
+    def is_loading(self):
+        """Return True if a load is in progress."""
+        return bool(self._token and not self._token.done.is_set())
+
+    def start(self, producer):
+        """Start loading, cancelling the previous load.
+
+        If threading is disabled for the dcc or by the project settings,
+        the items are loaded in the ui thread.
+
+        Args:
+            producer (function): Function returning the iterable to consume.
+                Called in the worker thread with the CancelToken of the load.
+        """
+        self.cancel()
+        token = CancelToken()
+        self._token = token
+        runnable = _LoaderRunnable(producer, token, self._signals, self.chunk_size)
+        if loader.is_serial(loader.get_worker_count()):
+            runnable.run()
+            return
+        self._pool.start(runnable)
+
+    def cancel(self):
+        """Cancel the current load."""
+        self._callbacks = []
+        if self._token:
+            self._token.cancel()
+            self._token = None
+
+    def call_when_loaded(self, callback):
+        """Call the function after the current load is delivered.
+
+        The function is called immediately if nothing is loading.
+
+        Args:
+            callback (function): Function to call in the ui thread.
+        """
+        if self._token and not self._token.delivered:
+            self._callbacks.append(callback)
+        else:
+            callback()
+
+    def wait(self):
+        """Block until the current load is finished and delivered."""
+        token = self._token
+        if not token:
+            return
+        token.done.wait()
+        # deliver the chunks queued to the ui thread.
+        QtCore.QCoreApplication.sendPostedEvents()
+
+    @QtCore.Slot(object, object)
+    def _on_chunk(self, token, items):
+        if token is self._token and not token.cancelled:
+            self.chunk_loaded.emit(items)
+
+    @QtCore.Slot(object)
+    def _on_finished(self, token):
+        if token is self._token and not token.cancelled:
+            token.delivered = True
+            self.finished.emit(token.result)
+            callbacks, self._callbacks = self._callbacks, []
+            for callback in callbacks:
+                callback()
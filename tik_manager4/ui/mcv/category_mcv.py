@@ -3,13 +3,17 @@
 
 from datetime import datetime
 
+from tik_manager4.core import trace
 from tik_manager4.core.constants import ObjectType
+from tik_manager4.objects import loader
+from tik_manager4.objects.publish import Publish
 from tik_manager4.ui.Qt import QtWidgets, QtCore, QtGui
 from tik_manager4.ui.dialog.feedback import Feedback
 from tik_manager4.ui.dialog.work_dialog import NewVersionDialog
 from tik_manager4.ui.widgets.common import HorizontalSeparator, TikIconButton
 from tik_manager4.ui.widgets.style import ColorKeepingDelegate
 from tik_manager4.ui.mcv.filter import FilterModel, FilterWidget
+from tik_manager4.ui.mcv.async_loader import ChunkedLoader
 
 from tik_manager4.ui import pick
 
@@ -173,6 +177,7 @@ class TikCategoryModel(QtGui.QStandardItemModel):
         """Clear the model."""
         self.setRowCount(0)
 
+    @trace.traced("TikCategoryModel.set_works", category="ui")
     def set_works(self, works_list):
         """Set the works to the model.
         Args:
@@ -190,6 +195,25 @@ class TikCategoryModel(QtGui.QStandardItemModel):
         self._publishes = publishes_list
         self.populate(publishes=True)
 
+    def add_works(self, works_list):
+        """Append the works to the model.
+        Args:
+            works_list (list): A list of work objects.
+        """
+        self._works = list(self._works) + list(works_list)
+        for work in works_list:
+            self.append_work(work)
+
+    def add_publishes(self, publishes_list):
+        """Append the publishes to the model.
+        Args:
+            publishes_list (list): A list of publish objects.
+        """
+        self._publishes = list(self._publishes) + list(publishes_list)
+        for publish in publishes_list:
+            self.append_publish(publish)
+
+    @trace.traced("TikCategoryModel.populate", category="ui")
     def populate(self, publishes=False):
         """Populate the model with the works or publishes.
         Args:
@@ -852,6 +876,12 @@ class TikCategoryWidget(QtWidgets.QWidget):
         self.work_tree_view = TikCategoryView()
         self._main_layout.addWidget(self.work_tree_view)
 
+        # works and publishes are collected in the background
+        self._items_loader = ChunkedLoader(parent=self)
+        self._items_loader.chunk_loaded.connect(self._on_items_loaded)
+        self._items_loader.finished.connect(self._on_items_finished)
+        self._loading_publishes = False
+
         self.filter_widget = FilterWidget(self.work_tree_view.proxy_model)
         self._main_layout.addWidget(self.filter_widget)
 
@@ -935,6 +965,7 @@ class TikCategoryWidget(QtWidgets.QWidget):
         self.on_category_change(idx)
         self.work_tree_view.expandAll()
 
+    @trace.traced("TikCategoryWidget.populate_categories", category="ui")
     def populate_categories(self, categories):
         """Populate the layout with categories.
         Args:
@@ -943,8 +974,8 @@ class TikCategoryWidget(QtWidgets.QWidget):
         # clear the layout
         self.category_tab_widget.blockSignals(True)
         self.category_tab_widget.clear()
-        for key, category in categories.items():
-            category.scan_works()
+        # only the visible category is scanned, in the background.
+        for key in categories.keys():
             self.pre_tab = QtWidgets.QWidget()
             self.pre_tab.setObjectName(key)
             self.category_tab_widget.addTab(self.pre_tab, key)
@@ -976,34 +1007,85 @@ class TikCategoryWidget(QtWidgets.QWidget):
         self._last_category = self.category_tab_widget.tabText(index)
         if not self._last_category:
             return
-        if self._purgatory_mode:
-            works = self.task.categories[self._last_category].all_works
+        category = self.task.categories[self._last_category]
+        purgatory_mode = self._purgatory_mode
+        loading_publishes = self.mode != 0
+
+        def _producer(token):
+            works = category.collect_works()
+            token.result = (category, works, {})
+            if not purgatory_mode:
+                works = {
+                    path: work_obj
+                    for path, work_obj in works.items()
+                    if work_obj.has_valid_versions()
+                }
+            if loading_publishes:
+                return self._collect_publishes(works, token, purgatory_mode)
+            return list(works.values())
+
+        self.work_tree_view.model.set_works([])
+        self.work_tree_view.model.set_publishes([])
+        self._loading_publishes = loading_publishes
+        self._items_loader.start(_producer)
+
+    def _on_items_loaded(self, items):
+        """Add a chunk of loaded works or publishes to the model."""
+        if self._loading_publishes:
+            self.work_tree_view.model.add_publishes(items)
         else:
-            works = self.task.categories[self._last_category].works
-        if self.mode == 0 and self._last_category:
-            self.work_tree_view.model.set_works(works.values())
-        else:
-            _publishes = self._collect_publishes(works)
-            self.work_tree_view.model.set_publishes(_publishes)
+            self.work_tree_view.model.add_works(items)
+
+    def _on_items_finished(self, collected):
+        """Install the collected works and publishes and expand the view.
+
+        Args:
+            collected (tuple): The category, its collected works and the
+                scanned publishes keyed by the works.
+        """
+        if collected:
+            category, works, publishes = collected
+            category.set_works(works)
+            for work_obj, publish_obj in publishes.items():
+                work_obj.set_publish(publish_obj)
+        self.work_tree_view.expandAll()
+
+    def wait_for_loading(self):
+        """Block until the works or publishes of the category are added."""
+        self._items_loader.wait()
+
+    def call_when_loaded(self, callback):
+        """Call the function after the works or publishes are added.
+
+        Args:
+            callback (function): Function to call.
+        """
+        self._items_loader.call_when_loaded(callback)
+
+    @staticmethod
+    def _collect_publishes(works, token, purgatory_mode):
+        """Collect the publishes from the works in the loader thread.
 
-    def _collect_publishes(self, works):
-        """Collect the publishes from the works."""
-        works_objects = works.values()
-        if not works_objects:
+        The publishes are scanned into new objects. They are stored in the
+        result of the token to install them in the ui thread.
+        """
+        publishes = token.result[2]
+        for work_obj in works.values():
+            publishes[work_obj] = Publish(work_obj)
+        if not publishes:
             return []
-        for work_obj in works_objects:
-            work_obj.publish.scan_publish_versions()
-        if self._purgatory_mode:
+        loader.scan_publishes(publishes.values(), token=token)
+        if purgatory_mode:
             return [
-                work_obj.publish
-                for work_obj in works.values()
-                if work_obj.publish.all_versions
+                publish_obj
+                for publish_obj in publishes.values()
+                if publish_obj.all_versions
             ]
         else:
             return [
-                work_obj.publish
-                for work_obj in works.values()
-                if work_obj.publish.versions
+                publish_obj
+                for publish_obj in publishes.values()
+                if publish_obj.versions
             ]
 
     @QtCore.Slot()
@@ -1014,6 +1096,7 @@ class TikCategoryWidget(QtWidgets.QWidget):
 
     def clear(self):
         """Refresh the layout."""
+        self._items_loader.cancel()
         self.category_tab_widget.blockSignals(True)
         self.category_tab_widget.clear()
         self.work_tree_view.model.clear()
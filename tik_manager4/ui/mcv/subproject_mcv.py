@@ -6,6 +6,7 @@ from tik_manager4.ui.widgets.style import ColorKeepingDelegate
 from tik_manager4.ui.mcv.filter import FilterModel, FilterWidget
 from tik_manager4.ui.dialog.feedback import Feedback
 import tik_manager4
+from tik_manager4.core import trace
 from tik_manager4.ui import pick
 
 
@@ -76,6 +77,7 @@ class TikSubModel(QtGui.QStandardItemModel):
     def set_data(self, structure_object):
         self.project = structure_object
 
+    @trace.traced("TikSubModel.populate", category="ui")
     def populate(self):
         self.setRowCount(0)
         visited = []
@@ -392,26 +394,36 @@ class TikSubView(QtWidgets.QTreeView):
         self.resizeColumnToContents(4)
 
     @staticmethod
-    def collect_tasks(sub_items, recursive=True, filtered=True):
+    def collect_tasks(sub_items, token, recursive=True, filtered=True):
+        """Yield the tasks of the subprojects in the loader thread.
+
+        The subprojects are not changed. The collected tasks are stored as
+        the result of the token, to install them in the ui thread.
+
+        Args:
+            sub_items (list): Subproject objects.
+            token (CancelToken): The token of the load.
+            recursive (bool): Collect the tasks of the sub-subprojects too.
+            filtered (bool): Skip the deleted tasks.
+        """
         if not isinstance(sub_items, list):
             sub_items = [sub_items]
+        token.result = collected = []
         for sub_item in sub_items:
             if not isinstance(sub_item, tik_manager4.objects.subproject.Subproject):
                 # just to prevent crashes if something goes wrong
                 return
-            sub_item.scan_tasks()
-            tasks = sub_item.tasks if filtered else sub_item.all_tasks
-            for key, value in tasks.items():
-                yield value
-
-            if recursive:
-                queue = list(sub_item.subs.values())
-                while queue:
-                    sub = queue.pop(0)
-                    sub.scan_tasks()
-                    tasks = sub.tasks if filtered else sub.all_tasks
-                    for key, value in tasks.items():
-                        yield value
+            queue = [sub_item]
+            while queue:
+                if token.cancelled:
+                    return
+                sub = queue.pop(0)
+                tasks = sub.collect_tasks()
+                collected.append((sub, tasks))
+                for task in tasks.values():
+                    if not (filtered and task.deleted):
+                        yield task
+                if recursive:
                     queue.extend(list(sub.subs.values()))
 
     def get_tasks(self, idx=None):
@@ -419,7 +431,7 @@ class TikSubView(QtWidgets.QTreeView):
         selected_indexes = self.selectedIndexes()
 
         if not selected_indexes:
-            self.item_selected.emit([])
+            self.item_selected.emit(None)
             return
         sub_project_objects = []
         for idx in selected_indexes:
@@ -430,10 +442,35 @@ class TikSubView(QtWidgets.QTreeView):
             _item = self.model.itemFromIndex(index) or self.model.root_item
             if _item:
                 sub_project_objects.append(_item.subproject)
-        _tasks = self.collect_tasks(
-            sub_project_objects, recursive=self._recursive_task_scan, filtered=not self.purgatory_mode
+        recursive = self._recursive_task_scan
+        filtered = not self.purgatory_mode
+
+        def _producer(token):
+            return self.collect_tasks(
+                sub_project_objects, token, recursive=recursive, filtered=filtered
+            )
+
+        self.item_selected.emit(_producer)
+
+    def is_affected(self, events):
+        """Check if the watcher events change the tasks of the selection.
+
+        Args:
+            events (list): List of watcher.WatchEvent objects.
+
+        Returns:
+            bool: True if a task file of a selected subproject is changed.
+        """
+        task_events = [event for event in events if event.path.endswith(".ttask")]
+        if not task_events:
+            return False
+        return any(
+            item.subproject.is_affected(
+                task_events, recursive=self._recursive_task_scan
+            )
+            for item in self.get_selected_items() or []
+            if item
         )
-        self.item_selected.emit(_tasks)
 
     def hide_columns(self, columns):
         """If the given column exists in the model, hides it"""
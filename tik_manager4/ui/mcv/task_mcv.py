@@ -2,11 +2,13 @@
 import webbrowser
 from tik_manager4.ui.Qt import QtWidgets, QtCore, QtGui
 from tik_manager4.core import filelog
+from tik_manager4.core import trace
 from tik_manager4.ui.dialog.feedback import Feedback
 import tik_manager4.ui.dialog.task_dialog
 from tik_manager4.ui.widgets.common import HorizontalSeparator, TikIconButton
 from tik_manager4.ui.widgets.style import ColorKeepingDelegate
 from tik_manager4.ui.mcv.filter import FilterModel, FilterWidget
+from tik_manager4.ui.mcv.async_loader import ChunkedLoader
 from tik_manager4.objects.guard import Guard
 
 from tik_manager4.ui import pick
@@ -153,6 +155,11 @@ class TikTaskView(QtWidgets.QTreeView):
         self.setRootIsDecorated(False)
 
         self.model = TikTaskModel()
+        self._tasks_loader = ChunkedLoader(parent=self)
+        self._tasks_loader.chunk_loaded.connect(self._on_tasks_loaded)
+        self._tasks_loader.finished.connect(self._on_tasks_finished)
+        self._loaded_task_ids = set()
+        self._selected_task_id = None
         self.proxy_model = FilterModel(parent=self)
         self.proxy_model.setSourceModel(self.model)
         self.proxy_model.setRecursiveFilteringEnabled(True)
@@ -265,21 +272,62 @@ class TikTaskView(QtWidgets.QTreeView):
             return True
         return False
 
-    def set_tasks(self, tasks_gen):
-        """Set the data for the model"""
+    def set_tasks(self, tasks_producer):
+        """Set the data for the model.
+
+        The tasks are collected in the background and added in chunks.
+        Use call_when_loaded to continue after all of them are added.
+
+        Args:
+            tasks_producer (function): Function called with the CancelToken
+                in the loader thread, returning the tasks. The collected
+                (subproject, tasks) pairs are expected as the result of
+                the token. None clears the view.
+        """
         # get the selected item
         selected_item = self.get_selected_item()
+        self._selected_task_id = selected_item.task.id if selected_item else None
+        self._loaded_task_ids = set()
         self.model.clear()
-        for task in tasks_gen:
+        if tasks_producer is None:
+            self._tasks_loader.cancel()
+            return
+        self._tasks_loader.start(tasks_producer)
+
+    def wait_for_tasks(self):
+        """Block until the tasks started with set_tasks are added."""
+        self._tasks_loader.wait()
+
+    def call_when_loaded(self, callback):
+        """Call the function after the tasks started with set_tasks are added.
+
+        Args:
+            callback (function): Function to call.
+        """
+        self._tasks_loader.call_when_loaded(callback)
+
+    def _on_tasks_loaded(self, tasks):
+        """Add a chunk of collected tasks to the model."""
+        for task in tasks:
             # if the task is already in model, skip it
-            if self.model.find_item_by_id_column(task.id):
+            if task.id in self._loaded_task_ids:
                 continue
-
+            self._loaded_task_ids.add(task.id)
             self.model.append_task(task)
+            # if the item still exists, select it
+            if task.id == self._selected_task_id:
+                self.select_by_id(task.id)
+
+    def _on_tasks_finished(self, collected):
+        """Install the collected tasks and finalize the view.
+
+        Args:
+            collected (list): (subproject, tasks) pairs collected by the
+                producer.
+        """
+        for sub, tasks in collected or []:
+            sub.set_tasks(tasks)
         self.expandAll()
-        # if the item still exists, select it
-        if selected_item:
-            self.select_by_id(selected_item.task.id)
 
     def get_selected_item(self):
         """Return the selected item"""
@@ -292,6 +340,7 @@ class TikTaskView(QtWidgets.QTreeView):
         _item = self.model.itemFromIndex(index)
         return _item
 
+    @trace.traced("TikTaskView.add_tasks", category="ui")
     def add_tasks(self, tasks):
         """Add a task to the model"""
         _ = [self.model.append_task(x) for x in tasks]
@@ -13,6 +13,8 @@ from tik_manager4.ui.widgets.info import ImageWidget, NotesEditor
 from tik_manager4.ui.dialog.bunde_ingest_dialog import BundleIngestDialog
 from tik_manager4.ui.dialog.info_dialog import InfoDialog
 from tik_manager4.core import filelog
+from tik_manager4.core import sync_queue
+from tik_manager4.core import trace
 
 LOG = filelog.Filelog(logname=__name__, filename="tik_manager4")
 
@@ -163,6 +165,8 @@ class TikVersionWidget(QtWidgets.QWidget):
     element_view_event = QtCore.Signal(str, str)
     status_updated = QtCore.Signal(str, int)
     version_resurrected = QtCore.Signal()
+    # emitted from the sync threads. Received in the ui thread.
+    sync_updated = QtCore.Signal(object, str)
 
     def __init__(self, project_object, *args, **kwargs):
         """Initialize the TikVersionLayout."""
@@ -171,6 +175,8 @@ class TikVersionWidget(QtWidgets.QWidget):
         self._purgatory_mode = False
         self.project = project_object
         self.base = None
+        # versions submitted to the sync queue by job id.
+        self._syncing_versions = {}
         self._parent = _parent
         self.feedback = Feedback(parent=self._parent)
         self.app_instance = QtWidgets.QApplication.instance()
@@ -351,6 +357,7 @@ class TikVersionWidget(QtWidgets.QWidget):
         self.element.element_view_btn.clicked.connect(lambda: self.on_element_view_event())
         self.header.refresh_btn.clicked.connect(lambda: self.refresh())
         self.version.sync_btn.clicked.connect(lambda: self.on_sync_to_origin())
+        self.sync_updated.connect(self.on_sync_updated)
         self.info.notes_editor.notes_updated.connect(self.__apply_to_base)
         self.version.promote_btn.clicked.connect(lambda: self.on_promote())
         self.version.info_btn.clicked.connect(lambda: self.on_info())
@@ -427,7 +434,7 @@ class TikVersionWidget(QtWidgets.QWidget):
         )
         if are_you_sure == "cancel":
             return
-        ret, msg = _version.sync()
+        ret, msg = _version.sync(wait=False, callback=self._emit_sync_updated)
         if not ret:
             self.feedback.pop_info(
                 title="Sync failed",
@@ -436,12 +443,56 @@ class TikVersionWidget(QtWidgets.QWidget):
                 critical=True,
             )
             return
-        # if this is a work version, the work object should be updated as well
-        if _version.object_type == ObjectType.WORK_VERSION:
-            self.__apply_to_base()
-
-        self.toggle_sync_state(False)
-        self.status_updated.emit("Synced to origin.", 5000)
+        self._syncing_versions[_version.sync_job_id] = _version
+        self.update_sync_state(_version)
+        self.status_updated.emit("Sync queued.", 5000)
+
+    def _emit_sync_updated(self, job, _item):
+        """Pass the changes of the sync job to the ui thread."""
+        # the job can be finished until the signal is received.
+        self.sync_updated.emit(job, job.status)
+
+    def on_sync_updated(self, job, status):
+        """Report the state of the sync job."""
+        if status in (sync_queue.DONE, sync_queue.FAILED):
+            synced_version = self._syncing_versions.pop(job.job_id, None)
+            # the version file is saved by the sync thread.
+            if synced_version and status == sync_queue.DONE:
+                synced_version.mark_synced()
+        if status not in (sync_queue.DONE, sync_queue.FAILED):
+            self.status_updated.emit(
+                f"Syncing to origin... {job.count(sync_queue.DONE)}/{len(job.items)} elements", 0
+            )
+        elif status == sync_queue.FAILED:
+            self.status_updated.emit("Sync failed.", 5000)
+            self.feedback.pop_info(
+                title="Sync failed",
+                text="The sync operation failed. Press Sync to retry the failed elements.",
+                details="\n".join(job.errors),
+                critical=True,
+            )
+        else:
+            self.status_updated.emit("Synced to origin.", 5000)
+        _version = self.version.combo.get_current_item()
+        if _version and _version.sync_job_id == job.job_id:
+            self.update_sync_state(_version)
+
+    def update_sync_state(self, _version):
+        """Update the sync button with the state of the sync job of the version."""
+        job = _version.get_sync_job() if _version.localized else None
+        if not job:
+            self.version.sync_btn.setEnabled(True)
+            self.version.sync_btn.setToolTip("")
+            # the localized files are missing.
+            critical = _version.localized and not Path(_version.localized_path).exists()
+            self.toggle_sync_state(_version.localized, critical=critical)
+            return
+        # the failed jobs can be retried.
+        self.version.sync_btn.setEnabled(job.is_finished)
+        self.version.sync_btn.setToolTip(
+            "\n".join(f"{item.status}: {Path(item.target).name}" for item in job.items)
+        )
+        self.toggle_sync_state(True, critical=job.status == sync_queue.FAILED)
 
     def on_import(self):
         """Import the current version."""
@@ -701,6 +752,7 @@ class TikVersionWidget(QtWidgets.QWidget):
         self.version.combo.blockSignals(False)
 
     # def populate_versions(self, versions):
+    @trace.traced("TikVersionWidget.populate_versions", category="ui")
     def populate_versions(self, base):
         """Populate the version dropdown with the versions from the base object."""
         versions = base.all_versions if self._purgatory_mode else base.versions
@@ -746,14 +798,7 @@ class TikVersionWidget(QtWidgets.QWidget):
         if not _version:
             return
         # set the state of the path warning
-        state = False
-        critical = False
-        if _version.localized:
-            state = True
-            if not Path(_version.localized_path).exists():
-                state = True
-                critical = True
-        self.toggle_sync_state(state=state, critical=critical)
+        self.update_sync_state(_version)
 
         _index = self.version.combo.currentIndex()
 